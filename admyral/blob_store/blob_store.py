@@ -0,0 +1,152 @@
+from abc import abstractmethod
+import os
+import re
+import tempfile
+from hashlib import sha256
+
+from admyral.config.config import CONFIG, BlobStoreType
+
+
+BLOB_ID_REGEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob. Blobs are content-addressed, i.e., storing the same data twice
+        returns the same blob id and only stores the data once. Storing an existing
+        blob again renews its creation time.
+
+        Args:
+            data: The data to store.
+
+        Returns:
+            The blob id, i.e., the SHA-256 hash of the data.
+        """
+        raise NotImplementedError("put method not implemented")
+
+    @abstractmethod
+    def get(self, blob_id: str) -> bytes:
+        """
+        Retrieve a blob. If the blob does not exist, raise a ValueError.
+
+        Args:
+            blob_id: The id of the blob to retrieve.
+        """
+        raise NotImplementedError("get method not implemented")
+
+    @abstractmethod
+    def list_blobs(self, created_before: float) -> list[str]:
+        """
+        List the ids of the blobs which were stored before the given time.
+
+        Args:
+            created_before: Unix timestamp in seconds.
+        """
+        raise NotImplementedError("list_blobs method not implemented")
+
+    @abstractmethod
+    def delete(self, blob_id: str, created_before: float | None = None) -> bool:
+        """
+        Delete a blob. Deleting a blob which does not exist is a no-op.
+
+        Args:
+            blob_id: The id of the blob to delete.
+            created_before: If provided, the blob is only deleted if it was not
+                stored again since this unix timestamp in seconds.
+
+        Returns:
+            True if the blob was deleted.
+        """
+        raise NotImplementedError("delete method not implemented")
+
+
+class FileSystemBlobStore(BlobStore):
+    """
+    Stores blobs as files in a directory. If multiple workers are deployed, the
+    directory must be shared by all of them.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _get_path(self, blob_id: str) -> str:
+        if not BLOB_ID_REGEX.match(blob_id):
+            raise ValueError(f"Invalid blob id: {blob_id}")
+        return os.path.join(self.directory, blob_id[:2], blob_id)
+
+    def put(self, data: bytes) -> str:
+        blob_id = sha256(data).hexdigest()
+        path = self._get_path(blob_id)
+        try:
+            # the blob is about to be referenced again. hence, its garbage
+            # collection grace period starts over.
+            os.utime(path)
+            return blob_id
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so that readers never see partial blobs
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return blob_id
+
+    def get(self, blob_id: str) -> bytes:
+        path = self._get_path(blob_id)
+        if not os.path.exists(path):
+            raise ValueError(f"Blob {blob_id} does not exist.")
+        with open(path, "rb") as f:
+            return f.read()
+
+    def list_blobs(self, created_before: float) -> list[str]:
+        blob_ids = []
+        if not os.path.isdir(self.directory):
+            return blob_ids
+        for prefix in os.listdir(self.directory):
+            prefix_dir = os.path.join(self.directory, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for entry in os.scandir(prefix_dir):
+                # skips temporary files of concurrent writes
+                if not BLOB_ID_REGEX.match(entry.name):
+                    continue
+                try:
+                    if entry.stat().st_mtime < created_before:
+                        blob_ids.append(entry.name)
+                except FileNotFoundError:
+                    # deleted concurrently by another worker
+                    continue
+        return blob_ids
+
+    def delete(self, blob_id: str, created_before: float | None = None) -> bool:
+        path = self._get_path(blob_id)
+        try:
+            if created_before is not None and os.stat(path).st_mtime >= created_before:
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+def blob_store_factory() -> BlobStore | None:
+    blob_store_type = CONFIG.blob_store_type
+    match blob_store_type:
+        case BlobStoreType.DISABLED:
+            return None
+
+        case BlobStoreType.FILESYSTEM:
+            return FileSystemBlobStore(CONFIG.blob_store_directory)
+
+        case _:
+            raise ValueError(f"Unknown blob store type: {blob_store_type}")
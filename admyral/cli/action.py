@@ -52,7 +52,9 @@ def list(ctx: click.Context) -> None:
     actions = client.list_actions()
     click.echo("Pushed actions:")
     for action in actions:
-        click.echo(action.action_type)
+        click.echo(
+            f"{action.action_type} (environment: {action.environment_status.value})"
+        )
 
 
 @action.command("delete", help="Delete a pushed custom action")
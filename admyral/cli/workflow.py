@@ -80,6 +80,8 @@ def trigger(ctx: click.Context, workflow_name: str, payload: str | None) -> None
                 click.echo(f"Workflow {workflow_name} triggered successfully.")
             case TriggerStatus.INACTIVE:
                 click.echo(f"Workflow {workflow_name} is deactivated.")
+            case TriggerStatus.DUPLICATE:
+                click.echo(f"Workflow {workflow_name} was already triggered.")
 
     except Exception as e:
         if "is not active" in str(e):
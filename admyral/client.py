@@ -1,4 +1,6 @@
 import requests
+import json
+from typing import Iterator
 from admyral.typings import JsonValue
 
 from admyral.models import (
@@ -10,8 +12,12 @@ from admyral.models import (
     WorkflowTriggerResponse,
     SecretMetadata,
     ActionMetadata,
+    WorkflowRunMetadata,
+    WorkflowRunStepMetadata,
+    WorkflowRunExport,
 )
 from admyral.config.config import API_V1_STR
+from admyral.utils.pagination import encode_cursor
 
 
 class AdmyralClient:
@@ -29,13 +35,7 @@ class AdmyralClient:
         json: JsonValue | None = None,
         webhook_secret: str | None = None,
     ) -> None | JsonValue:
-        headers = {
-            "Content-Type": "application/json",
-        }
-        if webhook_secret:
-            headers["Authorization"] = webhook_secret
-        elif self.api_key:
-            headers["x-api-key"] = self.api_key
+        headers = self._get_headers(webhook_secret)
 
         response = None
         if method == "GET":
@@ -55,6 +55,21 @@ class AdmyralClient:
         else:
             raise NotImplementedError(f"Missing implementation for method: {method}")
 
+        self._raise_for_status(response)
+
+        return response.json() if response.text else None
+
+    def _get_headers(self, webhook_secret: str | None = None) -> dict[str, str]:
+        headers = {
+            "Content-Type": "application/json",
+        }
+        if webhook_secret:
+            headers["Authorization"] = webhook_secret
+        elif self.api_key:
+            headers["x-api-key"] = self.api_key
+        return headers
+
+    def _raise_for_status(self, response: requests.Response) -> None:
         if response.status_code == 401:
             raise RuntimeError("Unauthorized. Please check your API key.")
 
@@ -64,7 +79,17 @@ class AdmyralClient:
                 f"Request failed with status code {response.status_code}. Error: {error_message}"
             )
 
-        return response.json() if response.text else None
+    def _stream_ndjson(self, path: str, params: dict = {}) -> Iterator[JsonValue]:
+        with requests.get(
+            f"{self.base_url}{path}",
+            headers=self._get_headers(),
+            params=params,
+            stream=True,
+        ) as response:
+            self._raise_for_status(response)
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
 
     def _get(self, path: str, params: dict = {}) -> None | JsonValue:
         return self._request("GET", path, params)
@@ -245,6 +270,109 @@ class AdmyralClient:
         """
         self._delete(f"{API_V1_STR}/secrets/delete", {"secret_id": secret_id})
 
+    ########################################################
+    # Workflow Runs
+    ########################################################
+
+    def list_workflow_runs(
+        self, workflow_id: str, limit: int = 100, cursor: str | None = None
+    ) -> list[WorkflowRunMetadata]:
+        """
+        Returns a page of workflow runs ordered from newest to oldest.
+
+        Args:
+            workflow_id: The workflow id.
+            limit: The maximum number of runs to return.
+            cursor: The cursor of the page to return. Use `next_cursor` to obtain
+                the cursor of the next page.
+
+        Returns:
+            A list of workflow runs.
+        """
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        result = self._get(f"{API_V1_STR}/runs/{workflow_id}", params)
+        return [WorkflowRunMetadata.model_validate(r) for r in result]
+
+    def iter_workflow_runs(
+        self, workflow_id: str, page_size: int = 100
+    ) -> Iterator[WorkflowRunMetadata]:
+        """
+        Iterates over all workflow runs from newest to oldest page by page.
+
+        Args:
+            workflow_id: The workflow id.
+            page_size: The number of runs to fetch per request.
+        """
+        cursor = None
+        while True:
+            workflow_runs = self.list_workflow_runs(workflow_id, page_size, cursor)
+            yield from workflow_runs
+            if len(workflow_runs) < page_size:
+                return
+            cursor = self.next_cursor(workflow_runs)
+
+    def list_workflow_run_steps(
+        self,
+        workflow_id: str,
+        run_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> list[WorkflowRunStepMetadata]:
+        """
+        Returns the steps of a workflow run in execution order.
+
+        Args:
+            workflow_id: The workflow id.
+            run_id: The workflow run id.
+            limit: The maximum number of steps to return. All steps if not set.
+            cursor: The cursor of the page to return. Use `next_cursor` to obtain
+                the cursor of the next page.
+
+        Returns:
+            A list of workflow run steps.
+        """
+        params = {}
+        if limit is not None:
+            params["limit"] = limit
+        if cursor:
+            params["cursor"] = cursor
+        result = self._get(f"{API_V1_STR}/runs/{workflow_id}/{run_id}", params)
+        return [WorkflowRunStepMetadata.model_validate(r) for r in result]
+
+    def export_workflow_runs(
+        self, workflow_id: str, include_steps: bool = True
+    ) -> Iterator[WorkflowRunExport]:
+        """
+        Streams all workflow runs from newest to oldest without loading them into
+        memory at once.
+
+        Args:
+            workflow_id: The workflow id.
+            include_steps: Whether to include the step metadata of each run.
+        """
+        for line in self._stream_ndjson(
+            f"{API_V1_STR}/runs/{workflow_id}/export",
+            {"include_steps": include_steps},
+        ):
+            yield WorkflowRunExport.model_validate(line)
+
+    @staticmethod
+    def next_cursor(
+        page: list[WorkflowRunMetadata] | list[WorkflowRunStepMetadata],
+    ) -> str | None:
+        """
+        Returns the cursor of the page following the given page.
+        """
+        if not page:
+            return None
+        last = page[-1]
+        return encode_cursor(
+            last.created_at,
+            last.run_id if isinstance(last, WorkflowRunMetadata) else last.step_id,
+        )
+
     ########################################################
     # Webhook
     ########################################################
@@ -0,0 +1,83 @@
+from admyral.models import WorkflowDAG, WorkflowExecutionPlan, IfNode, ActionNode
+from admyral.action_registry import ActionRegistry
+
+
+def compile_execution_plan(workflow_dag: WorkflowDAG) -> WorkflowExecutionPlan:
+    """
+    Compiles a workflow DAG into an array-backed execution plan with integer node ids,
+    CSR-style child arrays, and precomputed incoming degrees.
+
+    Args:
+        workflow_dag: The workflow DAG to compile.
+
+    Returns:
+        The compiled execution plan.
+    """
+    node_ids = ["start"] + [
+        node_id for node_id in workflow_dag.dag if node_id != "start"
+    ]
+    node_index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+
+    child_offsets = [0]
+    false_child_offsets = []
+    child_targets = []
+    in_deg = [0] * len(node_ids)
+
+    for node_id in node_ids:
+        node = workflow_dag.dag[node_id]
+
+        if isinstance(node, IfNode):
+            true_children = [node_index[child_id] for child_id in node.true_children]
+            false_children = [node_index[child_id] for child_id in node.false_children]
+        else:
+            assert isinstance(node, ActionNode)
+            true_children = [node_index[child_id] for child_id in node.children]
+            false_children = []
+
+        child_targets.extend(true_children)
+        false_child_offsets.append(len(child_targets))
+        child_targets.extend(false_children)
+        child_offsets.append(len(child_targets))
+
+        for child in true_children + false_children:
+            in_deg[child] += 1
+
+    return WorkflowExecutionPlan(
+        node_ids=tuple(node_ids),
+        child_offsets=tuple(child_offsets),
+        false_child_offsets=tuple(false_child_offsets),
+        child_targets=tuple(child_targets),
+        in_deg=tuple(in_deg),
+    )
+
+
+def compile_argument_filters(
+    workflow_dag: WorkflowDAG, plan: WorkflowExecutionPlan
+) -> list[tuple[str, ...] | None]:
+    """
+    Computes the arguments defined by the registered action of each node of the plan.
+
+    The argument filters depend on the action definitions of the process which
+    executes the workflow. Hence, they are computed by the worker from its own
+    ActionRegistry and are not part of the persisted execution plan.
+
+    Args:
+        workflow_dag: The workflow DAG of the plan.
+        plan: The execution plan.
+
+    Returns:
+        The defined arguments of node i or None if node i is an if-condition or not a
+        registered action.
+    """
+    defined_args = []
+    for node_id in plan.node_ids:
+        node = workflow_dag.dag[node_id]
+        action = (
+            ActionRegistry.get_or_none(node.type)
+            if isinstance(node, ActionNode)
+            else None
+        )
+        defined_args.append(
+            tuple(arg.arg_name for arg in action.arguments) if action else None
+        )
+    return defined_args
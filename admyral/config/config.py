@@ -24,7 +24,18 @@ ENV_ADMYRAL_DISABLE_NSJAIL = "ADMYRAL_DISABLE_NSJAIL"
 ENV_ADMYRAL_FLOCK_PATH = "ADMYRAL_FLOCK_PATH"
 ENV_ADMYRAL_PIP_CACHE_DIRECTORY = "ADMYRAL_PIP_CACHE_DIRECTORY"
 ENV_ADMYRAL_PIP_LOCK_CACHE_DIRECTORY = "ADMYRAL_PIP_LOCK_CACHE_DIRECTORY"
+ENV_ADMYRAL_PIP_INSTALL_MODE = "ADMYRAL_PIP_INSTALL_MODE"
+ENV_ADMYRAL_PIP_INSTALL_CONCURRENCY = "ADMYRAL_PIP_INSTALL_CONCURRENCY"
+ENV_ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY = (
+    "ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY"
+)
 ENV_ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE = "ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE"
+ENV_ADMYRAL_PYTHON_SANDBOX_POOL_SIZE = "ADMYRAL_PYTHON_SANDBOX_POOL_SIZE"
+ENV_ADMYRAL_PYTHON_SANDBOX_MAX_JOBS = "ADMYRAL_PYTHON_SANDBOX_MAX_JOBS"
+ENV_ADMYRAL_PYTHON_SANDBOX_MAX_MEMORY_MB = "ADMYRAL_PYTHON_SANDBOX_MAX_MEMORY_MB"
+ENV_ADMYRAL_PYTHON_SANDBOX_IDLE_TIMEOUT_IN_SECONDS = (
+    "ADMYRAL_PYTHON_SANDBOX_IDLE_TIMEOUT_IN_SECONDS"
+)
 ENV_ADMYRAL_ENV = "ADMYRAL_ENV"
 ENV_ADMYRAL_POSTHOG_API_KEY = "ADMYRAL_POSTHOG_API_KEY"
 ENV_ADMYRAL_POSTHOG_HOST = "ADMYRAL_POSTHOG_HOST"
@@ -80,10 +91,54 @@ ADMYRAL_PIP_LOCK_CACHE_DIRECTORY = os.getenv(
     ENV_ADMYRAL_PIP_LOCK_CACHE_DIRECTORY,
     os.path.join(ADMYRAL_CACHE_DIRECOTRY, "pip-lock"),
 )
+
+
+class PipInstallMode(str, Enum):
+    """
+    Enum class for how uncached requirements of custom Python actions are installed.
+    """
+
+    # one sandboxed pip process per requirement, bounded by the install concurrency
+    PARALLEL = "parallel"
+    # a single sandboxed pip process builds the wheels of all requirements at once
+    BATCHED = "batched"
+
+
+ADMYRAL_PIP_INSTALL_MODE = PipInstallMode(
+    os.getenv(ENV_ADMYRAL_PIP_INSTALL_MODE, PipInstallMode.PARALLEL)
+)
+ADMYRAL_PIP_INSTALL_CONCURRENCY = int(
+    os.getenv(ENV_ADMYRAL_PIP_INSTALL_CONCURRENCY, "4")
+)
+ADMYRAL_PIP_WHEEL_CACHE_DIRECTORY = os.path.join(ADMYRAL_CACHE_DIRECOTRY, "wheels")
+
+# One site-packages tree per lockfile, hardlinked from the pip cache. Hence, it must
+# be located on the same filesystem as the pip cache.
+ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY = os.getenv(
+    ENV_ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY,
+    os.path.join(ADMYRAL_CACHE_DIRECOTRY, "site-packages"),
+)
 ADMYRAL_PIP_LOCKFILE_CACHE_TTL_IN_SECONDS = 3 * 24 * 60 * 60  # 3 days
 ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE = (
     os.getenv(ENV_ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE, "true").lower() == "true"
 )
+# Warm pool of long-running Python action executors. The pool size is the maximum
+# number of idle executors kept per user and set of requirements. 0 disables the pool,
+# i.e., every Python action is executed in a fresh interpreter.
+ADMYRAL_PYTHON_SANDBOX_POOL_SIZE = int(
+    os.getenv(ENV_ADMYRAL_PYTHON_SANDBOX_POOL_SIZE, "0")
+)
+# executors are recycled after this many jobs or once they exceed the memory limit
+ADMYRAL_PYTHON_SANDBOX_MAX_JOBS = int(
+    os.getenv(ENV_ADMYRAL_PYTHON_SANDBOX_MAX_JOBS, "100")
+)
+ADMYRAL_PYTHON_SANDBOX_MAX_MEMORY_MB = int(
+    os.getenv(ENV_ADMYRAL_PYTHON_SANDBOX_MAX_MEMORY_MB, "1024")
+)
+ADMYRAL_PYTHON_SANDBOX_IDLE_TIMEOUT_IN_SECONDS = int(
+    os.getenv(ENV_ADMYRAL_PYTHON_SANDBOX_IDLE_TIMEOUT_IN_SECONDS, "300")
+)
+ADMYRAL_PYTHON_SANDBOX_JOB_TIMEOUT_IN_SECONDS = 600
 ADMYRAL_ENV = os.getenv(ENV_ADMYRAL_ENV, "prod")
 ADMYRAL_POSTHOG_API_KEY = os.getenv(
     ENV_ADMYRAL_POSTHOG_API_KEY, "phc_RIpkRea4KLW6EONEDCSZVR1Td4YzeHf4ziUsGzmPnjD"
@@ -116,6 +171,7 @@ class SecretsManagerType(str, Enum):
 
 ENV_ADMYRAL_DATABASE_URL = "ADMYRAL_DATABASE_URL"
 ENV_ADMYRAL_SECRETS_MANAGER_TYPE = "ADMYRAL_SECRETS_MANAGER"
+ENV_ADMYRAL_SECRETS_CACHE_TTL_IN_SECONDS = "ADMYRAL_SECRETS_CACHE_TTL_IN_SECONDS"
 
 
 ADMYRAL_DATABASE_URL = os.getenv(
@@ -134,6 +190,105 @@ else:
 ADMYRAL_SECRETS_MANAGER_TYPE = SecretsManagerType(
     os.getenv(ENV_ADMYRAL_SECRETS_MANAGER_TYPE, SecretsManagerType.SQL)
 )
+# decrypted secrets are cached for a short time. 0 disables the cache.
+ADMYRAL_SECRETS_CACHE_TTL_IN_SECONDS = int(
+    os.getenv(ENV_ADMYRAL_SECRETS_CACHE_TTL_IN_SECONDS, 30)
+)
+
+
+class DatabasePoolProfile(str, Enum):
+    """
+    Enum class for the processes which connect to the database.
+    """
+
+    API = "api"
+    WORKER = "worker"
+
+
+class DatabasePoolConfig(BaseModel):
+    """
+    Connection pool settings of the database engine.
+    """
+
+    pool_size: int
+    max_overflow: int
+    pool_recycle: int = 30 * 60  # in seconds
+    pool_timeout: int = 30  # in seconds
+    statement_timeout_ms: int | None = None
+    echo: bool = False
+
+
+ENV_ADMYRAL_DATABASE_ECHO = "ADMYRAL_DATABASE_ECHO"
+ENV_ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS = "ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS"
+ENV_ADMYRAL_API_DATABASE_POOL_SIZE = "ADMYRAL_API_DATABASE_POOL_SIZE"
+ENV_ADMYRAL_API_DATABASE_MAX_OVERFLOW = "ADMYRAL_API_DATABASE_MAX_OVERFLOW"
+ENV_ADMYRAL_WORKER_DATABASE_POOL_SIZE = "ADMYRAL_WORKER_DATABASE_POOL_SIZE"
+ENV_ADMYRAL_WORKER_DATABASE_MAX_OVERFLOW = "ADMYRAL_WORKER_DATABASE_MAX_OVERFLOW"
+
+ADMYRAL_DATABASE_ECHO = os.getenv(ENV_ADMYRAL_DATABASE_ECHO, "false").lower() == "true"
+ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS = (
+    int(os.getenv(ENV_ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS))
+    if os.getenv(ENV_ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS)
+    else None
+)
+# The API server mostly runs short queries. The workers run up to 100 activities
+# concurrently, but most of them do not hold a connection for long. The defaults
+# allow an API server and two workers to stay below the default max_connections
+# of Postgres (100).
+ADMYRAL_API_DATABASE_POOL = DatabasePoolConfig(
+    pool_size=int(os.getenv(ENV_ADMYRAL_API_DATABASE_POOL_SIZE, "10")),
+    max_overflow=int(os.getenv(ENV_ADMYRAL_API_DATABASE_MAX_OVERFLOW, "20")),
+    statement_timeout_ms=ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS,
+    echo=ADMYRAL_DATABASE_ECHO,
+)
+ADMYRAL_WORKER_DATABASE_POOL = DatabasePoolConfig(
+    pool_size=int(os.getenv(ENV_ADMYRAL_WORKER_DATABASE_POOL_SIZE, "10")),
+    max_overflow=int(os.getenv(ENV_ADMYRAL_WORKER_DATABASE_MAX_OVERFLOW, "20")),
+    statement_timeout_ms=ADMYRAL_DATABASE_STATEMENT_TIMEOUT_MS,
+    echo=ADMYRAL_DATABASE_ECHO,
+)
+
+
+ENV_ADMYRAL_RUN_RETENTION_DAYS = "ADMYRAL_RUN_RETENTION_DAYS"
+ENV_ADMYRAL_RUN_ARCHIVE_DIRECTORY = "ADMYRAL_RUN_ARCHIVE_DIRECTORY"
+
+# Workflow runs are kept forever unless a retention period is configured.
+ADMYRAL_RUN_RETENTION_DAYS = (
+    int(os.getenv(ENV_ADMYRAL_RUN_RETENTION_DAYS))
+    if os.getenv(ENV_ADMYRAL_RUN_RETENTION_DAYS)
+    else None
+)
+# If set, expired workflow runs are archived as gzip-compressed JSONL files before deletion.
+ADMYRAL_RUN_ARCHIVE_DIRECTORY = os.getenv(ENV_ADMYRAL_RUN_ARCHIVE_DIRECTORY)
+
+
+class BlobStoreType(str, Enum):
+    """
+    Enum class for the supported blob store types.
+    """
+
+    DISABLED = "disabled"
+    # Requires a filesystem shared by all workers if multiple workers are deployed.
+    FILESYSTEM = "filesystem"
+
+
+ENV_ADMYRAL_BLOB_STORE_TYPE = "ADMYRAL_BLOB_STORE"
+ENV_ADMYRAL_BLOB_STORE_DIRECTORY = "ADMYRAL_BLOB_STORE_DIRECTORY"
+ENV_ADMYRAL_BLOB_OFFLOAD_THRESHOLD_BYTES = "ADMYRAL_BLOB_OFFLOAD_THRESHOLD_BYTES"
+
+# Offloading is opt-in because the filesystem blob store requires a directory
+# shared by all workers.
+ADMYRAL_BLOB_STORE_TYPE = BlobStoreType(
+    os.getenv(ENV_ADMYRAL_BLOB_STORE_TYPE, BlobStoreType.DISABLED)
+)
+ADMYRAL_BLOB_STORE_DIRECTORY = os.getenv(
+    ENV_ADMYRAL_BLOB_STORE_DIRECTORY, os.path.join(get_local_storage_path(), "blobs")
+)
+# Action results larger than the threshold are written to the blob store and only
+# a reference is passed through Temporal.
+ADMYRAL_BLOB_OFFLOAD_THRESHOLD_BYTES = int(
+    os.getenv(ENV_ADMYRAL_BLOB_OFFLOAD_THRESHOLD_BYTES, str(256 * 1024))
+)
 
 
 ENV_TEMPORAL_HOST = "ADMYRAL_TEMPORAL_HOST"
@@ -141,6 +296,63 @@ ENV_TEMPORAL_HOST = "ADMYRAL_TEMPORAL_HOST"
 ADMYRAL_TEMPORAL_HOST = os.getenv(ENV_TEMPORAL_HOST, "localhost:7233")
 
 
+class TemporalPayloadCompression(str, Enum):
+    """
+    Enum class for the compression algorithms of Temporal payloads.
+    """
+
+    DISABLED = "disabled"
+    GZIP = "gzip"
+    # requires the zstandard package
+    ZSTD = "zstd"
+
+
+ENV_ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION = "ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION"
+ENV_ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD_BYTES = (
+    "ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD_BYTES"
+)
+
+# Note: workers and the API server must be able to decode each other's payloads,
+# i.e., zstd requires the zstandard package everywhere once it was enabled.
+ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION = TemporalPayloadCompression(
+    os.getenv(
+        ENV_ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION, TemporalPayloadCompression.DISABLED
+    )
+)
+ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD_BYTES = int(
+    os.getenv(ENV_ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD_BYTES, "1024")
+)
+
+ENV_ADMYRAL_WORKFLOW_PARAMS_BY_REFERENCE = "ADMYRAL_WORKFLOW_PARAMS_BY_REFERENCE"
+
+# If enabled, workflow runs are started with the workflow ID and the version hash
+# instead of the full workflow definition. The workers resolve the definition from
+# the store and cache it in-process.
+ADMYRAL_WORKFLOW_PARAMS_BY_REFERENCE = (
+    os.getenv(ENV_ADMYRAL_WORKFLOW_PARAMS_BY_REFERENCE, "false").lower() == "true"
+)
+
+ENV_ADMYRAL_WEBHOOK_ROUTING_CACHE_TTL_IN_SECONDS = (
+    "ADMYRAL_WEBHOOK_ROUTING_CACHE_TTL_IN_SECONDS"
+)
+
+# Webhook routes are cached in the API server. Changes made through the same API
+# server are visible immediately, changes made through other API server replicas
+# after the TTL. 0 disables the cache.
+ADMYRAL_WEBHOOK_ROUTING_CACHE_TTL_IN_SECONDS = int(
+    os.getenv(ENV_ADMYRAL_WEBHOOK_ROUTING_CACHE_TTL_IN_SECONDS, "10")
+)
+
+ENV_ADMYRAL_WEBHOOK_FAST_ACK = "ADMYRAL_WEBHOOK_FAST_ACK"
+
+# If enabled, webhook payloads are acknowledged once they are persisted in the
+# webhook ingestion queue. A background task of the API server dispatches them to
+# Temporal.
+ADMYRAL_WEBHOOK_FAST_ACK = (
+    os.getenv(ENV_ADMYRAL_WEBHOOK_FAST_ACK, "false").lower() == "true"
+)
+
+
 class GlobalConfig(BaseModel):
     """
     The global configuration for Admyral.
@@ -153,8 +365,29 @@ class GlobalConfig(BaseModel):
     storage_directory: str = get_local_storage_path()
     database_type: DatabaseType = ADMYRAL_DATABASE_TYPE
     database_url: str = ADMYRAL_DATABASE_URL
+    api_database_pool: DatabasePoolConfig = ADMYRAL_API_DATABASE_POOL
+    worker_database_pool: DatabasePoolConfig = ADMYRAL_WORKER_DATABASE_POOL
     temporal_host: str = ADMYRAL_TEMPORAL_HOST
+    temporal_payload_compression: TemporalPayloadCompression = (
+        ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION
+    )
+    temporal_payload_compression_threshold_bytes: int = (
+        ADMYRAL_TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD_BYTES
+    )
+    workflow_params_by_reference: bool = ADMYRAL_WORKFLOW_PARAMS_BY_REFERENCE
+    webhook_routing_cache_ttl_in_seconds: int = (
+        ADMYRAL_WEBHOOK_ROUTING_CACHE_TTL_IN_SECONDS
+    )
     secrets_manager_type: SecretsManagerType = ADMYRAL_SECRETS_MANAGER_TYPE
+    secrets_cache_ttl_in_seconds: int = ADMYRAL_SECRETS_CACHE_TTL_IN_SECONDS
+    blob_store_type: BlobStoreType = ADMYRAL_BLOB_STORE_TYPE
+    blob_store_directory: str = ADMYRAL_BLOB_STORE_DIRECTORY
+    blob_offload_threshold_bytes: int = ADMYRAL_BLOB_OFFLOAD_THRESHOLD_BYTES
+    # blobs which are not referenced by any workflow run anymore are deleted by the
+    # workers. blobs younger than the grace period are kept because their reference
+    # might not be stored yet.
+    blob_gc_interval: int = 60 * 60  # 1 hour
+    blob_gc_grace_period_seconds: int = 60 * 60  # 1 hour
     posthog_api_key: str = ADMYRAL_POSTHOG_API_KEY
     posthog_host: str = ADMYRAL_POSTHOG_HOST
     environment: str = ADMYRAL_ENV
@@ -164,6 +397,51 @@ class GlobalConfig(BaseModel):
 
     pip_lockfile_cache_cleanup_interval: int = 60 * 60 * 24  # 1 day
 
+    # interval in seconds in which the API server and the workers log their metrics
+    metrics_log_interval: int = 60
+
+    # retention of workflow runs
+    run_retention_days: int | None = ADMYRAL_RUN_RETENTION_DAYS
+    # per-workflow overrides keyed by workflow id. None keeps the runs forever.
+    run_retention_days_by_workflow: dict[str, int | None] = {}
+    run_retention_interval: int = 60 * 60  # 1 hour
+    run_retention_batch_size: int = 500
+    run_archive_directory: str | None = ADMYRAL_RUN_ARCHIVE_DIRECTORY
+
+    # previous versions of workflows are retained for queued runs which were started
+    # by reference. versions are kept at least as long as the runs.
+    workflow_version_retention_days: int = 30
+    workflow_version_cleanup_interval: int = 60 * 60 * 24  # 1 day
+
+    # batching of step results and errors in the workers
+    step_result_batch_size: int = 100
+    step_result_flush_interval_ms: int = 20
+
+    # dispatching of the webhook ingestion queue
+    webhook_fast_ack: bool = ADMYRAL_WEBHOOK_FAST_ACK
+    webhook_dispatch_batch_size: int = 100
+    webhook_dispatch_concurrency: int = 16
+    webhook_dispatch_poll_interval_ms: int = 200
+    webhook_dispatch_lease_seconds: int = 60
+    webhook_dispatch_max_attempts: int = 10
+    # must be well below the lease. otherwise, the lease of a batch might expire
+    # while its events are still being started.
+    webhook_dispatch_start_timeout_seconds: int = 5
+    # events which reached the maximum number of attempts are kept for inspection
+    # and deleted afterwards
+    webhook_failed_event_retention_days: int = 7
+    webhook_failed_event_cleanup_interval: int = 60 * 60  # 1 hour
+
+    # bulk webhook triggers
+    webhook_bulk_max_events: int = 1000
+    webhook_bulk_concurrency: int = 16
+
+    # workflow starts with the same idempotency key within this many seconds of the
+    # first start are rejected as duplicates. the keys are stored in the database
+    # and deleted after they expired.
+    idempotency_window_seconds: int = 60 * 60 * 24  # 1 day
+    idempotency_key_cleanup_interval: int = 60 * 60  # 1 hour
+
 
 def load_local_config() -> GlobalConfig:
     """
@@ -233,6 +511,14 @@ SECRETS_ENCRYPTION_KEY = bytes.fromhex(
         "834f01cf391c972f1e6def3d7f315f8194bb10048e5cf282aa4cba63b239d8fb",
     )
 )
+# Comma-separated hex keys which were previously used to encrypt secrets. Secrets
+# encrypted with these keys can still be decrypted while the keys are rotated.
+ENV_ADMYRAL_SECRETS_DECRYPTION_KEYS = "ADMYRAL_SECRETS_DECRYPTION_KEYS"
+SECRETS_DECRYPTION_KEYS = [
+    bytes.fromhex(key.strip())
+    for key in os.getenv(ENV_ADMYRAL_SECRETS_DECRYPTION_KEYS, "").split(",")
+    if key.strip()
+]
 
 
 API_V1_STR = "/api/v1"
@@ -247,6 +533,13 @@ AUTH_SECRET = os.getenv(
     ENV_ADMYRAL_AUTH_SECRET, "QzkuVCn7OGfkpoX98aOxf2tc3kFX8pZs71N1wHPo8NM="
 )
 
+ENV_ADMYRAL_AUTH_CACHE_TTL_IN_SECONDS = "ADMYRAL_AUTH_CACHE_TTL_IN_SECONDS"
+# Resolved API keys and JWTs are cached in the API server. Deleted API keys and users
+# are invalidated immediately in the same API server and after the TTL in other
+# API server replicas. 0 disables the cache.
+AUTH_CACHE_TTL_IN_SECONDS = int(os.getenv(ENV_ADMYRAL_AUTH_CACHE_TTL_IN_SECONDS, "30"))
+AUTH_CACHE_SIZE = 10_000
+
 
 TEST_USER_ID = "a2f038f1-e35b-4509-bcc4-c08bd0e481a6"
 
@@ -1,13 +1,16 @@
 from typing import Any, AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select, delete, insert, update
-from datetime import datetime
+from sqlalchemy import exists, tuple_, func, case
+from datetime import datetime, timedelta
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from contextlib import asynccontextmanager
 from uuid import uuid4
 import json
+import time
 
 from admyral.models import (
     User,
@@ -19,11 +22,18 @@ from admyral.models import (
     EncryptedSecret,
     WorkflowMetadata,
     ActionMetadata,
+    ActionEnvironmentStatus,
     SecretMetadata,
     WorkflowRunMetadata,
     WorkflowRunStepMetadata,
     WorkflowRunStep,
+    WorkflowRunStepUpdate,
+    WorkflowRunExport,
+    WorkflowRunArchive,
     ApiKey,
+    WebhookEvent,
+    WebhookIngestionQueueStats,
+    IdempotencyKeyClaim,
 )
 from admyral.models.workflow_schedule import WorkflowSchedule
 from admyral.db.store_interface import StoreInterface
@@ -33,18 +43,27 @@ from admyral.db.schemas import (
     WorkflowSchema,
     WorkflowRunSchema,
     WorkflowRunStepsSchema,
+    WorkflowRunStepLogsSchema,
+    WorkflowRunBlobSchema,
+    WorkflowVersionSchema,
     WorkflowWebhookSchema,
     WorkflowScheduleSchema,
     SecretsSchema,
     UserSchema,
     ApiKeySchema,
     WorkflowControlResultsSchema,
+    WebhookEventSchema,
+    IdempotencyKeySchema,
 )
 from admyral.db.alembic.database_manager import DatabaseManager
-from admyral.config.config import GlobalConfig, CONFIG
+from admyral.db.pool_metrics import PoolMetricsCollector, DatabasePoolMetrics
+from admyral.config.config import GlobalConfig, CONFIG, DatabasePoolProfile
 from admyral.logger import get_logger
 from admyral.utils.time import utc_now
 from admyral.utils.crypto import generate_hs256
+from admyral.utils.hash import calculate_sha256
+from admyral.utils.pagination import encode_cursor, decode_cursor
+from admyral.utils.json import json_dumps, json_loads
 from admyral.typings import JsonValue
 
 
@@ -69,17 +88,51 @@ class AdmyralDatabaseSession:
             statement, execution_options=self.execution_options
         )
 
+    async def stream(self, statement: Any) -> Any:
+        return await self.session.stream(
+            statement, execution_options=self.execution_options
+        )
+
     async def commit(self) -> None:
         await self.session.commit()
 
 
+SLOW_POOL_CHECKOUT_THRESHOLD_MS = 100
+
+
 class AdmyralStore(StoreInterface):
-    def __init__(self, config: GlobalConfig) -> None:
+    def __init__(
+        self,
+        config: GlobalConfig,
+        profile: DatabasePoolProfile = DatabasePoolProfile.API,
+    ) -> None:
         self.config = config
 
+        pool_config = (
+            self.config.worker_database_pool
+            if profile == DatabasePoolProfile.WORKER
+            else self.config.api_database_pool
+        )
+        connect_args = {}
+        if pool_config.statement_timeout_ms:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(pool_config.statement_timeout_ms)
+            }
+
         self.engine = create_async_engine(
-            self.config.database_url, echo=True, future=True, pool_pre_ping=True
+            self.config.database_url,
+            echo=pool_config.echo,
+            future=True,
+            pool_pre_ping=True,
+            pool_size=pool_config.pool_size,
+            max_overflow=pool_config.max_overflow,
+            pool_recycle=pool_config.pool_recycle,
+            pool_timeout=pool_config.pool_timeout,
+            connect_args=connect_args,
+            json_serializer=json_dumps,
+            json_deserializer=json_loads,
         )
+        self.pool_metrics = PoolMetricsCollector()
         self.async_session_maker = sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
@@ -90,8 +143,12 @@ class AdmyralStore(StoreInterface):
 
     # TODO: pass down config
     @classmethod
-    async def create_store(cls, skip_setup: bool = False) -> "AdmyralStore":
-        store = cls(CONFIG)
+    async def create_store(
+        cls,
+        skip_setup: bool = False,
+        profile: DatabasePoolProfile = DatabasePoolProfile.API,
+    ) -> "AdmyralStore":
+        store = cls(CONFIG, profile)
         if not skip_setup:
             await store.setup()
         store.performed_setup = True
@@ -123,16 +180,46 @@ class AdmyralStore(StoreInterface):
     # Helpers
     ########################################################
 
+    def get_pool_metrics(self) -> DatabasePoolMetrics:
+        return self.pool_metrics.snapshot(self.engine.sync_engine.pool)
+
     @asynccontextmanager
     async def _get_async_session(self) -> AsyncGenerator[AdmyralDatabaseSession, None]:
         assert self.performed_setup, "Store has not been set up yet."
         async with self.async_session_maker() as session:
+            # check out the connection eagerly to measure the time spent waiting on the pool
+            start = time.monotonic_ns()
+            await session.connection()
+            wait_ns = time.monotonic_ns() - start
+            self.pool_metrics.record_checkout(wait_ns)
+            if wait_ns > SLOW_POOL_CHECKOUT_THRESHOLD_MS * 1_000_000:
+                logger.warning(
+                    f"Waited {wait_ns // 1_000_000}ms for a database connection."
+                )
+
             db = await AdmyralDatabaseSession.from_session(
                 session,
                 self.execution_options,
             )
             yield db
 
+    @asynccontextmanager
+    async def try_advisory_lock(self, lock_id: int) -> AsyncGenerator[bool, None]:
+        """
+        Tries to acquire the session-level advisory lock with the given id without
+        waiting. Yields whether the lock was acquired. The lock is held on the same
+        connection until the context is exited. If the connection is lost, Postgres
+        releases the lock.
+        """
+        async with self._get_async_session() as db:
+            result = await db.exec(select(func.pg_try_advisory_lock(lock_id)))
+            is_acquired = result.one()
+            try:
+                yield is_acquired
+            finally:
+                if is_acquired:
+                    await db.exec(select(func.pg_advisory_unlock(lock_id)))
+
     ########################################################
     # User Management
     ########################################################
@@ -280,6 +367,7 @@ class AdmyralStore(StoreInterface):
                         secrets_placeholders=secrets_placeholders,
                         requirements=requirements,
                         arguments=[arg.model_dump() for arg in action.arguments],
+                        environment_status=ActionEnvironmentStatus.PENDING.value,
                         updated_at=utc_now(),
                     )
                 )
@@ -296,11 +384,32 @@ class AdmyralStore(StoreInterface):
                         secrets_placeholders=secrets_placeholders,
                         requirements=requirements,
                         arguments=[arg.model_dump() for arg in action.arguments],
+                        environment_status=ActionEnvironmentStatus.PENDING.value,
                     )
                 )
 
             await db.commit()
 
+    async def set_action_environment_status(
+        self,
+        user_id: str,
+        action_type: str,
+        requirements: list[str] | None,
+        environment_status: ActionEnvironmentStatus,
+    ) -> None:
+        async with self._get_async_session() as db:
+            # only update the status if the action was not pushed with different
+            # requirements in the meantime.
+            requirements = ";".join(requirements) if requirements else None
+            await db.exec(
+                update(PythonActionSchema)
+                .where(PythonActionSchema.action_type == action_type)
+                .where(PythonActionSchema.user_id == user_id)
+                .where(PythonActionSchema.requirements == requirements)
+                .values(environment_status=environment_status.value)
+            )
+            await db.commit()
+
     async def delete_action(self, user_id: str, action_type: str) -> None:
         async with self._get_async_session() as db:
             await db.exec(
@@ -383,6 +492,84 @@ class AdmyralStore(StoreInterface):
     # Workflows
     ########################################################
 
+    def _serialize_execution_plan(self, workflow: Workflow) -> JsonValue:
+        return (
+            workflow.execution_plan.model_dump()
+            if workflow.execution_plan is not None
+            else None
+        )
+
+    def _calculate_version_hash(self, workflow_dag: JsonValue) -> str:
+        return calculate_sha256(json.dumps(workflow_dag, sort_keys=True))
+
+    async def _store_workflow_version(
+        self, db: AdmyralDatabaseSession, workflow: Workflow, workflow_dag: JsonValue
+    ) -> None:
+        # pushing a previous version again renews its retention
+        await db.exec(
+            pg_insert(WorkflowVersionSchema)
+            .values(
+                workflow_id=workflow.workflow_id,
+                version_hash=self._calculate_version_hash(workflow_dag),
+                workflow_name=workflow.workflow_name,
+                workflow_dag=workflow_dag,
+                execution_plan=self._serialize_execution_plan(workflow),
+            )
+            .on_conflict_do_update(
+                index_elements=[
+                    WorkflowVersionSchema.workflow_id,
+                    WorkflowVersionSchema.version_hash,
+                ],
+                set_=dict(updated_at=utc_now()),
+            )
+        )
+
+    async def get_workflow_version(
+        self, user_id: str, workflow_id: str, version_hash: str
+    ) -> Workflow | None:
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                select(WorkflowVersionSchema, WorkflowSchema.is_active)
+                .join(
+                    WorkflowSchema,
+                    WorkflowSchema.workflow_id == WorkflowVersionSchema.workflow_id,
+                )
+                .where(WorkflowSchema.user_id == user_id)
+                .where(WorkflowVersionSchema.workflow_id == workflow_id)
+                .where(WorkflowVersionSchema.version_hash == version_hash)
+            )
+            version_and_is_active = result.one_or_none()
+            if not version_and_is_active:
+                return None
+            version, is_active = version_and_is_active
+            return version.to_model(is_active=is_active)
+
+    async def delete_workflow_versions(self, pushed_before: datetime) -> int:
+        """
+        Deletes the versions which were last pushed before the given time. The
+        current version of a workflow is always retained.
+
+        Returns:
+            The number of deleted versions.
+        """
+        async with self._get_async_session() as db:
+            current_version_hashes = select(WorkflowSchema.version_hash).where(
+                WorkflowSchema.workflow_id == WorkflowVersionSchema.workflow_id
+            )
+            result = await db.exec(
+                delete(WorkflowVersionSchema)
+                .where(WorkflowVersionSchema.updated_at < pushed_before)
+                .where(
+                    WorkflowVersionSchema.version_hash.not_in(
+                        current_version_hashes.scalar_subquery()
+                    )
+                )
+                .returning(WorkflowVersionSchema.version_hash)
+            )
+            num_deleted_versions = len(result.all())
+            await db.commit()
+            return num_deleted_versions
+
     async def list_workflows(self, user_id: str) -> list[WorkflowMetadata]:
         async with self._get_async_session() as db:
             # TODO: loading all workflows just for the metadata
@@ -427,6 +614,8 @@ class AdmyralStore(StoreInterface):
             return wf.to_model() if wf else None
 
     async def create_workflow(self, user_id: str, workflow: Workflow) -> None:
+        workflow_dag = workflow.workflow_dag.model_dump()
+
         async with self._get_async_session() as db:
             existing_workflow = await self._get_workflow_by_name(
                 db, user_id, workflow.workflow_name
@@ -439,14 +628,19 @@ class AdmyralStore(StoreInterface):
                     workflow_id=workflow.workflow_id,
                     user_id=user_id,
                     workflow_name=workflow.workflow_name,
-                    workflow_dag=workflow.workflow_dag.model_dump(),
+                    workflow_dag=workflow_dag,
                     is_active=workflow.is_active,
+                    execution_plan=self._serialize_execution_plan(workflow),
+                    version_hash=self._calculate_version_hash(workflow_dag),
                 )
             )
+            await self._store_workflow_version(db, workflow, workflow_dag)
 
             await db.commit()
 
     async def store_workflow(self, user_id: str, workflow: Workflow) -> None:
+        workflow_dag = workflow.workflow_dag.model_dump()
+
         async with self._get_async_session() as db:
             # if the workflow already exists, we update the workflow dag.
             stored_workflow = await self._get_workflow_by_id(
@@ -460,8 +654,10 @@ class AdmyralStore(StoreInterface):
                     .where(WorkflowSchema.workflow_id == workflow.workflow_id)
                     .values(
                         workflow_name=workflow.workflow_name,  # consider workflow name changes
-                        workflow_dag=workflow.workflow_dag.model_dump(),
+                        workflow_dag=workflow_dag,
                         is_active=workflow.is_active,
+                        execution_plan=self._serialize_execution_plan(workflow),
+                        version_hash=self._calculate_version_hash(workflow_dag),
                     )
                 )
             else:
@@ -470,10 +666,13 @@ class AdmyralStore(StoreInterface):
                         workflow_id=workflow.workflow_id,
                         user_id=user_id,
                         workflow_name=workflow.workflow_name,
-                        workflow_dag=workflow.workflow_dag.model_dump(),
+                        workflow_dag=workflow_dag,
                         is_active=workflow.is_active,
+                        execution_plan=self._serialize_execution_plan(workflow),
+                        version_hash=self._calculate_version_hash(workflow_dag),
                     )
                 )
+            await self._store_workflow_version(db, workflow, workflow_dag)
 
             await db.commit()
 
@@ -598,6 +797,231 @@ class AdmyralStore(StoreInterface):
             )
             await db.commit()
 
+    ########################################################
+    # Webhook Ingestion Queue
+    ########################################################
+
+    async def enqueue_webhook_events(
+        self,
+        webhook_id: str,
+        payloads: list[dict[str, JsonValue]],
+        idempotency_keys: list[str | None] | None = None,
+    ) -> None:
+        if not payloads:
+            return
+        if idempotency_keys is None:
+            idempotency_keys = [None] * len(payloads)
+        async with self._get_async_session() as db:
+            await db.exec(
+                insert(WebhookEventSchema).values(
+                    [
+                        {
+                            "webhook_id": webhook_id,
+                            "payload": payload,
+                            "attempts": 0,
+                            "idempotency_key": idempotency_key,
+                        }
+                        for payload, idempotency_key in zip(payloads, idempotency_keys)
+                    ]
+                )
+            )
+            await db.commit()
+
+    async def claim_webhook_events(
+        self, limit: int, lease_seconds: int, max_attempts: int
+    ) -> list[WebhookEvent]:
+        """
+        Claims due events by moving their next attempt behind a lease. Events of a
+        crashed dispatcher become due again once the lease expired.
+        """
+        async with self._get_async_session() as db:
+            due_event_ids = (
+                select(WebhookEventSchema.event_id)
+                .where(WebhookEventSchema.next_attempt_at <= func.now())
+                .where(WebhookEventSchema.attempts < max_attempts)
+                .order_by(WebhookEventSchema.event_id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.exec(
+                update(WebhookEventSchema)
+                .where(WebhookEventSchema.event_id.in_(due_event_ids))
+                .values(
+                    next_attempt_at=func.now() + timedelta(seconds=lease_seconds),
+                    updated_at=utc_now(),
+                )
+                .returning(
+                    WebhookEventSchema.event_id,
+                    WebhookEventSchema.webhook_id,
+                    WebhookEventSchema.payload,
+                    WebhookEventSchema.attempts,
+                    WebhookEventSchema.idempotency_key,
+                )
+            )
+            events = [
+                WebhookEvent(
+                    event_id=event_id,
+                    webhook_id=webhook_id,
+                    payload=payload,
+                    attempts=attempts,
+                    idempotency_key=idempotency_key,
+                )
+                for event_id, webhook_id, payload, attempts, idempotency_key in result.all()
+            ]
+            await db.commit()
+            return sorted(events, key=lambda event: event.event_id)
+
+    async def complete_webhook_events(self, event_ids: list[int]) -> None:
+        if not event_ids:
+            return
+        async with self._get_async_session() as db:
+            await db.exec(
+                delete(WebhookEventSchema).where(
+                    WebhookEventSchema.event_id.in_(event_ids)
+                )
+            )
+            await db.commit()
+
+    async def fail_webhook_event(
+        self, event_id: int, error: str, retry_in_seconds: int
+    ) -> None:
+        async with self._get_async_session() as db:
+            await db.exec(
+                update(WebhookEventSchema)
+                .where(WebhookEventSchema.event_id == event_id)
+                .values(
+                    attempts=WebhookEventSchema.attempts + 1,
+                    next_attempt_at=func.now() + timedelta(seconds=retry_in_seconds),
+                    last_error=error,
+                    updated_at=utc_now(),
+                )
+            )
+            await db.commit()
+
+    async def delete_failed_webhook_events(
+        self, max_attempts: int, failed_before: datetime
+    ) -> int:
+        """
+        Deletes events which reached the maximum number of attempts before the given
+        time.
+
+        Returns:
+            The number of deleted events.
+        """
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                delete(WebhookEventSchema)
+                .where(WebhookEventSchema.attempts >= max_attempts)
+                .where(WebhookEventSchema.updated_at < failed_before)
+                .returning(WebhookEventSchema.event_id)
+            )
+            num_deleted_events = len(result.all())
+            await db.commit()
+            return num_deleted_events
+
+    async def get_webhook_ingestion_queue_stats(
+        self, max_attempts: int
+    ) -> WebhookIngestionQueueStats:
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                select(
+                    func.count(WebhookEventSchema.event_id).filter(
+                        WebhookEventSchema.attempts < max_attempts
+                    ),
+                    func.count(WebhookEventSchema.event_id).filter(
+                        WebhookEventSchema.attempts >= max_attempts
+                    ),
+                    func.min(WebhookEventSchema.created_at).filter(
+                        WebhookEventSchema.attempts < max_attempts
+                    ),
+                )
+            )
+            pending_events, failed_events, oldest_created_at = result.one()
+            return WebhookIngestionQueueStats(
+                pending_events=pending_events,
+                failed_events=failed_events,
+                oldest_pending_event_created_at=oldest_created_at,
+            )
+
+    ########################################################
+    # Idempotency Keys
+    ########################################################
+
+    async def claim_idempotency_key(
+        self, key: str, temporal_workflow_id: str, window_seconds: int
+    ) -> IdempotencyKeyClaim:
+        """
+        Claims the idempotency key for a workflow start with the given Temporal
+        workflow id. If the key is already claimed and not expired, the key is left
+        untouched and the existing claim is returned instead.
+        """
+        async with self._get_async_session() as db:
+            now = utc_now()
+            stmt = pg_insert(IdempotencyKeySchema).values(
+                key=key,
+                temporal_workflow_id=temporal_workflow_id,
+                is_started=False,
+                expires_at=now + timedelta(seconds=window_seconds),
+            )
+            # an expired key is claimed again. otherwise, the existing claim is kept.
+            is_expired = IdempotencyKeySchema.expires_at <= now
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={
+                    column: case(
+                        (is_expired, stmt.excluded[column]),
+                        else_=getattr(IdempotencyKeySchema, column),
+                    )
+                    for column in [
+                        "temporal_workflow_id",
+                        "is_started",
+                        "expires_at",
+                        "created_at",
+                    ]
+                },
+            ).returning(
+                IdempotencyKeySchema.temporal_workflow_id,
+                IdempotencyKeySchema.is_started,
+            )
+            result = await db.exec(stmt)
+            temporal_workflow_id, is_started = result.one()
+            await db.commit()
+            return IdempotencyKeyClaim(
+                temporal_workflow_id=temporal_workflow_id, is_started=is_started
+            )
+
+    async def mark_idempotency_key_started(
+        self, key: str, temporal_workflow_id: str
+    ) -> None:
+        async with self._get_async_session() as db:
+            await db.exec(
+                update(IdempotencyKeySchema)
+                .where(IdempotencyKeySchema.key == key)
+                .where(
+                    IdempotencyKeySchema.temporal_workflow_id == temporal_workflow_id
+                )
+                .values(is_started=True, updated_at=func.now())
+            )
+            await db.commit()
+
+    async def delete_expired_idempotency_keys(self) -> int:
+        """
+        Deletes the idempotency keys whose window has expired.
+
+        Returns:
+            The number of deleted keys.
+        """
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                delete(IdempotencyKeySchema)
+                .where(IdempotencyKeySchema.expires_at <= utc_now())
+                .returning(IdempotencyKeySchema.key)
+            )
+            num_deleted_keys = len(result.all())
+            await db.commit()
+            return num_deleted_keys
+
     ########################################################
     # Workflow Schedules
     ########################################################
@@ -644,29 +1068,131 @@ class AdmyralStore(StoreInterface):
     # Workflow Runs - User Facing
     ########################################################
 
+    # The ownership checks below are EXISTS clauses with primary key lookups instead
+    # of joins. Hence, the run and step queries are driven by the indexes on
+    # workflow_runs(workflow_id, created_at) and workflow_run_steps(run_id, created_at).
+
+    def _is_workflow_owned_by(self, user_id: str, workflow_id: str) -> Any:
+        return (
+            exists()
+            .where(WorkflowSchema.workflow_id == workflow_id)
+            .where(WorkflowSchema.user_id == user_id)
+        )
+
+    def _is_workflow_run_owned_by(
+        self, user_id: str, workflow_id: str, run_id: str
+    ) -> Any:
+        return (
+            exists()
+            .where(WorkflowRunSchema.run_id == run_id)
+            .where(WorkflowRunSchema.workflow_id == workflow_id)
+            .where(self._is_workflow_owned_by(user_id, workflow_id))
+        )
+
     async def list_workflow_runs(
-        self, user_id: str, workflow_id: str, limit: int = 100
+        self,
+        user_id: str,
+        workflow_id: str,
+        limit: int = 100,
+        cursor: str | None = None,
     ) -> list[WorkflowRunMetadata]:
-        async with self._get_async_session() as db:
-            result = await db.exec(
-                select(WorkflowRunSchema)
-                .join(WorkflowSchema)
-                .where(WorkflowSchema.user_id == user_id)
-                .where(WorkflowRunSchema.workflow_id == workflow_id)
-                .order_by(WorkflowRunSchema.created_at.desc())
-                .limit(limit)
+        """
+        Lists the workflow runs from newest to oldest. Pass the cursor of the last
+        run of the previous page to fetch the next page (keyset on created_at, run_id).
+        """
+        query = (
+            select(WorkflowRunSchema)
+            .where(WorkflowRunSchema.workflow_id == workflow_id)
+            .where(self._is_workflow_owned_by(user_id, workflow_id))
+            .order_by(
+                WorkflowRunSchema.created_at.desc(), WorkflowRunSchema.run_id.desc()
+            )
+            .limit(limit)
+        )
+        if cursor:
+            created_at, run_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(WorkflowRunSchema.created_at, WorkflowRunSchema.run_id)
+                < tuple_(created_at, run_id)
             )
+
+        async with self._get_async_session() as db:
+            result = await db.exec(query)
             return [workflow_run.to_metadata() for workflow_run in result.all()]
 
+    async def export_workflow_runs(
+        self,
+        user_id: str,
+        workflow_id: str,
+        include_steps: bool = True,
+        page_size: int = 500,
+    ) -> AsyncGenerator[WorkflowRunExport, None]:
+        """
+        Iterates over all workflow runs from newest to oldest page by page. Every
+        page is fetched in a short-lived session, hence, the export does not keep a
+        connection checked out while the consumer processes the runs.
+        """
+        cursor = None
+        while True:
+            workflow_runs = await self.list_workflow_runs(
+                user_id, workflow_id, limit=page_size, cursor=cursor
+            )
+            if not workflow_runs:
+                return
+
+            steps_by_run_id = {}
+            if include_steps:
+                async with self._get_async_session() as db:
+                    result = await db.exec(
+                        select(
+                            WorkflowRunStepsSchema.run_id,
+                            WorkflowRunStepsSchema.step_id,
+                            WorkflowRunStepsSchema.action_type,
+                            WorkflowRunStepsSchema.error,
+                            WorkflowRunStepsSchema.created_at,
+                        )
+                        .where(
+                            WorkflowRunStepsSchema.run_id.in_(
+                                [workflow_run.run_id for workflow_run in workflow_runs]
+                            )
+                        )
+                        .order_by(
+                            WorkflowRunStepsSchema.run_id,
+                            WorkflowRunStepsSchema.created_at,
+                        )
+                    )
+                    for row in result.all():
+                        steps_by_run_id.setdefault(row[0], []).append(
+                            WorkflowRunStepMetadata(
+                                step_id=row[1],
+                                action_type=row[2],
+                                error=row[3],
+                                created_at=row[4],
+                            )
+                        )
+
+            for workflow_run in workflow_runs:
+                yield WorkflowRunExport(
+                    **workflow_run.model_dump(),
+                    steps=steps_by_run_id.get(workflow_run.run_id, [])
+                    if include_steps
+                    else None,
+                )
+
+            if len(workflow_runs) < page_size:
+                return
+            cursor = encode_cursor(
+                workflow_runs[-1].created_at, workflow_runs[-1].run_id
+            )
+
     async def _get_workflow_run(
         self, db: AdmyralDatabaseSession, user_id: str, workflow_id: str, run_id: str
     ) -> WorkflowRunSchema | None:
         result = await db.exec(
             select(WorkflowRunSchema)
-            .join(WorkflowSchema)
-            .where(WorkflowSchema.user_id == user_id)
-            .where(WorkflowRunSchema.workflow_id == workflow_id)
             .where(WorkflowRunSchema.run_id == run_id)
+            .where(WorkflowRunSchema.workflow_id == workflow_id)
+            .where(self._is_workflow_owned_by(user_id, workflow_id))
         )
         return result.one_or_none()
 
@@ -680,26 +1206,50 @@ class AdmyralStore(StoreInterface):
             return workflow_run.to_model() if workflow_run else None
 
     async def list_workflow_run_steps(
-        self, user_id: str, workflow_id: str, run_id: str
+        self,
+        user_id: str,
+        workflow_id: str,
+        run_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
     ) -> list[WorkflowRunStepMetadata]:
-        async with self._get_async_session() as db:
-            result = await db.exec(
-                select(
-                    WorkflowRunStepsSchema.step_id,
-                    WorkflowRunStepsSchema.action_type,
-                    WorkflowRunStepsSchema.error,
+        """
+        Lists the steps of a workflow run in execution order. Pass the cursor of the
+        last step of the previous page to fetch the next page (keyset on created_at,
+        step_id).
+        """
+        query = (
+            select(
+                WorkflowRunStepsSchema.step_id,
+                WorkflowRunStepsSchema.action_type,
+                WorkflowRunStepsSchema.error,
+                WorkflowRunStepsSchema.created_at,
+            )
+            .where(WorkflowRunStepsSchema.run_id == run_id)
+            .where(self._is_workflow_run_owned_by(user_id, workflow_id, run_id))
+            .order_by(WorkflowRunStepsSchema.created_at, WorkflowRunStepsSchema.step_id)
+        )
+        if cursor:
+            created_at, step_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(
+                    WorkflowRunStepsSchema.created_at, WorkflowRunStepsSchema.step_id
                 )
-                .join(WorkflowRunSchema)
-                .join(WorkflowSchema)
-                .where(WorkflowRunSchema.workflow_id == workflow_id)
-                .where(WorkflowSchema.user_id == user_id)
-                .where(WorkflowSchema.workflow_id == workflow_id)
-                .where(WorkflowRunStepsSchema.run_id == run_id)
-                .order_by(WorkflowRunStepsSchema.created_at)
+                > tuple_(created_at, step_id)
             )
+        if limit is not None:
+            query = query.limit(limit)
+
+        async with self._get_async_session() as db:
+            result = await db.exec(query)
             return [
                 WorkflowRunStepMetadata.model_validate(
-                    {"step_id": row[0], "action_type": row[1], "error": row[2]}
+                    {
+                        "step_id": row[0],
+                        "action_type": row[1],
+                        "error": row[2],
+                        "created_at": row[3],
+                    }
                 )
                 for row in result.all()
             ]
@@ -714,13 +1264,9 @@ class AdmyralStore(StoreInterface):
     ) -> WorkflowRunStepsSchema | None:
         result = await db.exec(
             select(WorkflowRunStepsSchema)
-            .join(WorkflowRunSchema)
-            .join(WorkflowSchema)
-            .where(WorkflowRunSchema.run_id == run_id)
-            .where(WorkflowRunSchema.workflow_id == workflow_id)
-            .where(WorkflowSchema.workflow_id == workflow_id)
-            .where(WorkflowSchema.user_id == user_id)
             .where(WorkflowRunStepsSchema.step_id == step_id)
+            .where(WorkflowRunStepsSchema.run_id == run_id)
+            .where(self._is_workflow_run_owned_by(user_id, workflow_id, run_id))
         )
         return result.one_or_none()
 
@@ -731,7 +1277,61 @@ class AdmyralStore(StoreInterface):
             workflow_run_step = await self._get_workflow_run_step(
                 db, user_id, workflow_id, run_id, step_id
             )
-            return workflow_run_step.to_model() if workflow_run_step else None
+            if not workflow_run_step:
+                return None
+
+            log_chunks = await db.exec(
+                select(WorkflowRunStepLogsSchema.logs)
+                .where(WorkflowRunStepLogsSchema.step_id == step_id)
+                .order_by(WorkflowRunStepLogsSchema.log_id)
+            )
+            logs = self._stitch_logs(workflow_run_step.logs, log_chunks.all())
+            return workflow_run_step.to_model(logs=logs)
+
+    def _stitch_logs(
+        self, legacy_logs: str | None, log_chunks: list[str]
+    ) -> str | None:
+        # steps created before log chunks were introduced store their logs inline
+        if legacy_logs:
+            log_chunks = [legacy_logs] + list(log_chunks)
+        return "\n".join(log_chunks) if log_chunks else None
+
+    async def stream_workflow_run_step_logs(
+        self, user_id: str, workflow_id: str, run_id: str, step_id: str
+    ) -> AsyncGenerator[str, None]:
+        """
+        Streams the logs of a workflow run step chunk by chunk without loading
+        all of them into memory.
+
+        Raises:
+            ValueError: If the step does not exist or is not owned by the user. The
+                error is raised before the first chunk is yielded.
+        """
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                select(WorkflowRunStepsSchema.step_id, WorkflowRunStepsSchema.logs)
+                .where(WorkflowRunStepsSchema.step_id == step_id)
+                .where(WorkflowRunStepsSchema.run_id == run_id)
+                .where(self._is_workflow_run_owned_by(user_id, workflow_id, run_id))
+            )
+            step = result.one_or_none()
+            if not step:
+                raise ValueError(f"Workflow run step {step_id} not found.")
+
+            is_first_chunk = True
+            legacy_logs = step[1]
+            if legacy_logs:
+                yield legacy_logs
+                is_first_chunk = False
+
+            log_chunks = await db.stream(
+                select(WorkflowRunStepLogsSchema.logs)
+                .where(WorkflowRunStepLogsSchema.step_id == step_id)
+                .order_by(WorkflowRunStepLogsSchema.log_id)
+            )
+            async for log_chunk in log_chunks.scalars():
+                yield log_chunk if is_first_chunk else "\n" + log_chunk
+                is_first_chunk = False
 
     ########################################################
     # Workflow Runs - State Updates during execution
@@ -775,19 +1375,6 @@ class AdmyralStore(StoreInterface):
             )
             await db.commit()
 
-    async def _get_workflow_step_without_user_id(
-        self,
-        db: AdmyralDatabaseSession,
-        run_id: str,
-        step_id: str,
-    ) -> WorkflowRunStepsSchema | None:
-        result = await db.exec(
-            select(WorkflowRunStepsSchema)
-            .where(WorkflowRunStepsSchema.step_id == step_id)
-            .where(WorkflowRunStepsSchema.run_id == run_id)
-        )
-        return result.one_or_none()
-
     async def append_logs(
         self,
         step_id: str,
@@ -796,27 +1383,25 @@ class AdmyralStore(StoreInterface):
         prev_step_id: str,
         lines: list[str],
     ) -> None:
+        # Logs are stored append-only as separate chunks. Hence, appending does not
+        # need to read or rewrite the logs which were already written.
         async with self._get_async_session() as db:
-            workflow_run_step = await self._get_workflow_step_without_user_id(
-                db, run_id, step_id
-            )
-
-            if not workflow_run_step:
-                await db.exec(
-                    insert(WorkflowRunStepsSchema).values(
-                        step_id=step_id,
-                        run_id=run_id,
-                        action_type=action_type,
-                        prev_step_id=prev_step_id,
-                        logs="\n".join(lines),
-                    )
+            await db.exec(
+                pg_insert(WorkflowRunStepsSchema)
+                .values(
+                    step_id=step_id,
+                    run_id=run_id,
+                    action_type=action_type,
+                    prev_step_id=prev_step_id,
                 )
-            else:
-                await db.exec(
-                    update(WorkflowRunStepsSchema)
-                    .where(WorkflowRunStepsSchema.step_id == step_id)
-                    .values(logs=workflow_run_step.logs + "\n" + "\n".join(lines))
+                .on_conflict_do_nothing(index_elements=[WorkflowRunStepsSchema.step_id])
+            )
+            await db.exec(
+                insert(WorkflowRunStepLogsSchema).values(
+                    step_id=step_id,
+                    logs="\n".join(lines),
                 )
+            )
             await db.commit()
 
     async def store_action_result(
@@ -828,32 +1413,18 @@ class AdmyralStore(StoreInterface):
         result: JsonValue,
         input_args: dict[str, JsonValue],
     ) -> None:
-        async with self._get_async_session() as db:
-            workflow_run_step = await self._get_workflow_step_without_user_id(
-                db, run_id, step_id
-            )
-
-            if not workflow_run_step:
-                await db.exec(
-                    insert(WorkflowRunStepsSchema).values(
-                        step_id=step_id,
-                        run_id=run_id,
-                        action_type=action_type,
-                        prev_step_id=prev_step_id,
-                        result=result,
-                        input_args=input_args,
-                    )
-                )
-            else:
-                await db.exec(
-                    update(WorkflowRunStepsSchema)
-                    .where(WorkflowRunStepsSchema.step_id == step_id)
-                    .values(
-                        result=result,
-                        input_args=input_args,
-                    )
+        await self.store_workflow_run_steps(
+            [
+                WorkflowRunStepUpdate(
+                    step_id=step_id,
+                    run_id=run_id,
+                    action_type=action_type,
+                    prev_step_id=prev_step_id,
+                    input_args=input_args,
+                    result=result,
                 )
-            await db.commit()
+            ]
+        )
 
     async def store_workflow_run_error(
         self,
@@ -864,40 +1435,192 @@ class AdmyralStore(StoreInterface):
         error: str,
         input_args: dict[str, JsonValue],
     ) -> None:
+        await self.store_workflow_run_steps(
+            [
+                WorkflowRunStepUpdate(
+                    step_id=step_id,
+                    run_id=run_id,
+                    action_type=action_type,
+                    prev_step_id=prev_step_id,
+                    input_args=input_args,
+                    error=error,
+                )
+            ]
+        )
+
+    def _upsert_workflow_run_steps(
+        self, step_updates: list[WorkflowRunStepUpdate], value_column: str
+    ) -> Any:
+        statement = pg_insert(WorkflowRunStepsSchema).values(
+            [
+                {
+                    "step_id": step_update.step_id,
+                    "run_id": step_update.run_id,
+                    "action_type": step_update.action_type,
+                    "prev_step_id": step_update.prev_step_id,
+                    "input_args": step_update.input_args,
+                    value_column: getattr(step_update, value_column),
+                }
+                for step_update in step_updates
+            ]
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[WorkflowRunStepsSchema.step_id],
+            set_={
+                "input_args": statement.excluded.input_args,
+                value_column: getattr(statement.excluded, value_column),
+            },
+        )
+
+    async def store_workflow_run_steps(
+        self, step_updates: list[WorkflowRunStepUpdate]
+    ) -> None:
+        """
+        Persists the results and errors of multiple steps with a single commit.
+        Existing steps, e.g., created by appending logs, are updated.
+        """
+        # ON CONFLICT DO UPDATE must not affect the same row twice within one
+        # statement, hence, we only keep the latest update per step.
+        results = {}
+        errors = {}
+        for step_update in step_updates:
+            if step_update.error is None:
+                results[step_update.step_id] = step_update
+            else:
+                errors[step_update.step_id] = step_update
+
         async with self._get_async_session() as db:
-            workflow_run_step = await self._get_workflow_step_without_user_id(
-                db, run_id, step_id
-            )
+            if results:
+                await db.exec(
+                    self._upsert_workflow_run_steps(list(results.values()), "result")
+                )
 
-            if not workflow_run_step:
+            if errors:
                 await db.exec(
-                    insert(WorkflowRunStepsSchema).values(
-                        step_id=step_id,
-                        run_id=run_id,
-                        action_type=action_type,
-                        prev_step_id=prev_step_id,
-                        input_args=input_args,
-                        error=error,
-                    )
+                    self._upsert_workflow_run_steps(list(errors.values()), "error")
                 )
-            else:
                 await db.exec(
-                    update(WorkflowRunStepsSchema)
-                    .where(WorkflowRunStepsSchema.step_id == step_id)
-                    .values(
-                        error=error,
-                        input_args=input_args,
+                    update(WorkflowRunSchema)
+                    .where(
+                        WorkflowRunSchema.run_id.in_(
+                            {step_update.run_id for step_update in errors.values()}
+                        )
                     )
+                    .values(failed_at=utc_now())
                 )
 
+            await db.commit()
+
+    ########################################################
+    # Workflow Runs - Retention
+    ########################################################
+
+    async def list_all_workflow_ids(self) -> list[str]:
+        async with self._get_async_session() as db:
+            result = await db.exec(select(WorkflowSchema.workflow_id))
+            return list(result.all())
+
+    async def list_workflow_run_ids_created_before(
+        self, workflow_id: str, created_before: datetime, limit: int
+    ) -> list[str]:
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                select(WorkflowRunSchema.run_id)
+                .where(WorkflowRunSchema.workflow_id == workflow_id)
+                .where(WorkflowRunSchema.created_at < created_before)
+                .order_by(WorkflowRunSchema.created_at)
+                .limit(limit)
+            )
+            return list(result.all())
+
+    async def get_workflow_runs_for_archive(
+        self, run_ids: list[str]
+    ) -> list[WorkflowRunArchive]:
+        async with self._get_async_session() as db:
+            runs_result = await db.exec(
+                select(WorkflowRunSchema).where(WorkflowRunSchema.run_id.in_(run_ids))
+            )
+            workflow_runs = runs_result.all()
+
+            steps_result = await db.exec(
+                select(WorkflowRunStepsSchema)
+                .where(WorkflowRunStepsSchema.run_id.in_(run_ids))
+                .order_by(WorkflowRunStepsSchema.created_at)
+            )
+            steps = steps_result.all()
+
+            logs_result = await db.exec(
+                select(
+                    WorkflowRunStepLogsSchema.step_id, WorkflowRunStepLogsSchema.logs
+                )
+                .where(
+                    WorkflowRunStepLogsSchema.step_id.in_(
+                        [step.step_id for step in steps]
+                    )
+                )
+                .order_by(WorkflowRunStepLogsSchema.log_id)
+            )
+            log_chunks_by_step_id = {}
+            for step_id, log_chunk in logs_result.all():
+                log_chunks_by_step_id.setdefault(step_id, []).append(log_chunk)
+
+        steps_by_run_id = {}
+        for step in steps:
+            logs = self._stitch_logs(
+                step.logs, log_chunks_by_step_id.get(step.step_id, [])
+            )
+            steps_by_run_id.setdefault(step.run_id, []).append(step.to_model(logs=logs))
+
+        return [
+            WorkflowRunArchive(
+                run_id=workflow_run.run_id,
+                workflow_id=workflow_run.workflow_id,
+                source_name=workflow_run.source_name,
+                created_at=workflow_run.created_at,
+                completed_at=workflow_run.completed_at,
+                failed_at=workflow_run.failed_at,
+                canceled_at=workflow_run.canceled_at,
+                steps=steps_by_run_id.get(workflow_run.run_id, []),
+            )
+            for workflow_run in workflow_runs
+        ]
+
+    async def delete_workflow_runs(self, run_ids: list[str]) -> None:
+        # the steps, their logs, and the blob references are deleted via ON DELETE CASCADE
+        async with self._get_async_session() as db:
             await db.exec(
-                update(WorkflowRunSchema)
-                .where(WorkflowRunSchema.run_id == run_id)
-                .values(failed_at=utc_now())
+                delete(WorkflowRunSchema).where(WorkflowRunSchema.run_id.in_(run_ids))
             )
+            await db.commit()
 
+    async def add_workflow_run_blob(self, run_id: str, blob_id: str) -> None:
+        async with self._get_async_session() as db:
+            await db.exec(
+                pg_insert(WorkflowRunBlobSchema)
+                .values(run_id=run_id, blob_id=blob_id)
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        WorkflowRunBlobSchema.run_id,
+                        WorkflowRunBlobSchema.blob_id,
+                    ]
+                )
+            )
             await db.commit()
 
+    async def filter_referenced_blobs(self, blob_ids: list[str]) -> set[str]:
+        """
+        Returns the blob ids which are referenced by at least one workflow run.
+        """
+        if not blob_ids:
+            return set()
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                select(WorkflowRunBlobSchema.blob_id)
+                .where(WorkflowRunBlobSchema.blob_id.in_(blob_ids))
+                .distinct()
+            )
+            return set(result.all())
+
     ########################################################
     # Secrets
     ########################################################
@@ -946,6 +1669,21 @@ class AdmyralStore(StoreInterface):
             secret_and_user = await self._get_secret_and_owner(db, user_id, secret_id)
             return secret_and_user[0].to_model() if secret_and_user else None
 
+    async def get_secrets(
+        self, user_id: str, secret_ids: list[str]
+    ) -> list[EncryptedSecret]:
+        if not secret_ids:
+            return []
+        async with self._get_async_session() as db:
+            result = await db.exec(
+                select(SecretsSchema)
+                .join(UserSchema)
+                .where(SecretsSchema.user_id == user_id)
+                .where(SecretsSchema.secret_id.in_(secret_ids))
+                .where(UserSchema.id == user_id)
+            )
+            return [secret.to_model() for secret in result.all()]
+
     async def store_secret(
         self,
         user_id: str,
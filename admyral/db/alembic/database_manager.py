@@ -44,7 +44,12 @@ class DatabaseManager:
         # https://stackoverflow.com/questions/6506578/how-to-create-a-new-database-using-sqlalchemy/8977109#8977109
         db_name = self.config.database_url.split("/")[-1]
         db_url = self.config.database_url[: -len(db_name)] + "postgres"
-        return create_async_engine(db_url, echo=True, future=True, pool_pre_ping=True)
+        return create_async_engine(
+            db_url,
+            echo=self.config.api_database_pool.echo,
+            future=True,
+            pool_pre_ping=True,
+        )
 
     async def database_exists(self) -> bool:
         if self.config.database_type == DatabaseType.POSTGRES:
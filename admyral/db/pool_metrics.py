@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class DatabasePoolMetrics(BaseModel):
+    pool_size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    total_checkout_wait_ms: float
+    max_checkout_wait_ms: float
+
+
+class PoolMetricsCollector:
+    """
+    Collects the time sessions wait for a connection from the pool.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.total_checkout_wait_ns = 0
+        self.max_checkout_wait_ns = 0
+
+    def record_checkout(self, wait_ns: int) -> None:
+        self.checkouts += 1
+        self.total_checkout_wait_ns += wait_ns
+        self.max_checkout_wait_ns = max(self.max_checkout_wait_ns, wait_ns)
+
+    def snapshot(self, pool: Pool) -> DatabasePoolMetrics:
+        is_queue_pool = isinstance(pool, QueuePool)
+        return DatabasePoolMetrics(
+            pool_size=pool.size() if is_queue_pool else 0,
+            checked_out=pool.checkedout() if is_queue_pool else 0,
+            # the overflow counter of SQLAlchemy starts at -pool_size
+            overflow=max(pool.overflow(), 0) if is_queue_pool else 0,
+            checkouts=self.checkouts,
+            total_checkout_wait_ms=self.total_checkout_wait_ns / 1_000_000,
+            max_checkout_wait_ms=self.max_checkout_wait_ns / 1_000_000,
+        )
@@ -1,11 +1,15 @@
 from admyral.db.schemas.pip_lockfile_cache_schemas import PipLockfileCacheSchema
 from admyral.db.schemas.python_action_schemas import PythonActionSchema
-from admyral.db.schemas.workflow_schemas import WorkflowSchema
+from admyral.db.schemas.workflow_schemas import WorkflowSchema, WorkflowVersionSchema
 from admyral.db.schemas.workflow_run_schemas import (
     WorkflowRunSchema,
     WorkflowRunStepsSchema,
+    WorkflowRunStepLogsSchema,
+    WorkflowRunBlobSchema,
 )
 from admyral.db.schemas.workflow_webhook_schemas import WorkflowWebhookSchema
+from admyral.db.schemas.webhook_event_schemas import WebhookEventSchema
+from admyral.db.schemas.idempotency_key_schemas import IdempotencyKeySchema
 from admyral.db.schemas.workflow_schedule_schemas import WorkflowScheduleSchema
 from admyral.db.schemas.secrets_schemas import SecretsSchema
 from admyral.db.schemas.auth_schemas import (
@@ -24,9 +28,14 @@ __all__ = [
     "PipLockfileCacheSchema",
     "PythonActionSchema",
     "WorkflowSchema",
+    "WorkflowVersionSchema",
     "WorkflowRunSchema",
     "WorkflowRunStepsSchema",
+    "WorkflowRunStepLogsSchema",
+    "WorkflowRunBlobSchema",
     "WorkflowWebhookSchema",
+    "WebhookEventSchema",
+    "IdempotencyKeySchema",
     "WorkflowScheduleSchema",
     "SecretsSchema",
     "UserSchema",
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlmodel import Field
+from sqlalchemy import TEXT, BOOLEAN, TIMESTAMP
+
+from admyral.db.schemas.base_schemas import BaseSchema
+from admyral.models import IdempotencyKeyClaim
+
+
+class IdempotencyKeySchema(BaseSchema, table=True):
+    """
+    Schema for the idempotency keys of workflow starts. A key is claimed by the first
+    start within the idempotency window. Further starts with the same key are
+    rejected as duplicates until the key expires.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    # primary keys
+    # hash of the user id, the workflow id, and the idempotency key
+    key: str = Field(sa_type=TEXT(), primary_key=True)
+
+    # other fields
+    temporal_workflow_id: str = Field(sa_type=TEXT())
+    is_started: bool = Field(sa_type=BOOLEAN(), default=False)
+    expires_at: datetime = Field(sa_type=TIMESTAMP(timezone=True), index=True)
+
+    def to_model(self, include_resources: bool = False) -> IdempotencyKeyClaim:
+        return IdempotencyKeyClaim.model_validate(
+            {
+                "temporal_workflow_id": self.temporal_workflow_id,
+                "is_started": self.is_started,
+            }
+        )
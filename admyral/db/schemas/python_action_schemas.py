@@ -2,7 +2,7 @@ from sqlmodel import Field
 from sqlalchemy import TEXT, JSON
 
 from admyral.db.schemas.base_schemas import BaseSchema
-from admyral.models import PythonAction, ActionMetadata
+from admyral.models import PythonAction, ActionMetadata, ActionEnvironmentStatus
 from admyral.typings import JsonValue
 
 
@@ -26,6 +26,9 @@ class PythonActionSchema(BaseSchema, table=True):
     secrets_placeholders: str | None = Field(sa_type=TEXT(), nullable=True)
     requirements: str | None = Field(sa_type=TEXT(), nullable=True)
     arguments: list[dict[str, JsonValue]] = Field(sa_type=JSON())
+    environment_status: str = Field(
+        sa_type=TEXT(), default=ActionEnvironmentStatus.PENDING.value
+    )
 
     def to_model(self, include_resources: bool = False) -> PythonAction:
         return PythonAction.model_validate(
@@ -57,5 +60,6 @@ class PythonActionSchema(BaseSchema, table=True):
                 if self.secrets_placeholders
                 else [],
                 "arguments": self.arguments,
+                "environment_status": self.environment_status,
             }
         )
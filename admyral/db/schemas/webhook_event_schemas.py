@@ -0,0 +1,45 @@
+from datetime import datetime
+from sqlmodel import Field
+from sqlalchemy import TEXT, BIGINT, INTEGER, JSON, TIMESTAMP
+from sqlalchemy.sql.expression import func
+
+from admyral.db.schemas.base_schemas import BaseSchema
+from admyral.models import WebhookEvent
+from admyral.typings import JsonValue
+
+
+class WebhookEventSchema(BaseSchema, table=True):
+    """
+    Schema for the webhook ingestion queue. Acknowledged webhook payloads are stored
+    here until they are dispatched to Temporal.
+    """
+
+    __tablename__ = "webhook_events"
+
+    # primary keys
+    event_id: int | None = Field(sa_type=BIGINT(), primary_key=True, default=None)
+
+    # other fields
+    webhook_id: str = Field(sa_type=TEXT())
+    payload: dict[str, JsonValue] = Field(sa_type=JSON())
+    attempts: int = Field(sa_type=INTEGER(), default=0)
+    # the event is not dispatched before this time. set into the future while an
+    # event is being dispatched (lease) and after a failed attempt (backoff).
+    next_attempt_at: datetime = Field(
+        sa_type=TIMESTAMP(timezone=True),
+        sa_column_kwargs=dict(server_default=func.now()),
+        index=True,
+    )
+    last_error: str | None = Field(sa_type=TEXT(), nullable=True)
+    idempotency_key: str | None = Field(sa_type=TEXT(), nullable=True)
+
+    def to_model(self, include_resources: bool = False) -> WebhookEvent:
+        return WebhookEvent.model_validate(
+            {
+                "event_id": self.event_id,
+                "webhook_id": self.webhook_id,
+                "payload": self.payload,
+                "attempts": self.attempts,
+                "idempotency_key": self.idempotency_key,
+            }
+        )
@@ -1,5 +1,5 @@
 from sqlmodel import Field, Relationship
-from sqlalchemy import TEXT, JSON, ForeignKeyConstraint, TIMESTAMP
+from sqlalchemy import TEXT, JSON, ForeignKeyConstraint, TIMESTAMP, BIGINT, Index, text
 from typing import TYPE_CHECKING
 from datetime import datetime
 
@@ -24,6 +24,11 @@ class WorkflowRunSchema(BaseSchema, table=True):
             ["workflows.workflow_id"],
             ondelete="CASCADE",
         ),
+        Index(
+            "ix_workflow_runs_workflow_id_created_at",
+            "workflow_id",
+            text("created_at DESC"),
+        ),
     )
 
     # primary keys
@@ -98,6 +103,7 @@ class WorkflowRunStepsSchema(BaseSchema, table=True):
             ["workflow_runs.run_id"],
             ondelete="CASCADE",
         ),
+        Index("ix_workflow_run_steps_run_id_created_at", "run_id", "created_at"),
     )
 
     # primary keys
@@ -117,15 +123,70 @@ class WorkflowRunStepsSchema(BaseSchema, table=True):
     # relationship parents
     workflow_run: WorkflowRunSchema = Relationship(back_populates="steps")
 
-    def to_model(self, include_resources: bool = False) -> WorkflowRunStep:
+    def to_model(
+        self, include_resources: bool = False, logs: str | None = None
+    ) -> WorkflowRunStep:
         return WorkflowRunStep.model_validate(
             {
                 "step_id": self.step_id,
                 "action_type": self.action_type,
                 "prev_step_id": self.prev_step_id,
-                "logs": self.logs,
+                "logs": logs if logs is not None else self.logs,
                 "result": self.result,
                 "error": self.error,
                 "input_args": self.input_args,
             }
         )
+
+
+class WorkflowRunStepLogsSchema(BaseSchema, table=True):
+    """
+    Schema for the log chunks of a Workflow Run Step. Logs are appended as new
+    chunks and stitched together in the order of their log_id on read.
+    """
+
+    __tablename__ = "workflow_run_step_logs"
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["step_id"],
+            ["workflow_run_steps.step_id"],
+            ondelete="CASCADE",
+        ),
+    )
+
+    # primary keys
+    log_id: int | None = Field(sa_type=BIGINT(), primary_key=True, default=None)
+
+    # foreign keys
+    step_id: str = Field(sa_type=TEXT(), index=True)
+
+    # other fields
+    logs: str = Field(sa_type=TEXT())
+
+    def to_model(self, include_resources: bool = False) -> str:
+        return self.logs
+
+
+class WorkflowRunBlobSchema(BaseSchema, table=True):
+    """
+    Schema for the blobs referenced by a Workflow Run. The references are deleted
+    together with the run. Blobs without any reference are garbage collected.
+    """
+
+    __tablename__ = "workflow_run_blobs"
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["run_id"],
+            ["workflow_runs.run_id"],
+            ondelete="CASCADE",
+        ),
+    )
+
+    # primary keys
+    run_id: str = Field(sa_type=TEXT(), primary_key=True)
+    blob_id: str = Field(sa_type=TEXT(), primary_key=True, index=True)
+
+    def to_model(self, include_resources: bool = False) -> str:
+        return self.blob_id
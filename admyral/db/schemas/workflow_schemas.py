@@ -52,6 +52,8 @@ class WorkflowSchema(BaseSchema, table=True):
         sa_type=TEXT(), index=True
     )  # index for faster workflow loading
     workflow_dag: JsonValue = Field(sa_type=JSON())
+    execution_plan: JsonValue | None = Field(sa_type=JSON(), nullable=True)
+    version_hash: str | None = Field(sa_type=TEXT(), nullable=True)
 
     # relationship parent
     user: "UserSchema" = Relationship(back_populates="workflows")
@@ -79,6 +81,8 @@ class WorkflowSchema(BaseSchema, table=True):
                 "workflow_name": self.workflow_name,
                 "workflow_dag": self.workflow_dag,
                 "is_active": self.is_active,
+                "execution_plan": self.execution_plan,
+                "version_hash": self.version_hash,
             }
         )
 
@@ -91,3 +95,45 @@ class WorkflowSchema(BaseSchema, table=True):
             created_at=self.created_at,
             is_active=self.is_active,
         )
+
+
+class WorkflowVersionSchema(BaseSchema, table=True):
+    """
+    Schema for the versions of a Workflow. Runs which are started by reference only
+    carry the version hash. Hence, versions are retained after the workflow was
+    pushed again such that queued runs still run the version they were started with.
+    """
+
+    __tablename__ = "workflow_versions"
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["workflow_id"],
+            ["workflows.workflow_id"],
+            ondelete="CASCADE",
+        ),
+    )
+
+    # primary keys
+    workflow_id: str = Field(sa_type=TEXT(), primary_key=True)
+    version_hash: str = Field(sa_type=TEXT(), primary_key=True)
+
+    # other fields
+    workflow_name: str = Field(sa_type=TEXT())
+    workflow_dag: JsonValue = Field(sa_type=JSON())
+    execution_plan: JsonValue | None = Field(sa_type=JSON(), nullable=True)
+
+    def to_model(
+        self, include_resources: bool = False, is_active: bool = False
+    ) -> Workflow:
+        # the active state is not versioned, hence, it is taken from the workflow
+        return Workflow.model_validate(
+            {
+                "workflow_id": self.workflow_id,
+                "workflow_name": self.workflow_name,
+                "workflow_dag": self.workflow_dag,
+                "is_active": is_active,
+                "execution_plan": self.execution_plan,
+                "version_hash": self.version_hash,
+            }
+        )
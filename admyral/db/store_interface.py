@@ -1,3 +1,6 @@
+from typing import AsyncGenerator
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime
 from abc import ABC, abstractmethod
 
 from admyral.models import (
@@ -5,6 +8,7 @@ from admyral.models import (
     PipLockfile,
     PythonAction,
     ActionMetadata,
+    ActionEnvironmentStatus,
     Workflow,
     WorkflowRun,
     WorkflowWebhook,
@@ -15,12 +19,33 @@ from admyral.models import (
     WorkflowRunMetadata,
     WorkflowRunStepMetadata,
     WorkflowRunStep,
+    WorkflowRunStepUpdate,
+    WorkflowRunExport,
+    WorkflowRunArchive,
     ApiKey,
+    WebhookEvent,
+    WebhookIngestionQueueStats,
+    IdempotencyKeyClaim,
 )
 from admyral.typings import JsonValue
+from admyral.db.pool_metrics import DatabasePoolMetrics
 
 
 class StoreInterface(ABC):
+    ########################################################
+    # Metrics
+    ########################################################
+
+    @abstractmethod
+    def get_pool_metrics(self) -> DatabasePoolMetrics: ...
+
+    ########################################################
+    # Locks
+    ########################################################
+
+    @abstractmethod
+    def try_advisory_lock(self, lock_id: int) -> AbstractAsyncContextManager[bool]: ...
+
     ########################################################
     # User Management
     ########################################################
@@ -65,6 +90,15 @@ class StoreInterface(ABC):
     @abstractmethod
     async def store_action(self, user_id: str, action: PythonAction) -> None: ...
 
+    @abstractmethod
+    async def set_action_environment_status(
+        self,
+        user_id: str,
+        action_type: str,
+        requirements: list[str] | None,
+        environment_status: ActionEnvironmentStatus,
+    ) -> None: ...
+
     @abstractmethod
     async def delete_action(self, user_id: str, action_type: str) -> None: ...
 
@@ -98,6 +132,14 @@ class StoreInterface(ABC):
         self, user_id: str, workflow_id: str
     ) -> Workflow | None: ...
 
+    @abstractmethod
+    async def get_workflow_version(
+        self, user_id: str, workflow_id: str, version_hash: str
+    ) -> Workflow | None: ...
+
+    @abstractmethod
+    async def delete_workflow_versions(self, pushed_before: datetime) -> int: ...
+
     @abstractmethod
     async def create_workflow(self, user_id: str, workflow: Workflow) -> None: ...
 
@@ -137,6 +179,58 @@ class StoreInterface(ABC):
     @abstractmethod
     async def delete_webhook(self, user_id: str, webhook_id: str) -> None: ...
 
+    ########################################################
+    # Webhook Ingestion Queue
+    ########################################################
+
+    @abstractmethod
+    async def enqueue_webhook_events(
+        self,
+        webhook_id: str,
+        payloads: list[dict[str, JsonValue]],
+        idempotency_keys: list[str | None] | None = None,
+    ) -> None: ...
+
+    @abstractmethod
+    async def claim_webhook_events(
+        self, limit: int, lease_seconds: int, max_attempts: int
+    ) -> list[WebhookEvent]: ...
+
+    @abstractmethod
+    async def complete_webhook_events(self, event_ids: list[int]) -> None: ...
+
+    @abstractmethod
+    async def fail_webhook_event(
+        self, event_id: int, error: str, retry_in_seconds: int
+    ) -> None: ...
+
+    @abstractmethod
+    async def delete_failed_webhook_events(
+        self, max_attempts: int, failed_before: datetime
+    ) -> int: ...
+
+    @abstractmethod
+    async def get_webhook_ingestion_queue_stats(
+        self, max_attempts: int
+    ) -> WebhookIngestionQueueStats: ...
+
+    ########################################################
+    # Idempotency Keys
+    ########################################################
+
+    @abstractmethod
+    async def claim_idempotency_key(
+        self, key: str, temporal_workflow_id: str, window_seconds: int
+    ) -> IdempotencyKeyClaim: ...
+
+    @abstractmethod
+    async def mark_idempotency_key_started(
+        self, key: str, temporal_workflow_id: str
+    ) -> None: ...
+
+    @abstractmethod
+    async def delete_expired_idempotency_keys(self) -> int: ...
+
     ########################################################
     # Workflow Schedules
     ########################################################
@@ -160,9 +254,22 @@ class StoreInterface(ABC):
 
     @abstractmethod
     async def list_workflow_runs(
-        self, user_id: str, workflow_id: str, limit: int = 100
+        self,
+        user_id: str,
+        workflow_id: str,
+        limit: int = 100,
+        cursor: str | None = None,
     ) -> list[WorkflowRunMetadata]: ...
 
+    @abstractmethod
+    def export_workflow_runs(
+        self,
+        user_id: str,
+        workflow_id: str,
+        include_steps: bool = True,
+        page_size: int = 500,
+    ) -> AsyncGenerator[WorkflowRunExport, None]: ...
+
     @abstractmethod
     async def get_workflow_run(
         self, workflow_id: str, run_id: str
@@ -170,7 +277,12 @@ class StoreInterface(ABC):
 
     @abstractmethod
     async def list_workflow_run_steps(
-        self, user_id: str, workflow_id: str, run_id: str
+        self,
+        user_id: str,
+        workflow_id: str,
+        run_id: str,
+        limit: int | None = None,
+        cursor: str | None = None,
     ) -> list[WorkflowRunStepMetadata]: ...
 
     @abstractmethod
@@ -197,6 +309,11 @@ class StoreInterface(ABC):
         self, run_id: str, completed_at: str
     ) -> None: ...
 
+    @abstractmethod
+    def stream_workflow_run_step_logs(
+        self, user_id: str, workflow_id: str, run_id: str, step_id: str
+    ) -> AsyncGenerator[str, None]: ...
+
     @abstractmethod
     async def append_logs(
         self, step_id: str, run_id: str, action_id: str, prev_step_id: str, logs: str
@@ -224,6 +341,37 @@ class StoreInterface(ABC):
         input_args: dict[str, JsonValue],
     ) -> None: ...
 
+    @abstractmethod
+    async def store_workflow_run_steps(
+        self, step_updates: list[WorkflowRunStepUpdate]
+    ) -> None: ...
+
+    ########################################################
+    # Workflow Runs - Retention
+    ########################################################
+
+    @abstractmethod
+    async def list_all_workflow_ids(self) -> list[str]: ...
+
+    @abstractmethod
+    async def list_workflow_run_ids_created_before(
+        self, workflow_id: str, created_before: datetime, limit: int
+    ) -> list[str]: ...
+
+    @abstractmethod
+    async def get_workflow_runs_for_archive(
+        self, run_ids: list[str]
+    ) -> list[WorkflowRunArchive]: ...
+
+    @abstractmethod
+    async def delete_workflow_runs(self, run_ids: list[str]) -> None: ...
+
+    @abstractmethod
+    async def add_workflow_run_blob(self, run_id: str, blob_id: str) -> None: ...
+
+    @abstractmethod
+    async def filter_referenced_blobs(self, blob_ids: list[str]) -> set[str]: ...
+
     ########################################################
     # Secrets
     ########################################################
@@ -238,6 +386,11 @@ class StoreInterface(ABC):
         self, user_id: str, secret_id: str
     ) -> EncryptedSecret | None: ...
 
+    @abstractmethod
+    async def get_secrets(
+        self, user_id: str, secret_ids: list[str]
+    ) -> list[EncryptedSecret]: ...
+
     @abstractmethod
     async def store_secret(
         self,
@@ -0,0 +1,136 @@
+import asyncio
+
+from admyral.db.store_interface import StoreInterface
+from admyral.models import WorkflowRunStepUpdate
+from admyral.typings import JsonValue
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class WorkflowRunStepWriteBuffer:
+    """
+    Write-behind buffer which coalesces step results and errors of concurrently
+    running activities into batched upserts.
+
+    A batch is flushed as soon as it reaches `max_batch_size` or `flush_interval_ms`
+    after its first entry was added. The store methods only return once the batch
+    containing the update is committed, hence, an activity never reports completion
+    before its result is durable.
+    """
+
+    def __init__(
+        self,
+        store: StoreInterface,
+        max_batch_size: int = 100,
+        flush_interval_ms: int = 20,
+    ) -> None:
+        self.store = store
+        self.max_batch_size = max_batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self._pending: list[tuple[WorkflowRunStepUpdate, asyncio.Future]] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    async def store_action_result(
+        self,
+        step_id: str,
+        run_id: str,
+        action_type: str,
+        prev_step_id: str,
+        result: JsonValue,
+        input_args: dict[str, JsonValue],
+    ) -> None:
+        await self._enqueue(
+            WorkflowRunStepUpdate(
+                step_id=step_id,
+                run_id=run_id,
+                action_type=action_type,
+                prev_step_id=prev_step_id,
+                input_args=input_args,
+                result=result,
+            )
+        )
+
+    async def store_workflow_run_error(
+        self,
+        step_id: str,
+        run_id: str,
+        action_type: str,
+        prev_step_id: str,
+        error: str,
+        input_args: dict[str, JsonValue],
+    ) -> None:
+        await self._enqueue(
+            WorkflowRunStepUpdate(
+                step_id=step_id,
+                run_id=run_id,
+                action_type=action_type,
+                prev_step_id=prev_step_id,
+                input_args=input_args,
+                error=error,
+            )
+        )
+
+    async def _enqueue(self, step_update: WorkflowRunStepUpdate) -> None:
+        if self._closed:
+            # no more batching after shutdown started
+            await self.store.store_workflow_run_steps([step_update])
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((step_update, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(
+                self.flush_interval_ms / 1000, self._flush
+            )
+
+        await future
+
+    def _flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+
+        task = asyncio.create_task(self._write_batch(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _write_batch(
+        self, batch: list[tuple[WorkflowRunStepUpdate, asyncio.Future]]
+    ) -> None:
+        try:
+            await self.store.store_workflow_run_steps(
+                [step_update for step_update, _ in batch]
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist batch of {len(batch)} step updates: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def close(self) -> None:
+        """
+        Flushes all pending updates and waits until they are persisted.
+        """
+        self._closed = True
+        self._flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
@@ -1,4 +1,9 @@
-from admyral.models.action import Argument, PythonAction, ActionMetadata
+from admyral.models.action import (
+    Argument,
+    PythonAction,
+    ActionMetadata,
+    ActionEnvironmentStatus,
+)
 from admyral.models.auth import AuthenticatedUser, User, UserProfile
 from admyral.models.api_key import ApiKey
 from admyral.models.pip_lockfile import PipLockfile
@@ -18,8 +23,11 @@ from admyral.models.workflow import (
     WorkflowPushRequest,
     WorkflowPushResponse,
     WorkflowTriggerResponse,
+    WorkflowBulkTriggerEventResult,
+    WorkflowBulkTriggerResponse,
     TriggerStatus,
     WorkflowMetadata,
+    WorkflowExecutionPlan,
 )
 from admyral.models.workflow_run import (
     WorkflowRun,
@@ -27,8 +35,16 @@ from admyral.models.workflow_run import (
     WorkflowRunMetadata,
     WorkflowRunStepMetadata,
     WorkflowRunStepWithSerializedResult,
+    WorkflowRunStepUpdate,
+    WorkflowRunExport,
+    WorkflowRunArchive,
+)
+from admyral.models.workflow_webhook import (
+    WorkflowWebhook,
+    WebhookEvent,
+    WebhookIngestionQueueStats,
 )
-from admyral.models.workflow_webhook import WorkflowWebhook
+from admyral.models.idempotency_key import IdempotencyKeyClaim
 from admyral.models.workflow_schedule import WorkflowSchedule
 from admyral.models.secret import (
     EncryptedSecret,
@@ -69,6 +85,7 @@ __all__ = [
     "Argument",
     "PythonAction",
     "ActionMetadata",
+    "ActionEnvironmentStatus",
     "Schedule",
     "ScheduleType",
     "WorkflowDAG",
@@ -90,11 +107,16 @@ __all__ = [
     "WorkflowRunMetadata",
     "WorkflowRunStepMetadata",
     "WorkflowWebhook",
+    "WebhookEvent",
+    "WebhookIngestionQueueStats",
+    "IdempotencyKeyClaim",
     "WorkflowSchedule",
     "WorkflowPushRequest",
     "WorkflowPushResponse",
     "TriggerStatus",
     "WorkflowTriggerResponse",
+    "WorkflowBulkTriggerEventResult",
+    "WorkflowBulkTriggerResponse",
     "EncryptedSecret",
     "Secret",
     "SecretMetadata",
@@ -111,6 +133,7 @@ __all__ = [
     "Condition",
     "condition_validate",
     "WorkflowMetadata",
+    "WorkflowExecutionPlan",
     "ActionNamespace",
     "EditorActions",
     "EditorWorkflowStartNode",
@@ -128,4 +151,7 @@ __all__ = [
     "UserProfile",
     "WorkflowControlResult",
     "WorkflowRunStepWithSerializedResult",
+    "WorkflowRunStepUpdate",
+    "WorkflowRunExport",
+    "WorkflowRunArchive",
 ]
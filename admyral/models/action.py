@@ -1,3 +1,4 @@
+from enum import Enum
 from pydantic import BaseModel
 
 from admyral.typings import JsonValue
@@ -52,6 +53,18 @@ class PythonAction(BaseModel):
     requirements: list[str] | None = None
 
 
+class ActionEnvironmentStatus(str, Enum):
+    """
+    Status of the Python environment (lockfile and installed requirements) of a
+    custom Python action.
+    """
+
+    PENDING = "PENDING"
+    PREPARING = "PREPARING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
 class ActionMetadata(BaseModel):
     action_type: str
     display_name: str
@@ -59,3 +72,4 @@ class ActionMetadata(BaseModel):
     description: str | None = None
     secrets_placeholders: list[str] = []
     arguments: list[Argument] = []
+    environment_status: ActionEnvironmentStatus = ActionEnvironmentStatus.PENDING
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class IdempotencyKeyClaim(BaseModel):
+    """
+    The state of an idempotency key after it was claimed for a workflow start.
+    """
+
+    # the Temporal workflow id of the start which claimed the key within the current
+    # idempotency window
+    temporal_workflow_id: str
+    # whether the start is known to have reached Temporal
+    is_started: bool
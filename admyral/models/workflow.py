@@ -1,5 +1,5 @@
 from typing import Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from enum import Enum
 from collections import defaultdict
 from datetime import datetime
@@ -104,6 +104,9 @@ class WorkflowTriggerBase(BaseModel):
 
 class WorkflowWebhookTrigger(WorkflowTriggerBase):
     type: WorkflowTriggerType = WorkflowTriggerType.WEBHOOK
+    # dot-separated path into the payload, e.g., "alert.id", whose value is used as
+    # idempotency key if the request does not provide an Idempotency-Key header.
+    idempotency_key: str | None = None
 
 
 class WorkflowScheduleTrigger(WorkflowTriggerBase):
@@ -144,11 +147,52 @@ class WorkflowDAG(BaseModel):
         return in_deg
 
 
+class WorkflowExecutionPlan(BaseModel):
+    """
+    Frozen, array-backed representation of a WorkflowDAG which is compiled once per
+    workflow version. Nodes are identified by their index in `node_ids`. The start
+    node always has the index 0.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    node_ids: tuple[str, ...]
+    child_offsets: tuple[int, ...]
+    """ CSR offsets: the children of node i are child_targets[child_offsets[i]:child_offsets[i + 1]]. """
+    false_child_offsets: tuple[int, ...]
+    """ Start of the false-branch children of node i. For action nodes, it is equal to child_offsets[i + 1]. """
+    child_targets: tuple[int, ...]
+    in_deg: tuple[int, ...]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def children(self, node: int) -> tuple[int, ...]:
+        return self.child_targets[
+            self.child_offsets[node] : self.child_offsets[node + 1]
+        ]
+
+    def true_children(self, node: int) -> tuple[int, ...]:
+        return self.child_targets[
+            self.child_offsets[node] : self.false_child_offsets[node]
+        ]
+
+    def false_children(self, node: int) -> tuple[int, ...]:
+        return self.child_targets[
+            self.false_child_offsets[node] : self.child_offsets[node + 1]
+        ]
+
+
 class Workflow(BaseModel):
     workflow_id: str
     workflow_name: str
     workflow_dag: WorkflowDAG
     is_active: bool
+    execution_plan: WorkflowExecutionPlan | None = None
+    """ Compiled when the workflow is pushed. Might be missing for older workflows. """
+    version_hash: str | None = None
+    """ Content hash of the workflow DAG. Set by the store. """
 
 
 class WorkflowPushRequest(BaseModel):
@@ -164,6 +208,8 @@ class WorkflowPushResponse(BaseModel):
 class TriggerStatus(str, Enum):
     SUCCESS = "SUCCESS"
     INACTIVE = "INACTIVE"
+    FAILED = "FAILED"
+    DUPLICATE = "DUPLICATE"
 
 
 class WorkflowTriggerResponse(BaseModel):
@@ -177,6 +223,21 @@ class WorkflowTriggerResponse(BaseModel):
     def inactive(cls) -> "WorkflowTriggerResponse":
         return cls(status=TriggerStatus.INACTIVE)
 
+    @classmethod
+    def duplicate(cls) -> "WorkflowTriggerResponse":
+        return cls(status=TriggerStatus.DUPLICATE)
+
+
+class WorkflowBulkTriggerEventResult(BaseModel):
+    index: int
+    status: TriggerStatus
+    error: str | None = None
+
+
+class WorkflowBulkTriggerResponse(BaseModel):
+    status: TriggerStatus
+    results: list[WorkflowBulkTriggerEventResult] = []
+
 
 class WorkflowMetadata(BaseModel):
     workflow_id: str
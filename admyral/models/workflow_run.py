@@ -15,6 +15,21 @@ class WorkflowRunStep(BaseModel):
     input_args: JsonValue | None = None
 
 
+class WorkflowRunStepUpdate(BaseModel):
+    """
+    The outcome of a single step which is persisted by the store. Either carries
+    the result or the error of the step.
+    """
+
+    step_id: str
+    run_id: str
+    action_type: str
+    prev_step_id: str | None = None
+    input_args: JsonValue | None = None
+    result: JsonValue | None = None
+    error: str | None = None
+
+
 class WorkflowRunStepWithSerializedResult(BaseModel):
     step_id: str
     action_type: str
@@ -48,3 +63,19 @@ class WorkflowRunStepMetadata(BaseModel):
     step_id: str
     action_type: str
     error: str | None = None
+    created_at: datetime | None = None
+
+
+class WorkflowRunExport(WorkflowRunMetadata):
+    steps: list[WorkflowRunStepMetadata] | None = None
+
+
+class WorkflowRunArchive(BaseModel):
+    run_id: str
+    workflow_id: str
+    source_name: str
+    created_at: datetime
+    completed_at: datetime | None = None
+    failed_at: datetime | None = None
+    canceled_at: datetime | None = None
+    steps: list[WorkflowRunStep] = []
@@ -1,7 +1,29 @@
+from datetime import datetime
 from pydantic import BaseModel
 
+from admyral.typings import JsonValue
+
 
 class WorkflowWebhook(BaseModel):
     webhook_id: str
     webhook_secret: str
     workflow_id: str
+
+
+class WebhookEvent(BaseModel):
+    """
+    A webhook payload which was acknowledged and is waiting in the ingestion queue
+    to be dispatched to Temporal.
+    """
+
+    event_id: int
+    webhook_id: str
+    payload: dict[str, JsonValue]
+    attempts: int = 0
+    idempotency_key: str | None = None
+
+
+class WebhookIngestionQueueStats(BaseModel):
+    pending_events: int
+    failed_events: int
+    oldest_pending_event_created_at: datetime | None = None
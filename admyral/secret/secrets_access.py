@@ -1,10 +1,14 @@
 import os
 from abc import abstractmethod
 import json
+from typing import TYPE_CHECKING
 
-from admyral.secret.secrets_manager import SecretsManager
 from admyral.utils.future_executor import execute_future
 
+if TYPE_CHECKING:
+    # avoid circular import
+    from admyral.secret.secrets_manager import SecretsManager
+
 
 class _SecretsAccessImpl:
     @abstractmethod
@@ -13,13 +17,21 @@ class _SecretsAccessImpl:
     @abstractmethod
     async def aget(self, secret_placeholder: str) -> dict[str, str]: ...
 
+    async def aget_many(
+        self, secret_placeholders: list[str]
+    ) -> dict[str, dict[str, str]]:
+        return {
+            secret_placeholder: await self.aget(secret_placeholder)
+            for secret_placeholder in secret_placeholders
+        }
+
 
 class SecretsStoreAccessImpl(_SecretsAccessImpl):
     def __init__(
         self,
         user_id: str,
         secret_mappings: dict[str, str],
-        secrets_manager: SecretsManager,
+        secrets_manager: "SecretsManager",
     ) -> None:
         """
         Args:
@@ -45,6 +57,30 @@ class SecretsStoreAccessImpl(_SecretsAccessImpl):
             raise ValueError(f"Secret '{secret_name}' not found.")
         return secret.secret
 
+    async def aget_many(
+        self, secret_placeholders: list[str]
+    ) -> dict[str, dict[str, str]]:
+        secret_names = {}
+        for secret_placeholder in secret_placeholders:
+            secret_name = self.secret_mappings.get(secret_placeholder)
+            if not secret_name:
+                raise ValueError(
+                    f"No secret mapped to secret placeholder '{secret_placeholder}'."
+                )
+            secret_names[secret_placeholder] = secret_name
+
+        secrets = await self.secrets_manager.get_many(
+            self.user_id, list(secret_names.values())
+        )
+
+        loaded_secrets = {}
+        for secret_placeholder, secret_name in secret_names.items():
+            secret = secrets.get(secret_name)
+            if not secret:
+                raise ValueError(f"Secret '{secret_name}' not found.")
+            loaded_secrets[secret_placeholder] = secret.secret
+        return loaded_secrets
+
 
 class EnvVariableSecretsAccessImpl(_SecretsAccessImpl):
     def get(self, secret_placeholder: str) -> dict[str, str]:
@@ -73,6 +109,14 @@ class Secrets:
     async def aget(self, secret_placeholder: str) -> dict[str, str]:
         return await self.secrets_access_impl.aget(secret_placeholder)
 
+    async def aget_many(
+        self, secret_placeholders: list[str]
+    ) -> dict[str, dict[str, str]]:
+        """
+        Loads the secrets of multiple secret placeholders at once.
+        """
+        return await self.secrets_access_impl.aget_many(secret_placeholders)
+
     @classmethod
     def default(cls) -> "Secrets":
         return Secrets(EnvVariableSecretsAccessImpl())
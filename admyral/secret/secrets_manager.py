@@ -1,8 +1,10 @@
 from abc import abstractmethod
+from collections import OrderedDict, defaultdict
 import json
+import time
 
 from admyral.db.store_interface import StoreInterface
-from admyral.utils.crypto import decrypt_secret, encrypt_secret
+from admyral.utils.crypto import decrypt_secret, decrypt_secrets, encrypt_secret
 from admyral.models import Secret, SecretMetadata
 from admyral.config.config import CONFIG, SecretsManagerType
 from admyral.utils.collections import is_empty
@@ -21,6 +23,24 @@ class SecretsManager:
         """
         raise NotImplementedError("get method not implemented")
 
+    async def get_many(self, user_id: str, secret_ids: list[str]) -> dict[str, Secret]:
+        """
+        Retrieve multiple secrets for a user. Secrets which do not exist are omitted.
+
+        Args:
+            user_id: The user id of the user whose secrets are retrieved.
+            secret_ids: The ids of the secrets to retrieve.
+
+        Returns:
+            The secrets keyed by their secret id.
+        """
+        secrets = {}
+        for secret_id in secret_ids:
+            secret = await self.get(user_id, secret_id)
+            if secret:
+                secrets[secret_id] = secret
+        return secrets
+
     @abstractmethod
     async def update(self, user_id: str, delta_secret: Secret) -> SecretMetadata:
         """
@@ -83,6 +103,24 @@ class SQLSecretsManager(SecretsManager):
             else None
         )
 
+    async def get_many(self, user_id: str, secret_ids: list[str]) -> dict[str, Secret]:
+        encrypted_secrets = await self.db.get_secrets(user_id, list(set(secret_ids)))
+        decrypted_secrets = decrypt_secrets(
+            [
+                encrypted_secret.encrypted_secret
+                for encrypted_secret in encrypted_secrets
+            ]
+        )
+        return {
+            encrypted_secret.secret_id: Secret(
+                secret_id=encrypted_secret.secret_id,
+                secret=json.loads(decrypted_secret),
+            )
+            for encrypted_secret, decrypted_secret in zip(
+                encrypted_secrets, decrypted_secrets
+            )
+        }
+
     def _encrypt_secret(self, secret: dict[str, str]) -> str:
         return encrypt_secret(json.dumps(secret))
 
@@ -149,11 +187,125 @@ class SQLSecretsManager(SecretsManager):
         return await self.db.list_secrets(user_id)
 
 
+class CachingSecretsManager(SecretsManager):
+    """
+    Caches decrypted secrets of another secrets manager for a short time.
+
+    Entries are scoped per user. Writes through this secrets manager invalidate the
+    affected entries. Writes by other processes (e.g., the API server updating a
+    secret used by a worker) become visible once the entries expire.
+    """
+
+    def __init__(
+        self, secrets_manager: SecretsManager, ttl: float, max_size: int = 4096
+    ) -> None:
+        self.secrets_manager = secrets_manager
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: OrderedDict[tuple[str, str], tuple[float, Secret]] = OrderedDict()
+        # incremented on every invalidation. a read only populates the cache if no
+        # invalidation happened for the user while the read was in flight.
+        self._generations: defaultdict[str, int] = defaultdict(int)
+
+    def _get_cached(self, user_id: str, secret_id: str) -> Secret | None:
+        entry = self._cache.get((user_id, secret_id))
+        if entry is None:
+            return None
+        expires_at, secret = entry
+        if expires_at <= time.monotonic():
+            del self._cache[(user_id, secret_id)]
+            return None
+        # return a copy because actions might modify the secret
+        return secret.model_copy(deep=True)
+
+    def _put(self, user_id: str, secrets: list[Secret], generation: int) -> None:
+        if self._generations[user_id] != generation:
+            return
+        expires_at = time.monotonic() + self.ttl
+        for secret in secrets:
+            key = (user_id, secret.secret_id)
+            self._cache[key] = (expires_at, secret.model_copy(deep=True))
+            self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, user_id: str, secret_id: str | None = None) -> None:
+        """
+        Drop the cached secret of a user or all cached secrets of the user if no
+        secret id is provided.
+        """
+        self._generations[user_id] += 1
+        if secret_id is not None:
+            self._cache.pop((user_id, secret_id), None)
+            return
+        for key in [key for key in self._cache if key[0] == user_id]:
+            del self._cache[key]
+
+    async def get(self, user_id: str, secret_id: str) -> Secret | None:
+        secret = self._get_cached(user_id, secret_id)
+        if secret is not None:
+            return secret
+
+        generation = self._generations[user_id]
+        secret = await self.secrets_manager.get(user_id, secret_id)
+        if secret is not None:
+            self._put(user_id, [secret], generation)
+        return secret
+
+    async def get_many(self, user_id: str, secret_ids: list[str]) -> dict[str, Secret]:
+        secrets = {}
+        missing_secret_ids = []
+        for secret_id in secret_ids:
+            secret = self._get_cached(user_id, secret_id)
+            if secret is not None:
+                secrets[secret_id] = secret
+            else:
+                missing_secret_ids.append(secret_id)
+
+        if missing_secret_ids:
+            generation = self._generations[user_id]
+            fetched_secrets = await self.secrets_manager.get_many(
+                user_id, missing_secret_ids
+            )
+            self._put(user_id, list(fetched_secrets.values()), generation)
+            secrets.update(fetched_secrets)
+
+        return secrets
+
+    async def update(self, user_id: str, delta_secret: Secret) -> SecretMetadata:
+        try:
+            # compare-and-swap of the underlying secrets manager
+            return await self.secrets_manager.update(user_id, delta_secret)
+        finally:
+            self.invalidate(user_id, delta_secret.secret_id)
+
+    async def set(self, user_id: str, secret: Secret) -> SecretMetadata:
+        try:
+            return await self.secrets_manager.set(user_id, secret)
+        finally:
+            self.invalidate(user_id, secret.secret_id)
+
+    async def delete(self, user_id: str, secret_id: str) -> None:
+        try:
+            return await self.secrets_manager.delete(user_id, secret_id)
+        finally:
+            self.invalidate(user_id, secret_id)
+
+    async def list(self, user_id: str) -> list[SecretMetadata]:
+        return await self.secrets_manager.list(user_id)
+
+
 def secrets_manager_factory(db: StoreInterface) -> SecretsManager:
     secrets_manager_type = CONFIG.secrets_manager_type
     match secrets_manager_type:
         case SecretsManagerType.SQL:
-            return SQLSecretsManager(db)
+            secrets_manager = SQLSecretsManager(db)
 
         case _:
             raise ValueError(f"Unknown secrets manager type: {secrets_manager_type}")
+
+    if CONFIG.secrets_cache_ttl_in_seconds > 0:
+        secrets_manager = CachingSecretsManager(
+            secrets_manager, CONFIG.secrets_cache_ttl_in_seconds
+        )
+    return secrets_manager
@@ -1,9 +1,12 @@
+import time
 from fastapi import Request, HTTPException
 from fastapi_nextauth_jwt import NextAuthJWTv4
+from fastapi_nextauth_jwt.cookies import extract_token
 
 from admyral.models.auth import AuthenticatedUser
 from admyral.config.config import CONFIG, DISABLE_AUTH, AUTH_SECRET, ADMYRAL_ENV
 from admyral.server.deps import get_admyral_store
+from admyral.server.auth_cache import get_auth_cache
 from admyral.logger import get_logger
 
 
@@ -26,20 +29,46 @@ async def authenticate(request: Request) -> AuthenticatedUser:
             email=CONFIG.default_user_email,
         )
 
+    auth_cache = get_auth_cache()
+    # read before the credential is resolved. see AuthCache.
+    generation = auth_cache.generation
+    expires_in = None
+
     # extract user id from authentication method
     if "x-api-key" in request.headers:
+        credential = f"api_key:{request.headers['x-api-key']}"
+        cached_user = auth_cache.get(credential)
+        if cached_user:
+            return cached_user
+
         user_id = await get_admyral_store().search_api_key_owner(
             request.headers["x-api-key"]
         )
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid API Key")
     else:
+        try:
+            encrypted_token = extract_token(request.cookies, JWT.cookie_name)
+            # the CSRF token is bound to the request, hence, it is always checked
+            if JWT.csrf_prevention_enabled:
+                JWT.check_csrf_token(request)
+        except Exception as e:
+            logger.error(f"Failed to validate token: {e}")
+            raise HTTPException(status_code=401, detail="Invalid or missing token")
+
+        credential = f"jwt:{encrypted_token}"
+        cached_user = auth_cache.get(credential)
+        if cached_user:
+            return cached_user
+
         try:
             decrypted_token = validate_and_decrypt_jwt(request)
         except Exception as e:
             logger.error(f"Failed to validate token: {e}")
             raise HTTPException(status_code=401, detail="Invalid or missing token")
         user_id = decrypted_token.get("sub") or decrypted_token.get("id")
+        if "exp" in decrypted_token:
+            expires_in = decrypted_token["exp"] - time.time()
 
     if not user_id:
         # Missing user id
@@ -51,4 +80,6 @@ async def authenticate(request: Request) -> AuthenticatedUser:
         # User not found
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    return AuthenticatedUser(user_id=user_id, email=user.email)
+    authenticated_user = AuthenticatedUser(user_id=user_id, email=user.email)
+    auth_cache.put(credential, authenticated_user, generation, expires_in)
+    return authenticated_user
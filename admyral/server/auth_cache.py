@@ -0,0 +1,132 @@
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+from pydantic import BaseModel
+
+from admyral.models.auth import AuthenticatedUser
+from admyral.config.config import AUTH_CACHE_TTL_IN_SECONDS, AUTH_CACHE_SIZE
+
+
+class AuthCacheMetrics(BaseModel):
+    hits: int
+    misses: int
+    invalidations: int
+    size: int
+
+
+class AuthCache:
+    """
+    Bounded TTL cache of credentials (API keys and JWTs) resolved to users.
+
+    Credentials are keyed by their SHA-256 hash, hence, the cache never holds a
+    credential in plaintext.
+
+    The user of a credential is only known after the database lookup. Hence, callers
+    read the current generation before the lookup and pass it to put. Credentials
+    of a user which was invalidated while the lookup was in flight are not cached.
+    """
+
+    def __init__(
+        self, ttl: float = AUTH_CACHE_TTL_IN_SECONDS, max_size: int = AUTH_CACHE_SIZE
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, AuthenticatedUser]] = OrderedDict()
+        self._keys_by_user: defaultdict[str, set[str]] = defaultdict(set)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # incremented on every invalidation
+        self._generation = 0
+        # the generation of the last invalidation of each user
+        self._invalidated_generations: defaultdict[str, int] = defaultdict(int)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @staticmethod
+    def _key(credential: str) -> str:
+        return hashlib.sha256(credential.encode()).hexdigest()
+
+    def get(self, credential: str) -> AuthenticatedUser | None:
+        if self.ttl <= 0:
+            return None
+
+        key = self._key(credential)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        credential: str,
+        user: AuthenticatedUser,
+        generation: int,
+        expires_in: float | None = None,
+    ) -> None:
+        """
+        Args:
+            credential: The API key or the JWT.
+            user: The user which the credential resolved to.
+            generation: The generation read before the credential was resolved.
+            expires_in: Seconds until the credential expires. The entry never
+                outlives the credential.
+        """
+        ttl = self.ttl if expires_in is None else min(self.ttl, expires_in)
+        if ttl <= 0:
+            return
+        if self._invalidated_generations.get(user.user_id, 0) > generation:
+            # the user was invalidated while the credential was being resolved
+            return
+
+        key = self._key(credential)
+        self._entries[key] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(key)
+        self._keys_by_user[user.user_id].add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, user = self._entries.pop(key)
+        user_keys = self._keys_by_user.get(user.user_id)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[user.user_id]
+
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drops all cached credentials of a user, e.g., after an API key of the user
+        was deleted or the user itself was deleted.
+        """
+        self.invalidations += 1
+        self._generation += 1
+        self._invalidated_generations[user_id] = self._generation
+        for key in self._keys_by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def get_metrics(self) -> AuthCacheMetrics:
+        return AuthCacheMetrics(
+            hits=self.hits,
+            misses=self.misses,
+            invalidations=self.invalidations,
+            size=len(self._entries),
+        )
+
+
+_auth_cache: AuthCache | None = None
+
+
+def get_auth_cache() -> AuthCache:
+    global _auth_cache
+    if _auth_cache is None:
+        _auth_cache = AuthCache()
+    return _auth_cache
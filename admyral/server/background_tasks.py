@@ -1,8 +1,14 @@
 import asyncio
+from datetime import timedelta
 
 from admyral.logger import get_logger
 from admyral.server.deps import get_admyral_store
-from admyral.config.config import CONFIG
+from admyral.server.auth_cache import get_auth_cache
+from admyral.config.config import CONFIG, GlobalConfig
+from admyral.utils.time import utc_now
+from admyral.server.run_retention import enforce_run_retention, is_run_retention_enabled
+from admyral.server.webhook_ingestion import get_webhook_ingestion_dispatcher
+from admyral.utils.metrics import log_metrics_periodically
 
 
 logger = get_logger(__name__)
@@ -16,6 +22,82 @@ async def cleanup_pip_lockfile_cache(cleanup_interval: int):
         logger.info("Finished cleaning up pip lockfile cache.")
 
 
+async def enforce_workflow_run_retention(retention_interval: int):
+    while True:
+        await asyncio.sleep(retention_interval)
+        logger.info("Enforcing workflow run retention...")
+        try:
+            num_deleted_runs = await enforce_run_retention(get_admyral_store(), CONFIG)
+        except Exception as e:
+            logger.error(f"Failed to enforce workflow run retention: {e}")
+            continue
+        logger.info(
+            f"Finished enforcing workflow run retention. Deleted {num_deleted_runs} runs."
+        )
+
+
+async def cleanup_failed_webhook_events(cleanup_interval: int):
+    while True:
+        await asyncio.sleep(cleanup_interval)
+        logger.info("Cleaning up failed webhook events...")
+        try:
+            num_deleted_events = (
+                await get_webhook_ingestion_dispatcher().delete_failed_events()
+            )
+        except Exception as e:
+            logger.error(f"Failed to clean up failed webhook events: {e}")
+            continue
+        logger.info(
+            f"Finished cleaning up failed webhook events. Deleted {num_deleted_events} events."
+        )
+
+
+def get_workflow_version_retention_days(config: GlobalConfig) -> int:
+    return max(
+        [
+            config.workflow_version_retention_days,
+            config.run_retention_days or 0,
+            *(
+                retention_days or 0
+                for retention_days in config.run_retention_days_by_workflow.values()
+            ),
+        ]
+    )
+
+
+async def cleanup_workflow_versions(cleanup_interval: int):
+    while True:
+        await asyncio.sleep(cleanup_interval)
+        logger.info("Cleaning up workflow versions...")
+        retention_days = get_workflow_version_retention_days(CONFIG)
+        try:
+            num_deleted_versions = await get_admyral_store().delete_workflow_versions(
+                utc_now() - timedelta(days=retention_days)
+            )
+        except Exception as e:
+            logger.error(f"Failed to clean up workflow versions: {e}")
+            continue
+        logger.info(
+            f"Finished cleaning up workflow versions. Deleted {num_deleted_versions} versions."
+        )
+
+
+async def cleanup_idempotency_keys(cleanup_interval: int):
+    while True:
+        await asyncio.sleep(cleanup_interval)
+        logger.info("Cleaning up expired idempotency keys...")
+        try:
+            num_deleted_keys = (
+                await get_admyral_store().delete_expired_idempotency_keys()
+            )
+        except Exception as e:
+            logger.error(f"Failed to clean up expired idempotency keys: {e}")
+            continue
+        logger.info(
+            f"Finished cleaning up expired idempotency keys. Deleted {num_deleted_keys} keys."
+        )
+
+
 def start_background_tasks():
     logger.info("Starting background tasks...")
 
@@ -23,3 +105,41 @@ def start_background_tasks():
         cleanup_pip_lockfile_cache(CONFIG.pip_lockfile_cache_cleanup_interval)
     )
     logger.info("Started pip lockfile cache cleanup background task.")
+
+    asyncio.create_task(
+        cleanup_workflow_versions(CONFIG.workflow_version_cleanup_interval)
+    )
+    logger.info("Started workflow version cleanup background task.")
+
+    asyncio.create_task(
+        cleanup_idempotency_keys(CONFIG.idempotency_key_cleanup_interval)
+    )
+    logger.info("Started idempotency key cleanup background task.")
+
+    if is_run_retention_enabled(CONFIG):
+        asyncio.create_task(
+            enforce_workflow_run_retention(CONFIG.run_retention_interval)
+        )
+        logger.info("Started workflow run retention background task.")
+
+    metrics_sources = {
+        "Database pool": get_admyral_store().get_pool_metrics,
+        "Auth cache": get_auth_cache().get_metrics,
+    }
+
+    if CONFIG.webhook_fast_ack:
+        asyncio.create_task(get_webhook_ingestion_dispatcher().run())
+        metrics_sources["Webhook ingestion"] = (
+            get_webhook_ingestion_dispatcher().get_metrics
+        )
+        logger.info("Started webhook ingestion dispatcher background task.")
+
+        asyncio.create_task(
+            cleanup_failed_webhook_events(CONFIG.webhook_failed_event_cleanup_interval)
+        )
+        logger.info("Started failed webhook event cleanup background task.")
+
+    asyncio.create_task(
+        log_metrics_periodically(metrics_sources, CONFIG.metrics_log_interval)
+    )
+    logger.info("Started metrics logging background task.")
@@ -3,7 +3,11 @@ from fastapi import APIRouter, status, Depends
 
 from admyral.server.auth import authenticate
 from admyral.models import PythonAction, AuthenticatedUser, ActionMetadata
-from admyral.server.deps import get_admyral_store
+from admyral.server.deps import get_admyral_store, get_workers_client
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
 
 
 router = APIRouter()
@@ -25,6 +29,17 @@ async def push_action(
         user_id=authenticated_user.user_id, action=python_action
     )
 
+    # pre-warm the action environment on the workers. If this fails, the environment
+    # is still prepared during the first execution.
+    try:
+        await get_workers_client().prepare_action_environment(
+            authenticated_user.user_id, python_action
+        )
+    except Exception as e:
+        logger.warning(
+            f"Failed to enqueue environment preparation for action {python_action.action_type}: {e}"
+        )
+
 
 @router.get("", status_code=status.HTTP_200_OK)
 async def list_actions(
@@ -2,6 +2,7 @@ from fastapi import APIRouter, status, Depends
 from pydantic import BaseModel
 
 from admyral.server.auth import authenticate
+from admyral.server.auth_cache import get_auth_cache
 from admyral.models import AuthenticatedUser, ApiKey
 from admyral.server.deps import get_admyral_store
 from admyral.utils.api_key import generate_api_key
@@ -44,3 +45,4 @@ async def delete_api_key(
     authenticated_user: AuthenticatedUser = Depends(authenticate),
 ) -> None:
     await get_admyral_store().delete_api_key(authenticated_user.user_id, api_key_id)
+    get_auth_cache().invalidate_user(authenticated_user.user_id)
@@ -19,6 +19,7 @@ from admyral.editor import (
 from admyral.server.endpoints.workflow_endpoints import push_workflow_impl
 from admyral.server.auth import authenticate
 from admyral.compiler.yaml_workflow_compiler import validate_workflow
+from admyral.compiler.execution_plan_compiler import compile_execution_plan
 
 
 VALID_WORKFLOW_NAME_REGEX = re.compile(r"^[a-zA-Z][a-zA-Z0-9 _]*$")
@@ -145,6 +146,8 @@ async def create_workflow_from_react_flow_graph(
             detail=str(e),
         ) from e
 
+    workflow.execution_plan = compile_execution_plan(workflow.workflow_dag)
+
     try:
         await store.create_workflow(
             user_id=authenticated_user.user_id, workflow=workflow
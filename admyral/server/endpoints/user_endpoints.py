@@ -1,6 +1,7 @@
 from fastapi import APIRouter, status, Depends
 
 from admyral.server.auth import authenticate
+from admyral.server.auth_cache import get_auth_cache
 from admyral.models import AuthenticatedUser, UserProfile
 from admyral.server.deps import get_admyral_store
 
@@ -20,3 +21,4 @@ async def delete_user_profile(
     authenticated_user: AuthenticatedUser = Depends(authenticate),
 ) -> None:
     await get_admyral_store().delete_user(authenticated_user.user_id)
+    get_auth_cache().invalidate_user(authenticated_user.user_id)
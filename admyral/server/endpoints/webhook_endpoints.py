@@ -1,17 +1,34 @@
-from fastapi import APIRouter, status, Header, Request
+import asyncio
+from fastapi import APIRouter, status, Header, Request, HTTPException
 from typing import Optional, Annotated
-import json
 
-from admyral.models import WorkflowTriggerResponse, WorkflowTriggerType
-from admyral.server.deps import get_admyral_store, get_workers_client
+from admyral.models import (
+    WorkflowTriggerResponse,
+    WorkflowBulkTriggerResponse,
+    WorkflowBulkTriggerEventResult,
+    TriggerStatus,
+)
+from admyral.server.deps import get_workers_client
+from admyral.server.webhook_routing_table import WebhookRoutingTable, WebhookRoute
+from admyral.server.webhook_ingestion import (
+    WEBHOOK_SOURCE_NAME,
+    get_webhook_ingestion_dispatcher,
+)
+from admyral.server.idempotency import IDEMPOTENCY_KEY_HEADER, get_idempotency_key
+from admyral.config.config import CONFIG
 from admyral.typings import JsonValue
 from admyral.utils.collections import is_not_empty
+from admyral.utils.json import json_loads
 
 
 router = APIRouter()
 
 
-WEBHOOK_SOURCE_NAME = "webhook"
+NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+}
 
 
 async def _extract_payload_from_request(request: Request) -> JsonValue:
@@ -23,68 +40,226 @@ async def _extract_payload_from_request(request: Request) -> JsonValue:
             request.headers.get("user-agent")
             == "Slackbot 1.0 (+https://api.slack.com/robots)"
         ):
-            payload = json.loads(body.get("payload"))
+            payload = json_loads(body.get("payload"))
         else:
             raise ValueError("Unsupported content type.")
     else:
         body = await request.body()
         if is_not_empty(body):
-            payload = json.loads(body)
+            payload = json_loads(body)
         else:
             payload = None
     return payload
 
 
+async def _resolve_webhook_route(
+    webhook_id: str, webhook_secret: str | None
+) -> WebhookRoute:
+    route = await WebhookRoutingTable.get(webhook_id)
+    if not route.verify_secret(webhook_secret):
+        raise ValueError("Invalid webhook secret.")
+    return route
+
+
+async def _start_workflow(
+    route: WebhookRoute,
+    payload: dict[str, JsonValue],
+    idempotency_key: str | None = None,
+) -> bool:
+    # launch the workflow execution in the background
+    return await get_workers_client().start_workflow(
+        route.user_id,
+        route.workflow,
+        WEBHOOK_SOURCE_NAME,
+        payload,
+        trigger_default_args=route.default_args,
+        idempotency_key=idempotency_key,
+    )
+
+
 async def _handle_webhook_trigger(
     webhook_id: str,
     webhook_secret: str,
     payload: Optional[JsonValue],
+    idempotency_key: str | None = None,
 ) -> WorkflowTriggerResponse:
     """
     Handle the webhook trigger.
 
     Args:
         webhook_id: The webhook id.
+        idempotency_key: The value of the Idempotency-Key header.
     """
     payload = payload or {}
     if not isinstance(payload, dict):
         raise ValueError("Payload must be a JSON object.")
 
-    webhook = await get_admyral_store().get_webhook(webhook_id)
-    if not webhook:
-        raise ValueError(f"Webhook with id {webhook_id} not found.")
-    if webhook.webhook_secret != webhook_secret:
-        raise ValueError("Invalid webhook secret.")
+    route = await _resolve_webhook_route(webhook_id, webhook_secret)
     # check whether the workflow is active
-    user_id_and_workflow = await get_admyral_store().get_workflow_for_webhook(
-        webhook.workflow_id
-    )
-    if not user_id_and_workflow:
-        raise ValueError(f"Invalid webhook with id {webhook_id}. Workflow not found.")
-    user_id, workflow = user_id_and_workflow
-    if not workflow.is_active:
+    if not route.is_active:
         return WorkflowTriggerResponse.inactive()
 
-    webhook_triggers = list(
-        filter(
-            lambda trigger: trigger.type == WorkflowTriggerType.WEBHOOK,
-            workflow.workflow_dag.start.triggers,
+    idempotency_key = get_idempotency_key(
+        idempotency_key, payload, route.idempotency_key_path
+    )
+
+    if CONFIG.webhook_fast_ack:
+        # acknowledge once the payload is durable. the dispatcher starts the run and
+        # deduplicates it.
+        await get_webhook_ingestion_dispatcher().enqueue(
+            webhook_id, [payload], [idempotency_key]
+        )
+        return WorkflowTriggerResponse.success()
+
+    if not await _start_workflow(route, payload, idempotency_key):
+        return WorkflowTriggerResponse.duplicate()
+
+    return WorkflowTriggerResponse.success()
+
+
+async def _extract_bulk_payloads_from_request(request: Request) -> list[JsonValue]:
+    body = await request.body()
+    if not is_not_empty(body):
+        return []
+
+    content_type = request.headers.get("Content-Type", "").split(";")[0].strip()
+    try:
+        if content_type in NDJSON_CONTENT_TYPES:
+            return [json_loads(line) for line in body.splitlines() if line.strip()]
+        payloads = json_loads(body)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid JSON or NDJSON body: {e}",
+        )
+    return payloads if isinstance(payloads, list) else [payloads]
+
+
+async def _handle_bulk_webhook_trigger(
+    webhook_id: str,
+    webhook_secret: str | None,
+    payloads: list[JsonValue],
+    idempotency_key: str | None = None,
+) -> WorkflowBulkTriggerResponse:
+    """
+    Handle a bulk webhook trigger. Every event starts its own workflow run.
+
+    Args:
+        webhook_id: The webhook id.
+        payloads: The events. Each event must be a JSON object.
+        idempotency_key: The value of the Idempotency-Key header. The key of an
+            event is the header value suffixed with the index of the event.
+    """
+    if len(payloads) > CONFIG.webhook_bulk_max_events:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many events. At most {CONFIG.webhook_bulk_max_events} events are allowed per request.",
+        )
+
+    # the webhook is validated once for all events
+    route = await _resolve_webhook_route(webhook_id, webhook_secret)
+    if not route.is_active:
+        return WorkflowBulkTriggerResponse(status=TriggerStatus.INACTIVE)
+
+    results = [
+        WorkflowBulkTriggerEventResult(index=idx, status=TriggerStatus.SUCCESS)
+        if isinstance(payload, dict)
+        else WorkflowBulkTriggerEventResult(
+            index=idx,
+            status=TriggerStatus.FAILED,
+            error="Payload must be a JSON object.",
+        )
+        for idx, payload in enumerate(payloads)
+    ]
+    valid_events = [
+        (
+            result,
+            payloads[result.index],
+            get_idempotency_key(
+                f"{idempotency_key}:{result.index}" if idempotency_key else None,
+                payloads[result.index],
+                route.idempotency_key_path,
+            ),
+        )
+        for result in results
+        if result.status == TriggerStatus.SUCCESS
+    ]
+
+    if CONFIG.webhook_fast_ack:
+        await get_webhook_ingestion_dispatcher().enqueue(
+            webhook_id,
+            [payload for _, payload, _ in valid_events],
+            [key for _, _, key in valid_events],
         )
+    else:
+        semaphore = asyncio.Semaphore(CONFIG.webhook_bulk_concurrency)
+
+        async def start(
+            result: WorkflowBulkTriggerEventResult,
+            payload: dict[str, JsonValue],
+            event_idempotency_key: str | None,
+        ) -> None:
+            async with semaphore:
+                try:
+                    if not await _start_workflow(route, payload, event_idempotency_key):
+                        result.status = TriggerStatus.DUPLICATE
+                except Exception as e:
+                    result.status = TriggerStatus.FAILED
+                    result.error = str(e)
+
+        await asyncio.gather(*[start(*event) for event in valid_events])
+
+    # duplicates were already processed, hence, they do not fail the request
+    status = (
+        TriggerStatus.FAILED
+        if any(result.status == TriggerStatus.FAILED for result in results)
+        else TriggerStatus.SUCCESS
     )
-    if len(webhook_triggers) > 1:
-        raise ValueError("Multiple webhook triggers found.")
-    webhook_trigger = webhook_triggers[0]
+    return WorkflowBulkTriggerResponse(status=status, results=results)
 
-    # launch the workflow execution in the background
-    await get_workers_client().start_workflow(
-        user_id,
-        workflow,
-        WEBHOOK_SOURCE_NAME,
-        payload,
-        trigger_default_args=webhook_trigger.default_args_dict,
+
+@router.post("/bulk/{webhook_id}", status_code=status.HTTP_200_OK)
+async def trigger_webhook_bulk_post(
+    webhook_id: str,
+    request: Request,
+    authorization: Annotated[str | None, Header()] = None,
+) -> WorkflowBulkTriggerResponse:
+    """
+    Trigger the webhook with the given id once per event. The body is either a JSON
+    array of events or newline-delimited JSON (Content-Type: application/x-ndjson).
+
+    Args:
+        webhook_id: The webhook id.
+    """
+    payloads = await _extract_bulk_payloads_from_request(request)
+    return await _handle_bulk_webhook_trigger(
+        webhook_id,
+        authorization,
+        payloads,
+        request.headers.get(IDEMPOTENCY_KEY_HEADER),
     )
 
-    return WorkflowTriggerResponse.success()
+
+@router.post("/bulk/{webhook_id}/{webhook_secret}", status_code=status.HTTP_200_OK)
+async def trigger_webhook_bulk_post_with_secret_path(
+    webhook_id: str,
+    webhook_secret: str,
+    request: Request,
+) -> WorkflowBulkTriggerResponse:
+    """
+    Trigger the webhook with the given id once per event. The body is either a JSON
+    array of events or newline-delimited JSON (Content-Type: application/x-ndjson).
+
+    Args:
+        webhook_id: The webhook id.
+    """
+    payloads = await _extract_bulk_payloads_from_request(request)
+    return await _handle_bulk_webhook_trigger(
+        webhook_id,
+        webhook_secret,
+        payloads,
+        request.headers.get(IDEMPOTENCY_KEY_HEADER),
+    )
 
 
 @router.post("/{webhook_id}", status_code=status.HTTP_200_OK)
@@ -100,7 +275,9 @@ async def trigger_webhook_post(
         webhook_id: The webhook id.
     """
     payload = await _extract_payload_from_request(request)
-    return await _handle_webhook_trigger(webhook_id, authorization, payload)
+    return await _handle_webhook_trigger(
+        webhook_id, authorization, payload, request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    )
 
 
 @router.post("/{webhook_id}/{webhook_secret}", status_code=status.HTTP_200_OK)
@@ -117,7 +294,9 @@ async def trigger_webhook_post_with_secret_path(
         webhook_id: The webhook id.
     """
     payload = await _extract_payload_from_request(request)
-    return await _handle_webhook_trigger(webhook_id, webhook_secret, payload)
+    return await _handle_webhook_trigger(
+        webhook_id, webhook_secret, payload, request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    )
 
 
 @router.get("/{webhook_id}", status_code=status.HTTP_200_OK)
@@ -132,7 +311,9 @@ async def trigger_webhook_get(
     """
     params = dict(request.query_params.items())
     authorization = request.headers.get("Authorization")
-    return await _handle_webhook_trigger(webhook_id, authorization, params)
+    return await _handle_webhook_trigger(
+        webhook_id, authorization, params, request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    )
 
 
 @router.get("/{webhook_id}/{webhook_secret}", status_code=status.HTTP_200_OK)
@@ -148,4 +329,6 @@ async def trigger_webhook_get_with_secret_path(
         webhook_id: The webhook id.
     """
     params = dict(request.query_params.items())
-    return await _handle_webhook_trigger(webhook_id, webhook_secret, params)
+    return await _handle_webhook_trigger(
+        webhook_id, webhook_secret, params, request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    )
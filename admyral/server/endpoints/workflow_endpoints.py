@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status, Body, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, status, Body, Depends, HTTPException, UploadFile, Header
 from fastapi.responses import StreamingResponse
 from typing import Optional, Annotated
 from uuid import uuid4
@@ -7,6 +7,7 @@ import io
 
 from admyral.utils.collections import is_not_empty
 from admyral.server.deps import get_admyral_store, get_workers_client
+from admyral.server.webhook_routing_table import WebhookRoutingTable
 from admyral.models import (
     AuthenticatedUser,
     Workflow,
@@ -26,6 +27,7 @@ from admyral.compiler.yaml_workflow_compiler import (
     validate_workflow,
     decompile_workflow_to_yaml,
 )
+from admyral.compiler.execution_plan_compiler import compile_execution_plan
 
 
 logger = get_logger(__name__)
@@ -114,9 +116,13 @@ async def push_workflow_impl(
         workflow_name=workflow_name,
         workflow_dag=workflow_dag,
         is_active=activate,
+        execution_plan=compile_execution_plan(workflow_dag),
     )
 
     await admyral_store.store_workflow(user_id, workflow)
+    WebhookRoutingTable.invalidate()
+    # reload the workflow such that schedules can reference the stored version
+    workflow = await admyral_store.get_workflow_by_id(user_id, workflow_id)
 
     # Handle schedule update
 
@@ -176,6 +182,7 @@ async def push_workflow_impl(
     elif existing_webhook:
         # Case: we had a webhook but it was removed in the newest push
         await admyral_store.delete_webhook(user_id, existing_webhook.webhook_id)
+        WebhookRoutingTable.invalidate()
 
     # construct response
     response = WorkflowPushResponse()
@@ -243,6 +250,7 @@ async def list_workflows(
 async def trigger_workflow(
     workflow_name: str,
     payload: Annotated[dict[str, JsonValue], Body()] = {},
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key")] = None,
     authenticated_user: AuthenticatedUser = Depends(authenticate),
 ) -> WorkflowTriggerResponse:
     """
@@ -251,6 +259,7 @@ async def trigger_workflow(
     Args:
         workflow_name: The workflow name.
         payload: The payload to pass to the workflow.
+        idempotency_key: Duplicate triggers with the same key are ignored.
     """
     workflow = await get_admyral_store().get_workflow_by_name(
         authenticated_user.user_id, workflow_name
@@ -259,9 +268,14 @@ async def trigger_workflow(
         raise ValueError(f"Workflow with name {workflow_name} not found.")
     if not workflow.is_active:
         return WorkflowTriggerResponse.inactive()
-    await get_workers_client().start_workflow(
-        authenticated_user.user_id, workflow, MANUAL_TRIGGER_SOURCE_NAME, payload
-    )
+    if not await get_workers_client().start_workflow(
+        authenticated_user.user_id,
+        workflow,
+        MANUAL_TRIGGER_SOURCE_NAME,
+        payload,
+        idempotency_key=idempotency_key,
+    ):
+        return WorkflowTriggerResponse.duplicate()
     return WorkflowTriggerResponse.success()
 
 
@@ -289,6 +303,7 @@ async def activate_workflow(
         await get_admyral_store().set_workflow_active_state(
             authenticated_user.user_id, workflow.workflow_id, is_active=True
         )
+        WebhookRoutingTable.invalidate()
 
         schedules = await get_admyral_store().list_schedules_for_workflow(
             authenticated_user.user_id, workflow.workflow_id
@@ -325,6 +340,7 @@ async def deactivate_workflow(
         await get_admyral_store().set_workflow_active_state(
             authenticated_user.user_id, workflow.workflow_id, is_active=False
         )
+        WebhookRoutingTable.invalidate()
 
         schedules = await get_admyral_store().list_schedules_for_workflow(
             authenticated_user.user_id, workflow.workflow_id
@@ -363,6 +379,7 @@ async def delete_workflow(
     await get_admyral_store().remove_workflow(
         authenticated_user.user_id, workflow.workflow_id
     )
+    WebhookRoutingTable.invalidate()
 
 
 @router.post("/import", status_code=status.HTTP_201_CREATED)
@@ -383,6 +400,7 @@ async def import_workflow(
             workflow_name=workflow_name,
             workflow_dag=workflow_dag,
             is_active=False,
+            execution_plan=compile_execution_plan(workflow_dag),
         )
     except ValueError as e:
         raise HTTPException(
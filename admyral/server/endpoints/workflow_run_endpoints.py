@@ -1,7 +1,7 @@
-from fastapi import APIRouter, status, HTTPException, Depends
+from fastapi import APIRouter, status, HTTPException, Depends, Response
 from fastapi.responses import StreamingResponse
-import json
 import io
+from typing import AsyncGenerator
 
 from admyral.server.auth import authenticate
 from admyral.models import (
@@ -11,53 +11,117 @@ from admyral.models import (
     WorkflowRunStepWithSerializedResult,
 )
 from admyral.server.deps import get_admyral_store
+from admyral.utils.pagination import encode_cursor
+from admyral.utils.json import json_dumps, json_dumps_bytes
 
 
 router = APIRouter()
 
 
 MAX_SERIALIZED_RESULT_LENGTH = 10_000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
 
 @router.get("/{workflow_id}", status_code=status.HTTP_200_OK)
 async def list_workflow_runs(
+    response: Response,
     workflow_id: str,
     limit: int | None = 100,
+    cursor: str | None = None,
     authenticated_user: AuthenticatedUser = Depends(authenticate),
 ) -> list[WorkflowRunMetadata]:
     """
-    List all workflow runs.
+    List the workflow runs from newest to oldest. If there might be more runs,
+    the cursor for the next page is returned in the X-Next-Cursor header.
 
     Args:
         workflow_id: The workflow id
+        limit: The maximum number of runs to return
+        cursor: The cursor of the page to return
 
     Returns:
         A list of workflow runs.
     """
-    return await get_admyral_store().list_workflow_runs(
-        authenticated_user.user_id, workflow_id, limit=limit
-    )
+    try:
+        workflow_runs = await get_admyral_store().list_workflow_runs(
+            authenticated_user.user_id, workflow_id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if limit is not None and len(workflow_runs) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            workflow_runs[-1].created_at, workflow_runs[-1].run_id
+        )
+    return workflow_runs
+
+
+@router.get("/{workflow_id}/export", status_code=status.HTTP_200_OK)
+async def export_workflow_runs(
+    workflow_id: str,
+    include_steps: bool = True,
+    authenticated_user: AuthenticatedUser = Depends(authenticate),
+) -> StreamingResponse:
+    """
+    Export all workflow runs from newest to oldest as newline-delimited JSON.
+    Each line contains the metadata of a run and, optionally, of its steps.
+
+    Args:
+        workflow_id: The workflow id
+        include_steps: Whether to include the step metadata of each run
+
+    Returns:
+        The workflow runs as an NDJSON stream.
+    """
+
+    async def _stream_ndjson():
+        async for workflow_run in get_admyral_store().export_workflow_runs(
+            authenticated_user.user_id, workflow_id, include_steps=include_steps
+        ):
+            yield workflow_run.model_dump_json() + "\n"
+
+    return StreamingResponse(_stream_ndjson(), media_type="application/x-ndjson")
 
 
 @router.get("/{workflow_id}/{workflow_run_id}", status_code=status.HTTP_200_OK)
 async def get_workflow_run_steps(
+    response: Response,
     workflow_id: str,
     workflow_run_id: str,
+    limit: int | None = None,
+    cursor: str | None = None,
     authenticated_user: AuthenticatedUser = Depends(authenticate),
 ) -> list[WorkflowRunStepMetadata]:
     """
-    Get workflow runs by workflow id.
+    Get the steps of a workflow run in execution order. If a limit is set and there
+    might be more steps, the cursor for the next page is returned in the X-Next-Cursor
+    header.
 
     Args:
         workflow_id: The workflow id
         workflow_run_id: The workflow run id
+        limit: The maximum number of steps to return
+        cursor: The cursor of the page to return
 
     Returns:
         A list of workflow run steps.
     """
-    return await get_admyral_store().list_workflow_run_steps(
-        authenticated_user.user_id, workflow_id, workflow_run_id
-    )
+    try:
+        steps = await get_admyral_store().list_workflow_run_steps(
+            authenticated_user.user_id,
+            workflow_id,
+            workflow_run_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if limit is not None and len(steps) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            steps[-1].created_at, steps[-1].step_id
+        )
+    return steps
 
 
 @router.get(
@@ -87,7 +151,7 @@ async def get_workflow_run_step(
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
 
-    serialized_result = json.dumps(step.result, indent=4)
+    serialized_result = json_dumps(step.result, indent=True)
     if len(serialized_result) > MAX_SERIALIZED_RESULT_LENGTH:
         serialized_result = (
             serialized_result[:MAX_SERIALIZED_RESULT_LENGTH]
@@ -129,8 +193,7 @@ async def download_workflow_run_step_result(
         raise HTTPException(status_code=404, detail="Step not found")
 
     # Convert to JSON and create a string buffer
-    json_str = json.dumps(step.result, indent=4)
-    json_bytes = json_str.encode("utf-8")
+    json_bytes = json_dumps_bytes(step.result, indent=True)
 
     return StreamingResponse(
         io.BytesIO(json_bytes),
@@ -139,3 +202,51 @@ async def download_workflow_run_step_result(
             "Content-Disposition": f'attachment; filename="step_result_{workflow_run_step_id}.json"'
         },
     )
+
+
+@router.get(
+    "/{workflow_id}/{workflow_run_id}/{workflow_run_step_id}/logs",
+    status_code=status.HTTP_200_OK,
+)
+async def stream_workflow_run_step_logs(
+    workflow_id: str,
+    workflow_run_id: str,
+    workflow_run_step_id: str,
+    authenticated_user: AuthenticatedUser = Depends(authenticate),
+) -> StreamingResponse:
+    """
+    Stream the logs of a workflow run step.
+
+    Args:
+        workflow_id: The workflow id
+        workflow_run_id: The workflow run id
+        workflow_run_step_id: The workflow run step id
+
+    Returns:
+        The logs as a plain text stream.
+    """
+    log_chunks = get_admyral_store().stream_workflow_run_step_logs(
+        authenticated_user.user_id,
+        workflow_id,
+        workflow_run_id,
+        workflow_run_step_id,
+    )
+    # the step is looked up before the first chunk is yielded. hence, we can still
+    # respond with 404 before the streaming response is started.
+    try:
+        first_chunk = await anext(log_chunks, None)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Step not found")
+
+    async def stream_logs() -> AsyncGenerator[str, None]:
+        # close the store's generator (and release its database session) if the
+        # client disconnects before all logs were streamed
+        try:
+            if first_chunk is not None:
+                yield first_chunk
+            async for log_chunk in log_chunks:
+                yield log_chunk
+        finally:
+            await log_chunks.aclose()
+
+    return StreamingResponse(stream_logs(), media_type="text/plain")
@@ -0,0 +1,50 @@
+from admyral.typings import JsonValue
+from admyral.utils.json import json_dumps
+
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+
+def extract_idempotency_key_from_payload(payload: JsonValue, path: str) -> str | None:
+    """
+    Extracts the idempotency key from the payload.
+
+    Args:
+        payload: The payload.
+        path: Dot-separated path to the key, e.g., "alert.id" or "events.0.id".
+            Numeric segments index into lists.
+
+    Returns:
+        The key or None if the path does not exist in the payload.
+    """
+    value = payload
+    for segment in path.split("."):
+        if isinstance(value, dict):
+            if segment not in value:
+                return None
+            value = value[segment]
+        elif isinstance(value, list) and segment.isdigit():
+            idx = int(segment)
+            if idx >= len(value):
+                return None
+            value = value[idx]
+        else:
+            return None
+
+    if value is None:
+        return None
+    return value if isinstance(value, str) else json_dumps(value)
+
+
+def get_idempotency_key(
+    header_value: str | None, payload: JsonValue, path: str | None
+) -> str | None:
+    """
+    Determines the idempotency key of a workflow trigger. The Idempotency-Key header
+    takes precedence over the key configured on the trigger.
+    """
+    if header_value:
+        return header_value
+    if path:
+        return extract_idempotency_key_from_payload(payload, path)
+    return None
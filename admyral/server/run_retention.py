@@ -0,0 +1,104 @@
+import asyncio
+import gzip
+import os
+from datetime import timedelta
+from uuid import uuid4
+
+from admyral.db.store_interface import StoreInterface
+from admyral.models import WorkflowRunArchive
+from admyral.config.config import GlobalConfig
+from admyral.logger import get_logger
+from admyral.utils.time import utc_now
+
+
+logger = get_logger(__name__)
+
+
+# fixed id of the advisory lock which ensures that only one replica of the API
+# server enforces the run retention at a time
+RUN_RETENTION_LOCK_ID = 7_301_946_225
+
+
+def _write_archive(
+    archive_directory: str, workflow_runs: list[WorkflowRunArchive]
+) -> str:
+    os.makedirs(archive_directory, exist_ok=True)
+    archive_file = os.path.join(
+        archive_directory,
+        f"workflow_runs_{utc_now().strftime('%Y%m%dT%H%M%S')}_{uuid4().hex[:8]}.jsonl.gz",
+    )
+    with gzip.open(archive_file, "wt", encoding="utf-8") as f:
+        for workflow_run in workflow_runs:
+            f.write(workflow_run.model_dump_json())
+            f.write("\n")
+    return archive_file
+
+
+def get_run_retention_days(config: GlobalConfig, workflow_id: str) -> int | None:
+    if workflow_id in config.run_retention_days_by_workflow:
+        return config.run_retention_days_by_workflow[workflow_id]
+    return config.run_retention_days
+
+
+def is_run_retention_enabled(config: GlobalConfig) -> bool:
+    return config.run_retention_days is not None or any(
+        retention_days is not None
+        for retention_days in config.run_retention_days_by_workflow.values()
+    )
+
+
+async def enforce_run_retention(store: StoreInterface, config: GlobalConfig) -> int:
+    """
+    Deletes the workflow runs, including their steps and logs, which are older than
+    the retention period of their workflow. Runs are deleted in batches of
+    `run_retention_batch_size` such that every transaction only holds its locks for
+    a short time. If an archive directory is configured, every batch is written to
+    a gzip-compressed JSONL file before it is deleted.
+
+    The pass is skipped if another replica is currently enforcing the retention.
+    Otherwise, replicas would archive and delete the same batches concurrently.
+
+    Returns:
+        The number of deleted workflow runs.
+    """
+    async with store.try_advisory_lock(RUN_RETENTION_LOCK_ID) as is_acquired:
+        if not is_acquired:
+            logger.info(
+                "Skipping workflow run retention because another replica is enforcing it."
+            )
+            return 0
+        return await _enforce_run_retention(store, config)
+
+
+async def _enforce_run_retention(store: StoreInterface, config: GlobalConfig) -> int:
+    num_deleted_runs = 0
+
+    for workflow_id in await store.list_all_workflow_ids():
+        retention_days = get_run_retention_days(config, workflow_id)
+        if retention_days is None:
+            continue
+
+        created_before = utc_now() - timedelta(days=retention_days)
+        while True:
+            run_ids = await store.list_workflow_run_ids_created_before(
+                workflow_id, created_before, config.run_retention_batch_size
+            )
+            if not run_ids:
+                break
+
+            if config.run_archive_directory:
+                workflow_runs = await store.get_workflow_runs_for_archive(run_ids)
+                archive_file = await asyncio.to_thread(
+                    _write_archive, config.run_archive_directory, workflow_runs
+                )
+                logger.info(
+                    f"Archived {len(workflow_runs)} runs of workflow {workflow_id} to {archive_file}."
+                )
+
+            await store.delete_workflow_runs(run_ids)
+            num_deleted_runs += len(run_ids)
+
+            if len(run_ids) < config.run_retention_batch_size:
+                break
+
+    return num_deleted_runs
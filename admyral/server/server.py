@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from fastapi_nextauth_jwt.exceptions import NextAuthJWTException
 
@@ -7,6 +8,7 @@ from admyral.logger import get_logger
 from admyral.server.deps import setup_dependencies
 from admyral.server.background_tasks import start_background_tasks
 from admyral.config.config import API_V1_STR
+from admyral.utils.json import json_dumps_bytes
 from admyral.server.endpoints import (
     action_router,
     workflow_router,
@@ -22,6 +24,11 @@ from admyral.server.endpoints import (
 logger = get_logger(__name__)
 
 
+class AdmyralJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return json_dumps_bytes(content)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # On Startup
@@ -32,7 +39,9 @@ async def lifespan(app: FastAPI):
     # ...
 
 
-app = FastAPI(title="Admyral", lifespan=lifespan)
+app = FastAPI(
+    title="Admyral", lifespan=lifespan, default_response_class=AdmyralJSONResponse
+)
 
 
 app.add_middleware(
@@ -0,0 +1,253 @@
+import asyncio
+import math
+import time
+from datetime import timedelta
+from pydantic import BaseModel
+
+from admyral.db.store_interface import StoreInterface
+from admyral.workers.workers_client import WorkersClient
+from admyral.models import WebhookEvent
+from admyral.server.webhook_routing_table import WebhookRoutingTable
+from admyral.typings import JsonValue
+from admyral.config.config import CONFIG, GlobalConfig
+from admyral.utils.time import utc_now
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+WEBHOOK_SOURCE_NAME = "webhook"
+MAX_RETRY_DELAY_IN_SECONDS = 5 * 60
+
+
+class WebhookIngestionMetrics(BaseModel):
+    enqueued_events: int
+    dispatched_events: int
+    retried_events: int
+    dropped_events: int
+    duplicate_events: int
+    pending_events: int
+    failed_events: int
+    oldest_pending_event_age_seconds: float
+    last_batch_size: int
+    last_batch_duration_ms: float
+
+
+class WebhookIngestionDispatcher:
+    """
+    Drains the webhook ingestion queue into Temporal.
+
+    Events are claimed in batches with a lease, hence, multiple API servers can
+    dispatch concurrently. Failed starts are retried with exponential backoff until
+    `max_attempts` is reached. Such failed events are kept for the failed event
+    retention period. Events of deleted webhooks or inactive workflows are
+    dropped. Every start carries an idempotency key, hence, events are dispatched at
+    most once within the idempotency window.
+    """
+
+    def __init__(
+        self,
+        store: StoreInterface,
+        workers_client: WorkersClient,
+        config: GlobalConfig = CONFIG,
+    ) -> None:
+        self.store = store
+        self.workers_client = workers_client
+        self.batch_size = config.webhook_dispatch_batch_size
+        self.concurrency = config.webhook_dispatch_concurrency
+        self.poll_interval_ms = config.webhook_dispatch_poll_interval_ms
+        self.lease_seconds = config.webhook_dispatch_lease_seconds
+        self.max_attempts = config.webhook_dispatch_max_attempts
+        self.start_timeout = timedelta(
+            seconds=config.webhook_dispatch_start_timeout_seconds
+        )
+        # the events of a batch are started in rounds of `concurrency` events. all
+        # rounds must finish before the lease of the batch expires.
+        num_rounds = math.ceil(self.batch_size / self.concurrency)
+        if self.start_timeout.total_seconds() * num_rounds >= self.lease_seconds:
+            raise ValueError(
+                "The webhook dispatch lease must be longer than the start timeout times the number of dispatch rounds per batch."
+            )
+        self.failed_event_retention_days = config.webhook_failed_event_retention_days
+        self.enqueued_events = 0
+        self.dispatched_events = 0
+        self.retried_events = 0
+        self.dropped_events = 0
+        self.duplicate_events = 0
+        self.last_batch_size = 0
+        self.last_batch_duration_ms = 0.0
+
+    async def enqueue(
+        self,
+        webhook_id: str,
+        payloads: list[dict[str, JsonValue]],
+        idempotency_keys: list[str | None] | None = None,
+    ) -> None:
+        await self.store.enqueue_webhook_events(webhook_id, payloads, idempotency_keys)
+        self.enqueued_events += len(payloads)
+
+    async def _retry_event(self, event: WebhookEvent, error: str) -> bool:
+        retry_in_seconds = min(2**event.attempts, MAX_RETRY_DELAY_IN_SECONDS)
+        logger.warning(
+            f"Failed to dispatch webhook event {event.event_id} (attempt {event.attempts + 1}/{self.max_attempts}). Retrying in {retry_in_seconds}s. Error: {error}"
+        )
+        self.retried_events += 1
+        try:
+            await self.store.fail_webhook_event(event.event_id, error, retry_in_seconds)
+        except Exception as e:
+            # the event becomes due again once its lease expired
+            logger.error(
+                f"Failed to record the failed dispatch of webhook event {event.event_id}: {e}"
+            )
+        return False
+
+    async def _dispatch_event(self, event: WebhookEvent) -> bool:
+        """
+        Returns:
+            True if the event was dispatched or dropped. False if it must be retried.
+        """
+        try:
+            route = await WebhookRoutingTable.get(event.webhook_id)
+        except ValueError as e:
+            logger.warning(f"Dropping webhook event {event.event_id}: {e}")
+            self.dropped_events += 1
+            return True
+        except Exception as e:
+            return await self._retry_event(event, f"Failed to resolve webhook: {e}")
+
+        if not route.is_active:
+            logger.info(
+                f"Dropping webhook event {event.event_id} because workflow {route.workflow.workflow_id} is inactive."
+            )
+            self.dropped_events += 1
+            return True
+
+        # events without an idempotency key are deduplicated by their event id.
+        # hence, an event whose lease expired while it was being dispatched does not
+        # start a second run.
+        idempotency_key = event.idempotency_key or f"webhook-event:{event.event_id}"
+        try:
+            # the timeout of the request only bounds a single attempt of the
+            # Temporal client. hence, we also bound the retries of the client.
+            async with asyncio.timeout(self.start_timeout.total_seconds()):
+                is_started = await self.workers_client.start_workflow(
+                    route.user_id,
+                    route.workflow,
+                    WEBHOOK_SOURCE_NAME,
+                    event.payload,
+                    trigger_default_args=route.default_args,
+                    idempotency_key=idempotency_key,
+                    rpc_timeout=self.start_timeout,
+                )
+        except TimeoutError:
+            return await self._retry_event(
+                event,
+                f"Starting the workflow timed out after {self.start_timeout.total_seconds()}s.",
+            )
+        except Exception as e:
+            return await self._retry_event(event, str(e))
+
+        if is_started:
+            self.dispatched_events += 1
+        else:
+            self.duplicate_events += 1
+        return True
+
+    async def dispatch_batch(self) -> int:
+        """
+        Dispatches one batch of due events.
+
+        Returns:
+            The number of claimed events.
+        """
+        events = await self.store.claim_webhook_events(
+            self.batch_size, self.lease_seconds, self.max_attempts
+        )
+        if not events:
+            return 0
+
+        start = time.monotonic_ns()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def dispatch(event: WebhookEvent) -> bool:
+            async with semaphore:
+                try:
+                    return await self._dispatch_event(event)
+                except Exception as e:
+                    # the event becomes due again once its lease expired
+                    logger.error(
+                        f"Unexpected error while dispatching webhook event {event.event_id}: {e}"
+                    )
+                    return False
+
+        results = await asyncio.gather(*[dispatch(event) for event in events])
+        # events which were started must always be completed. otherwise, they are
+        # dispatched again once their lease expired.
+        await self.store.complete_webhook_events(
+            [event.event_id for event, done in zip(events, results) if done]
+        )
+
+        self.last_batch_size = len(events)
+        self.last_batch_duration_ms = (time.monotonic_ns() - start) / 1_000_000
+        return len(events)
+
+    async def delete_failed_events(self) -> int:
+        """
+        Deletes events which reached the maximum number of attempts and are older
+        than the retention period.
+
+        Returns:
+            The number of deleted events.
+        """
+        return await self.store.delete_failed_webhook_events(
+            self.max_attempts,
+            utc_now() - timedelta(days=self.failed_event_retention_days),
+        )
+
+    async def get_metrics(self) -> WebhookIngestionMetrics:
+        stats = await self.store.get_webhook_ingestion_queue_stats(self.max_attempts)
+        oldest_pending_event_age_seconds = (
+            (utc_now() - stats.oldest_pending_event_created_at).total_seconds()
+            if stats.oldest_pending_event_created_at
+            else 0.0
+        )
+        return WebhookIngestionMetrics(
+            enqueued_events=self.enqueued_events,
+            dispatched_events=self.dispatched_events,
+            retried_events=self.retried_events,
+            dropped_events=self.dropped_events,
+            duplicate_events=self.duplicate_events,
+            pending_events=stats.pending_events,
+            failed_events=stats.failed_events,
+            oldest_pending_event_age_seconds=oldest_pending_event_age_seconds,
+            last_batch_size=self.last_batch_size,
+            last_batch_duration_ms=self.last_batch_duration_ms,
+        )
+
+    async def run(self) -> None:
+        while True:
+            try:
+                num_events = await self.dispatch_batch()
+            except Exception as e:
+                logger.error(f"Failed to dispatch webhook events: {e}")
+                num_events = 0
+            if num_events < self.batch_size:
+                # the queue is drained. otherwise, we directly continue with the
+                # next batch.
+                await asyncio.sleep(self.poll_interval_ms / 1000)
+
+
+_webhook_ingestion_dispatcher: WebhookIngestionDispatcher | None = None
+
+
+def get_webhook_ingestion_dispatcher() -> WebhookIngestionDispatcher:
+    global _webhook_ingestion_dispatcher
+    if _webhook_ingestion_dispatcher is None:
+        # avoid circular import
+        from admyral.server.deps import get_admyral_store, get_workers_client
+
+        _webhook_ingestion_dispatcher = WebhookIngestionDispatcher(
+            get_admyral_store(), get_workers_client()
+        )
+    return _webhook_ingestion_dispatcher
@@ -0,0 +1,131 @@
+import hashlib
+import hmac
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from admyral.utils.singleton import Singleton
+from admyral.utils.single_flight import SingleFlight
+from admyral.models import Workflow, WorkflowTriggerType
+from admyral.typings import JsonValue
+from admyral.config.config import CONFIG
+
+
+WEBHOOK_ROUTING_TABLE_SIZE = 4096
+
+
+def _hash_webhook_secret(webhook_secret: str | None) -> bytes:
+    return hashlib.sha256((webhook_secret or "").encode()).digest()
+
+
+class WebhookRoute(NamedTuple):
+    webhook_id: str
+    webhook_secret_hash: bytes
+    user_id: str
+    workflow: Workflow
+    default_args: dict[str, JsonValue]
+    idempotency_key_path: str | None
+    version: int
+    expires_at: float
+
+    @property
+    def is_active(self) -> bool:
+        return self.workflow.is_active
+
+    def verify_secret(self, webhook_secret: str | None) -> bool:
+        return hmac.compare_digest(
+            self.webhook_secret_hash, _hash_webhook_secret(webhook_secret)
+        )
+
+
+class WebhookRoutingTable(metaclass=Singleton):
+    """
+    In-memory routing table of the API server mapping webhook IDs to the workflow
+    which they trigger.
+
+    Every change to workflows or webhooks made through this API server increments the
+    version of the routing table, which invalidates all routes. Routes expire after
+    `ttl` seconds such that changes made through other API servers become visible.
+    Concurrent misses for the same webhook share a single store lookup.
+    """
+
+    _routes: OrderedDict[str, WebhookRoute] = OrderedDict()
+    _inflight: SingleFlight[str, WebhookRoute] = SingleFlight()
+    _version: int = 0
+    _max_size: int = WEBHOOK_ROUTING_TABLE_SIZE
+    ttl: int = CONFIG.webhook_routing_cache_ttl_in_seconds
+
+    @classmethod
+    async def get(cls, webhook_id: str) -> WebhookRoute:
+        route = cls._routes.get(webhook_id)
+        if route is not None:
+            if route.version == cls._version and route.expires_at > time.monotonic():
+                cls._routes.move_to_end(webhook_id)
+                return route
+            del cls._routes[webhook_id]
+
+        return await cls._inflight.do(webhook_id, lambda: cls._load(webhook_id))
+
+    @classmethod
+    async def _fetch_route(cls, webhook_id: str) -> tuple[str, str, Workflow]:
+        # avoid circular import
+        from admyral.server.deps import get_admyral_store
+
+        webhook = await get_admyral_store().get_webhook(webhook_id)
+        if not webhook:
+            raise ValueError(f"Webhook with id {webhook_id} not found.")
+        user_id_and_workflow = await get_admyral_store().get_workflow_for_webhook(
+            webhook.workflow_id
+        )
+        if not user_id_and_workflow:
+            raise ValueError(
+                f"Invalid webhook with id {webhook_id}. Workflow not found."
+            )
+        user_id, workflow = user_id_and_workflow
+        return webhook.webhook_secret, user_id, workflow
+
+    @classmethod
+    async def _load(cls, webhook_id: str) -> WebhookRoute:
+        version = cls._version
+        webhook_secret, user_id, workflow = await cls._fetch_route(webhook_id)
+
+        webhook_triggers = list(
+            filter(
+                lambda trigger: trigger.type == WorkflowTriggerType.WEBHOOK,
+                workflow.workflow_dag.start.triggers,
+            )
+        )
+        if len(webhook_triggers) > 1:
+            raise ValueError("Multiple webhook triggers found.")
+
+        webhook_trigger = webhook_triggers[0] if webhook_triggers else None
+        route = WebhookRoute(
+            webhook_id=webhook_id,
+            webhook_secret_hash=_hash_webhook_secret(webhook_secret),
+            user_id=user_id,
+            workflow=workflow,
+            default_args=webhook_trigger.default_args_dict if webhook_trigger else {},
+            idempotency_key_path=webhook_trigger.idempotency_key
+            if webhook_trigger
+            else None,
+            version=version,
+            expires_at=time.monotonic() + cls.ttl,
+        )
+
+        # routes loaded before an invalidation are not cached
+        if cls.ttl > 0 and version == cls._version:
+            cls._routes[webhook_id] = route
+            cls._routes.move_to_end(webhook_id)
+            while len(cls._routes) > cls._max_size:
+                cls._routes.popitem(last=False)
+
+        return route
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Invalidates all routes. Must be called whenever workflows are pushed,
+        activated, deactivated, or deleted, or webhooks are deleted.
+        """
+        cls._version += 1
+        cls._routes.clear()
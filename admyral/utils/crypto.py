@@ -1,10 +1,19 @@
 import hashlib
 import hmac
 import os
+from functools import lru_cache
+from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from base64 import urlsafe_b64encode, urlsafe_b64decode
 
-from admyral.config.config import WEBHOOK_SIGNING_SECRET, SECRETS_ENCRYPTION_KEY
+from admyral.config.config import (
+    WEBHOOK_SIGNING_SECRET,
+    SECRETS_ENCRYPTION_KEY,
+    SECRETS_DECRYPTION_KEYS,
+)
+
+
+IV_LENGTH = 12
 
 
 def _generate_hs256(secret: bytes, data: str) -> str:
@@ -15,43 +24,92 @@ def generate_hs256(data: str) -> str:
     return _generate_hs256(WEBHOOK_SIGNING_SECRET, data)
 
 
-def encrypt_aes256_gcm(secret_key: bytes, plaintext: str) -> str:
-    # Generate a random 96-bit IV (Initialization Vector)
-    iv = os.urandom(12)
+@lru_cache(maxsize=16)
+def _get_aes_gcm(secret_key: bytes) -> AESGCM:
+    # the cipher object only holds the key schedule, hence, it can be reused
+    return AESGCM(secret_key)
+
 
-    # Create AES-GCM cipher object
-    aes_gcm = AESGCM(secret_key)
+def _encrypt(aes_gcm: AESGCM, plaintext: str) -> str:
+    # Generate a random 96-bit IV (Initialization Vector)
+    iv = os.urandom(IV_LENGTH)
 
     # Encrypt the plaintext and get the associated ciphertext
     ciphertext = aes_gcm.encrypt(iv, plaintext.encode(), None)
 
     # Concatenate IV and ciphertext and encode to base64
-    iv_ciphertext = iv + ciphertext
-    iv_ciphertext_b64 = urlsafe_b64encode(iv_ciphertext)
+    return urlsafe_b64encode(iv + ciphertext).decode()
 
-    return iv_ciphertext_b64.decode()
 
+def _decrypt(aes_gcm: AESGCM, iv_ciphertext: bytes) -> str:
+    # the IV are the first 12 bytes, followed by the ciphertext
+    iv = iv_ciphertext[:IV_LENGTH]
+    ciphertext = iv_ciphertext[IV_LENGTH:]
+    return aes_gcm.decrypt(iv, ciphertext, None).decode()
 
-def encrypt_secret(plaintext: str) -> str:
-    return encrypt_aes256_gcm(SECRETS_ENCRYPTION_KEY, plaintext)
+
+def encrypt_aes256_gcm(secret_key: bytes, plaintext: str) -> str:
+    return _encrypt(_get_aes_gcm(secret_key), plaintext)
 
 
 def decrypt_aes256_gcm(secret_key: bytes, iv_ciphertext_b64: str) -> str:
-    # Decode the base64 encoded IV and ciphertext
-    iv_ciphertext = urlsafe_b64decode(iv_ciphertext_b64)
+    return _decrypt(_get_aes_gcm(secret_key), urlsafe_b64decode(iv_ciphertext_b64))
+
+
+class SecretsCipher:
+    """
+    Encrypts secrets with AES-256-GCM using initialized cipher objects.
 
-    # Extract the IV (first 12 bytes) and the ciphertext
-    iv = iv_ciphertext[:12]
-    ciphertext = iv_ciphertext[12:]
+    Secrets are always encrypted with the encryption key. For key rotation, secrets
+    are decrypted with the encryption key first and then with the previous keys.
+    A secret is encrypted with the new key the next time it is written.
+    """
 
-    # Create AES-GCM cipher object
-    aes_gcm = AESGCM(secret_key)
+    def __init__(
+        self, encryption_key: bytes, decryption_keys: list[bytes] | None = None
+    ) -> None:
+        self._encryption_cipher = AESGCM(encryption_key)
+        self._decryption_ciphers = [self._encryption_cipher] + [
+            AESGCM(key)
+            for key in dict.fromkeys(decryption_keys or [])
+            if key != encryption_key
+        ]
 
-    # Decrypt the ciphertext
-    plaintext = aes_gcm.decrypt(iv, ciphertext, None)
+    def encrypt(self, plaintext: str) -> str:
+        return _encrypt(self._encryption_cipher, plaintext)
 
-    return plaintext.decode()
+    def decrypt(self, iv_ciphertext_b64: str) -> str:
+        iv_ciphertext = urlsafe_b64decode(iv_ciphertext_b64)
+        for aes_gcm in self._decryption_ciphers:
+            try:
+                return _decrypt(aes_gcm, iv_ciphertext)
+            except InvalidTag:
+                continue
+        raise ValueError("Failed to decrypt secret with any of the configured keys.")
+
+    def decrypt_many(self, iv_ciphertexts_b64: list[str]) -> list[str]:
+        return [
+            self.decrypt(iv_ciphertext_b64) for iv_ciphertext_b64 in iv_ciphertexts_b64
+        ]
+
+
+_secrets_cipher: SecretsCipher | None = None
+
+
+def get_secrets_cipher() -> SecretsCipher:
+    global _secrets_cipher
+    if _secrets_cipher is None:
+        _secrets_cipher = SecretsCipher(SECRETS_ENCRYPTION_KEY, SECRETS_DECRYPTION_KEYS)
+    return _secrets_cipher
+
+
+def encrypt_secret(plaintext: str) -> str:
+    return get_secrets_cipher().encrypt(plaintext)
 
 
 def decrypt_secret(ciphertext: str) -> str:
-    return decrypt_aes256_gcm(SECRETS_ENCRYPTION_KEY, ciphertext)
+    return get_secrets_cipher().decrypt(ciphertext)
+
+
+def decrypt_secrets(ciphertexts: list[str]) -> list[str]:
+    return get_secrets_cipher().decrypt_many(ciphertexts)
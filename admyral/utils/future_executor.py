@@ -1,4 +1,5 @@
 import asyncio
+import concurrent.futures
 from typing import Any
 
 
@@ -15,3 +16,11 @@ def execute_future(func: asyncio.coroutines) -> Any:
     assert MAIN_EVENT_LOOP is not None, "Main event loop not captured."
     future = asyncio.run_coroutine_threadsafe(func, MAIN_EVENT_LOOP)
     return future.result()
+
+
+def schedule_future(func: asyncio.coroutines) -> concurrent.futures.Future:
+    """
+    Schedules the coroutine on the main event loop without waiting for it.
+    """
+    assert MAIN_EVENT_LOOP is not None, "Main event loop not captured."
+    return asyncio.run_coroutine_threadsafe(func, MAIN_EVENT_LOOP)
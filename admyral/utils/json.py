@@ -1,4 +1,125 @@
+import collections.abc
+import dataclasses
+import json
+from datetime import datetime
 from typing import Any
+from uuid import UUID
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# Central JSON codec. orjson is used if it is installed, otherwise we fall back to
+# the stdlib json module with the same output format (compact, not ASCII-escaped).
+# Values which orjson cannot serialize (e.g., integers exceeding 64 bit) are
+# serialized with the stdlib as well. Pydantic models, dataclasses, and other
+# values which Temporal passes around are converted by `_default` in both cases.
+
+# orjson silently parses integers exceeding 64 bit as floats. Every integer which
+# does not fit into 64 bit has at least 19 digits. Data which contains a run of 19
+# digits is parsed with the stdlib, which preserves arbitrarily large integers. The
+# digits are found by mapping every byte to either "0" (digit) or "x" (other) which
+# is much faster than a regex.
+_DIGIT_TRANSLATION_TABLE = bytes(
+    ord("0") if ord("0") <= byte <= ord("9") else ord("x") for byte in range(256)
+)
+_MAYBE_BIG_INT = b"0" * 19
+
+
+def _may_contain_big_int(data: str | bytes) -> bool:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return _MAYBE_BIG_INT in data.translate(_DIGIT_TRANSLATION_TABLE)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            field.name: getattr(value, field.name)
+            for field in dataclasses.fields(value)
+        }
+    # orjson serializes datetimes and UUIDs natively
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    # e.g., sets and tuples
+    if isinstance(value, collections.abc.Iterable) and not isinstance(
+        value, (str, bytes, dict)
+    ):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_options(sort_keys: bool, indent: bool) -> int:
+    # dataclasses are passed to `_default` because orjson does not sort their keys
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    if indent:
+        options |= orjson.OPT_INDENT_2
+    return options
+
+
+def _stdlib_dumps(value: Any, sort_keys: bool, indent: bool) -> str:
+    if indent:
+        return json.dumps(
+            value, ensure_ascii=False, sort_keys=sort_keys, indent=2, default=_default
+        )
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+        separators=(",", ":"),
+        default=_default,
+    )
+
+
+def json_dumps_bytes(
+    value: Any, sort_keys: bool = False, indent: bool = False
+) -> bytes:
+    """
+    Serializes a value into UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                value, default=_default, option=_orjson_options(sort_keys, indent)
+            )
+        except TypeError:
+            pass
+    return _stdlib_dumps(value, sort_keys, indent).encode("utf-8")
+
+
+def json_dumps(value: Any, sort_keys: bool = False, indent: bool = False) -> str:
+    """
+    Serializes a value into a JSON string.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                value, default=_default, option=_orjson_options(sort_keys, indent)
+            ).decode("utf-8")
+        except TypeError:
+            pass
+    return _stdlib_dumps(value, sort_keys, indent)
+
+
+def json_loads(data: str | bytes) -> Any:
+    """
+    Deserializes a JSON string or UTF-8 encoded JSON bytes.
+
+    Raises:
+        ValueError: If the data is not valid JSON.
+    """
+    if orjson is not None and not _may_contain_big_int(data):
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def throw_if_not_allowed_return_type(obj: Any) -> None:
@@ -1,7 +1,56 @@
-import json
+from json.encoder import encode_basestring
 from typing import Any
 
+from admyral.utils.json import json_dumps_bytes
+
+
+def _count_str_bytes(value: str) -> int:
+    if value.isascii():
+        return len(encode_basestring(value))
+    return len(encode_basestring(value).encode("utf-8", "surrogatepass"))
+
+
+def _count_key_bytes(key: Any) -> int:
+    if isinstance(key, str):
+        return _count_str_bytes(key)
+    # non-string keys are converted into strings: {key:null}
+    return len(json_dumps_bytes({key: None})) - len("{:null}")
+
+
+def _count_value_bytes(value: Any) -> int:
+    if isinstance(value, str):
+        return _count_str_bytes(value)
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, int):
+        return len(int.__repr__(value))
+    if isinstance(value, dict):
+        if not value:
+            return 2
+        # {"key":value,"key":value}
+        return (
+            2
+            + sum(
+                _count_key_bytes(key) + 1 + _count_value_bytes(val)
+                for key, val in value.items()
+            )
+            + len(value)
+            - 1
+        )
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return 2
+        # [value,value]
+        return 2 + sum(_count_value_bytes(val) for val in value) + len(value) - 1
+    # floats and anything else are rare enough to be serialized directly
+    return len(json_dumps_bytes(value))
+
 
 def count_json_payload_bytes(payload: dict[str, Any]) -> int:
-    serialized_payload = json.dumps(payload).encode("utf-8")
-    return len(serialized_payload)
+    """
+    Returns the number of bytes of `json_dumps_bytes(payload)` without materializing
+    the serialized payload. Only strings are escaped individually.
+    """
+    return _count_value_bytes(payload)
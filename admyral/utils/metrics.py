@@ -0,0 +1,36 @@
+import asyncio
+import inspect
+from typing import Awaitable, Callable
+from pydantic import BaseModel
+
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+MetricsSource = Callable[[], BaseModel | Awaitable[BaseModel]]
+
+
+async def log_metrics_periodically(
+    sources: dict[str, MetricsSource], metrics_interval: int
+) -> None:
+    """
+    Logs the metrics of every source once per interval. A failing source does not
+    prevent the other sources from being logged.
+
+    Args:
+        sources: Maps the name of a source to a function returning its metrics.
+        metrics_interval: The interval in seconds.
+    """
+    while True:
+        await asyncio.sleep(metrics_interval)
+        for name, get_metrics in sources.items():
+            try:
+                metrics = get_metrics()
+                if inspect.isawaitable(metrics):
+                    metrics = await metrics
+            except Exception as e:
+                logger.error(f"Failed to collect {name} metrics: {e}")
+                continue
+            logger.info(f"{name} metrics: {metrics.model_dump()}")
@@ -0,0 +1,21 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """
+    Encodes the position of a row in a keyset pagination over (created_at, id)
+    into an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(
+        json.dumps([created_at.isoformat(), id]).encode("utf-8")
+    ).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), id
+    except Exception:
+        raise ValueError("Invalid cursor.")
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Deduplicates concurrent loads of the same key. The first caller of a key (the
+    leader) runs the load while all other callers of the same key (the followers)
+    wait for its result or exception.
+
+    If the leader is cancelled, the followers are not cancelled with it. Instead, the
+    next follower takes over and runs the load itself.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[K, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        while key in self._inflight:
+            future = self._inflight[key]
+            # unlike awaiting the future, asyncio.wait does not raise if the future
+            # is cancelled and does not cancel the future if the follower is cancelled
+            await asyncio.wait([future])
+            if not future.cancelled():
+                return future.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await load()
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # mark the exception as retrieved if no one else is waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
@@ -1,11 +1,12 @@
 from typing import TYPE_CHECKING, TypeVar, Callable, Any
 from temporalio import activity
 import inspect
+import asyncio
 from uuid import uuid4
 import time
 
 from admyral.context import ExecutionContext
-from admyral.utils.json import throw_if_not_allowed_return_type
+from admyral.utils.json import throw_if_not_allowed_return_type, json_dumps_bytes
 from admyral.utils.future_executor import execute_future
 from admyral.logger import get_logger
 from admyral.context import ctx
@@ -14,7 +15,9 @@ from admyral.workers.shared_worker_state import SharedWorkerState
 from admyral.typings import JsonValue
 from admyral.exceptions import NonRetryableActionError
 from admyral.utils.memory import count_json_payload_bytes
-from admyral.config.config import TEMPORAL_PAYLOAD_LIMIT
+from admyral.config.config import CONFIG, TEMPORAL_PAYLOAD_LIMIT
+from admyral.workers.blob_references import offload_result, resolve_blob_references
+from admyral.workers.references import BLOB_REFERENCE_KEY, is_blob_reference
 
 if TYPE_CHECKING:
     F = TypeVar("F", bound=Callable[..., Any])
@@ -46,6 +49,11 @@ def action_executor(action_type: str, func: "F") -> "F":
 
                 # make available to the function as a contextvar
                 ctx.set(exec_ctx)
+
+                args = await asyncio.to_thread(
+                    resolve_blob_references, SharedWorkerState.get_blob_store(), args
+                )
+
                 # for wait actions, we skip the function call because the waiting is already executed in the WorkflowExecutor
                 if exec_ctx.action_type != "wait":
                     logger.info(f"Executing {action_type}...")
@@ -63,18 +71,17 @@ def action_executor(action_type: str, func: "F") -> "F":
                 await _store_action_error(exec_ctx, str(e), args)
                 raise NonRetryableActionError(str(e))
 
-            result_size_bytes = count_json_payload_bytes(result)
-            if result_size_bytes > TEMPORAL_PAYLOAD_LIMIT:
-                await _store_action_error(
-                    exec_ctx, "Result payload too large. Exceeds 2 MB limit.", args
-                )
-                raise NonRetryableActionError(
-                    "Result payload too large. Exceeds 2 MB limit."
+            try:
+                workflow_result = await asyncio.to_thread(
+                    _prepare_workflow_result, result
                 )
+            except NonRetryableActionError as e:
+                await _store_action_error(exec_ctx, str(e), args)
+                raise e
 
-            await _store_action_result(exec_ctx, result, args)
+            await _store_action_result(exec_ctx, result, args, workflow_result)
 
-            return exec_ctx.step_id, result
+            return exec_ctx.step_id, workflow_result
 
         return async_execute
 
@@ -101,6 +108,8 @@ def action_executor(action_type: str, func: "F") -> "F":
                 # make available to the function as a contextvar
                 ctx.set(exec_ctx)
 
+                args = resolve_blob_references(SharedWorkerState.get_blob_store(), args)
+
                 # for wait actions, we skip the function call because the waiting is already executed in the WorkflowExecutor
                 if exec_ctx.action_type != "wait":
                     logger.info(f"Executing {action_type}...")
@@ -118,28 +127,52 @@ def action_executor(action_type: str, func: "F") -> "F":
                 execute_future(_store_action_error(exec_ctx, str(e), args))
                 raise NonRetryableActionError(str(e))
 
-            result_size_bytes = count_json_payload_bytes(result)
-            if result_size_bytes > TEMPORAL_PAYLOAD_LIMIT:
-                execute_future(
-                    _store_action_error(
-                        exec_ctx, "Result payload too large. Exceeds 2 MB limit.", args
-                    )
-                )
-                raise NonRetryableActionError(
-                    "Result payload too large. Exceeds 2 MB limit."
-                )
+            try:
+                workflow_result = _prepare_workflow_result(result)
+            except NonRetryableActionError as e:
+                execute_future(_store_action_error(exec_ctx, str(e), args))
+                raise e
 
-            execute_future(_store_action_result(exec_ctx, result, args))
+            execute_future(
+                _store_action_result(exec_ctx, result, args, workflow_result)
+            )
 
-            return exec_ctx.step_id, result
+            return exec_ctx.step_id, workflow_result
 
         return sync_execute
 
 
+def _prepare_workflow_result(result: JsonValue) -> JsonValue:
+    """
+    Returns the value which is passed back to the workflow: the result itself or,
+    if it exceeds the offload threshold, a reference to the result in the blob store.
+    """
+    result_size_bytes = count_json_payload_bytes(result)
+
+    blob_store = SharedWorkerState.get_blob_store()
+    if blob_store is not None:
+        if result_size_bytes > CONFIG.blob_offload_threshold_bytes:
+            return offload_result(blob_store, json_dumps_bytes(result))
+        return result
+
+    if result_size_bytes > TEMPORAL_PAYLOAD_LIMIT:
+        raise NonRetryableActionError("Result payload too large. Exceeds 2 MB limit.")
+
+    return result
+
+
 async def _store_action_result(
-    exec_ctx: ExecutionContext, result: JsonValue, args: dict[str, Any]
+    exec_ctx: ExecutionContext,
+    result: JsonValue,
+    args: dict[str, Any],
+    workflow_result: JsonValue,
 ) -> None:
-    await SharedWorkerState.get_store().store_action_result(
+    if is_blob_reference(workflow_result):
+        # the blob must not be garbage collected while the run exists
+        await SharedWorkerState.get_store().add_workflow_run_blob(
+            exec_ctx.run_id, workflow_result[BLOB_REFERENCE_KEY]
+        )
+    await SharedWorkerState.get_step_write_buffer().store_action_result(
         exec_ctx.step_id,
         exec_ctx.run_id,
         exec_ctx.action_type,
@@ -152,7 +185,7 @@ async def _store_action_result(
 async def _store_action_error(
     exec_ctx: ExecutionContext, error: str, args: dict[str, Any]
 ) -> None:
-    await SharedWorkerState.get_store().store_workflow_run_error(
+    await SharedWorkerState.get_step_write_buffer().store_workflow_run_error(
         exec_ctx.step_id,
         exec_ctx.run_id,
         exec_ctx.action_type,
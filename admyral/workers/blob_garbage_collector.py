@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from admyral.blob_store.blob_store import BlobStore
+from admyral.db.store_interface import StoreInterface
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+BLOB_GC_BATCH_SIZE = 1000
+
+
+async def collect_unreferenced_blobs(
+    store: StoreInterface, blob_store: BlobStore, grace_period_seconds: int
+) -> int:
+    """
+    Deletes the blobs which are not referenced by any workflow run anymore, e.g.,
+    because the runs were deleted by the run retention or together with their
+    workflow. Blobs younger than the grace period are kept because the reference of
+    a blob is stored after the blob itself. Storing an existing blob again renews
+    its grace period.
+
+    Returns:
+        The number of deleted blobs.
+    """
+    created_before = time.time() - grace_period_seconds
+    blob_ids = await asyncio.to_thread(blob_store.list_blobs, created_before)
+
+    num_deleted_blobs = 0
+    for idx in range(0, len(blob_ids), BLOB_GC_BATCH_SIZE):
+        batch = blob_ids[idx : idx + BLOB_GC_BATCH_SIZE]
+        referenced_blob_ids = await store.filter_referenced_blobs(batch)
+        for blob_id in batch:
+            if blob_id in referenced_blob_ids:
+                continue
+            # skips blobs which were stored again since they were listed
+            if await asyncio.to_thread(blob_store.delete, blob_id, created_before):
+                num_deleted_blobs += 1
+
+    return num_deleted_blobs
+
+
+async def collect_unreferenced_blobs_periodically(
+    store: StoreInterface,
+    blob_store: BlobStore,
+    gc_interval: int,
+    grace_period_seconds: int,
+) -> None:
+    while True:
+        await asyncio.sleep(gc_interval)
+        try:
+            num_deleted_blobs = await collect_unreferenced_blobs(
+                store, blob_store, grace_period_seconds
+            )
+        except Exception as e:
+            logger.error(f"Failed to collect unreferenced blobs: {e}")
+            continue
+        logger.info(f"Deleted {num_deleted_blobs} unreferenced blobs.")
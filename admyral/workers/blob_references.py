@@ -0,0 +1,81 @@
+from admyral.blob_store.blob_store import BlobStore
+from admyral.typings import JsonValue
+from admyral.utils.json import json_loads
+from admyral.workers.references import (
+    BLOB_REFERENCE_KEY,
+    BLOB_TEMPLATE_KEY,
+    CompiledAccessPath,
+    Segment,
+    SegmentType,
+    _evaluate_access_path,
+    interpolate,
+    is_blob_reference,
+    is_blob_template,
+)
+
+
+def offload_result(
+    blob_store: BlobStore, serialized_result: bytes
+) -> dict[str, JsonValue]:
+    """
+    Stores a serialized action result in the blob store and returns the blob
+    reference which is passed through Temporal instead of the result.
+    """
+    return {BLOB_REFERENCE_KEY: blob_store.put(serialized_result), "path": []}
+
+
+def _resolve_blob_reference(
+    blob_store: BlobStore, blob_reference: dict, blobs: dict[str, JsonValue]
+) -> JsonValue:
+    blob_id = blob_reference[BLOB_REFERENCE_KEY]
+    if blob_id not in blobs:
+        blobs[blob_id] = json_loads(blob_store.get(blob_id))
+
+    path = blob_reference.get("path", [])
+    segments = tuple(
+        Segment(SegmentType.INDEX, key)
+        if isinstance(key, int)
+        else Segment(SegmentType.KEY, key)
+        for key in path
+    )
+    compiled = CompiledAccessPath(
+        blob_reference.get("access_path", "blob"), "blob", segments
+    )
+    return _evaluate_access_path({"blob": blobs[blob_id]}, compiled)
+
+
+def resolve_blob_references(
+    blob_store: BlobStore | None,
+    value: JsonValue,
+    blobs: dict[str, JsonValue] | None = None,
+) -> JsonValue:
+    """
+    Replaces blob references and deferred interpolations in the arguments of an
+    activity with the referenced values. Each blob is loaded at most once.
+    """
+    if blobs is None:
+        blobs = {}
+
+    if isinstance(value, dict):
+        if is_blob_reference(value):
+            if blob_store is None:
+                raise RuntimeError(
+                    "Received a blob reference but the blob store is disabled."
+                )
+            return _resolve_blob_reference(blob_store, value, blobs)
+        if is_blob_template(value):
+            return interpolate(
+                [
+                    resolve_blob_references(blob_store, part, blobs)
+                    for part in value[BLOB_TEMPLATE_KEY]
+                ]
+            )
+        return {
+            key: resolve_blob_references(blob_store, val, blobs)
+            for key, val in value.items()
+        }
+
+    if isinstance(value, list):
+        return [resolve_blob_references(blob_store, val, blobs) for val in value]
+
+    return value
@@ -0,0 +1,61 @@
+import dataclasses
+from typing import Any, Type
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    CompositePayloadConverter,
+    DataConverter,
+    DefaultPayloadConverter,
+    JSONPlainPayloadConverter,
+    value_to_type,
+)
+
+from admyral.utils.json import json_dumps_bytes, json_loads
+from admyral.workers.payload_codec import get_payload_codec
+
+
+class AdmyralJSONPlainPayloadConverter(JSONPlainPayloadConverter):
+    """
+    Drop-in replacement for Temporal's JSON payload converter which uses the
+    central JSON codec. The codec serializes pydantic models and dataclasses in a
+    single pass. Values which the codec cannot serialize are handled by Temporal's
+    default JSON encoder.
+    """
+
+    def to_payload(self, value: Any) -> Payload | None:
+        try:
+            data = json_dumps_bytes(value, sort_keys=True)
+        except TypeError:
+            return super().to_payload(value)
+        return Payload(metadata={"encoding": self.encoding.encode()}, data=data)
+
+    def from_payload(self, payload: Payload, type_hint: Type | None = None) -> Any:
+        try:
+            obj = json_loads(payload.data)
+        except ValueError as err:
+            raise RuntimeError("Failed parsing") from err
+        if type_hint:
+            obj = value_to_type(type_hint, obj, self._custom_type_converters)
+        return obj
+
+
+class AdmyralPayloadConverter(CompositePayloadConverter):
+    def __init__(self) -> None:
+        super().__init__(
+            *[
+                AdmyralJSONPlainPayloadConverter()
+                if isinstance(converter, JSONPlainPayloadConverter)
+                else converter
+                for converter in DefaultPayloadConverter.default_encoding_payload_converters
+            ]
+        )
+
+
+def get_data_converter() -> DataConverter:
+    """
+    Returns the data converter which must be used by all Temporal clients and workers.
+    """
+    return dataclasses.replace(
+        DataConverter.default,
+        payload_converter_class=AdmyralPayloadConverter,
+        payload_codec=get_payload_codec(),
+    )
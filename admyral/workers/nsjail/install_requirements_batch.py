@@ -0,0 +1,126 @@
+"""
+Batched installation of requirements into the per-requirement pip cache.
+
+A single pip process builds (or downloads) the wheels of all requirements. Then, each
+wheel is unpacked into the cache directory of its requirement while holding the
+flock of the requirement. Requirements without a matching wheel fall back to a
+regular `pip install --target`.
+
+Runs inside nsjail with the system Python, hence, only the standard library may be
+used in here.
+
+Usage: python install_requirements_batch.py <spec_path>
+
+The spec is a JSON object: {"wheelhouse": str, "requirements": [{"requirement": str,
+"target": str, "flock": str}]}
+"""
+
+import fcntl
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+
+PIP_FLAGS = [
+    "--no-deps",
+    "--no-color",
+    "--isolated",
+    "--disable-pip-version-check",
+]
+
+
+def _canonicalize(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _find_wheel(wheelhouse: str, requirement: str) -> str | None:
+    if "==" not in requirement:
+        return None
+    name, version = requirement.split("==", 1)
+    name, version = _canonicalize(name.strip()), version.split(";")[0].strip()
+    for filename in os.listdir(wheelhouse):
+        if not filename.endswith(".whl"):
+            continue
+        wheel_name, wheel_version = filename.split("-")[:2]
+        if _canonicalize(wheel_name) == name and wheel_version == version:
+            return os.path.join(wheelhouse, filename)
+    return None
+
+
+def _unpack_wheel(wheel_path: str, target: str) -> None:
+    """
+    Unpacks a wheel like `pip install --target` does for importable files, i.e.,
+    the contents of <name>.data/purelib and <name>.data/platlib are moved to the root.
+    """
+    target_dir = os.path.dirname(target)
+    tmp_target = tempfile.mkdtemp(dir=target_dir, prefix=".tmp-")
+    try:
+        with zipfile.ZipFile(wheel_path) as wheel:
+            wheel.extractall(tmp_target)
+
+        for entry in os.listdir(tmp_target):
+            if not entry.endswith(".data"):
+                continue
+            data_dir = os.path.join(tmp_target, entry)
+            for scheme in ("purelib", "platlib"):
+                scheme_dir = os.path.join(data_dir, scheme)
+                if not os.path.isdir(scheme_dir):
+                    continue
+                for name in os.listdir(scheme_dir):
+                    shutil.move(
+                        os.path.join(scheme_dir, name), os.path.join(tmp_target, name)
+                    )
+            shutil.rmtree(data_dir)
+
+        os.rename(tmp_target, target)
+    except Exception:
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        raise
+
+
+def _pip_install(requirement: str, target: str) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "pip", "install", requirement, *PIP_FLAGS]
+        + ["--root-user-action=ignore", "-t", target],
+        check=True,
+    )
+
+
+def main() -> None:
+    with open(sys.argv[1]) as f:
+        spec = json.load(f)
+
+    wheelhouse = spec["wheelhouse"]
+    requirements = spec["requirements"]
+    os.makedirs(wheelhouse, exist_ok=True)
+
+    print(f"Building wheels for {len(requirements)} requirements...", flush=True)
+    wheel_result = subprocess.run(
+        [sys.executable, "-m", "pip", "wheel", *PIP_FLAGS, "-w", wheelhouse]
+        + [req["requirement"] for req in requirements]
+    )
+    if wheel_result.returncode != 0:
+        # some wheels might still have been built. the remaining requirements
+        # fall back to pip install.
+        print("Failed to build some wheels. Falling back to pip install.", flush=True)
+
+    for idx, req in enumerate(requirements):
+        requirement, target = req["requirement"], req["target"]
+        with open(req["flock"], "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not os.path.exists(target):
+                wheel_path = _find_wheel(wheelhouse, requirement)
+                if wheel_path:
+                    _unpack_wheel(wheel_path, target)
+                else:
+                    _pip_install(requirement, target)
+        print(f"Installed {requirement} ({idx + 1}/{len(requirements)})", flush=True)
+
+
+if __name__ == "__main__":
+    main()
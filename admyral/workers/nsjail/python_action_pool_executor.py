@@ -0,0 +1,84 @@
+"""
+Long-running executor of a Python sandbox pool.
+
+The executor receives one job per line on stdin. A job is a JSON object with the
+action type, the action code, the arguments, and the secrets. The result is written
+to "<work_dir>/<job_id>.json". Completion of a job is signaled by writing the job
+done marker followed by the exit status to stdout and stderr. Thereby, the worker
+knows that it received all logs of the job.
+
+Only the standard library and admyral.logger may be used in here because the
+executor might run with an older admyral package from PyPI.
+
+Usage: python python_action_pool_executor.py <token> <work_dir>
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import sys
+import traceback
+import types
+
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+JOB_DONE_MARKER = "__admyral_sandbox_job_done__"
+
+
+def _run_job(job: dict, work_dir: str) -> int:
+    action_type = job["action_type"]
+    output_path = os.path.join(work_dir, f"{job['job_id']}.json")
+
+    previous_env = {key: os.environ.get(key) for key in job["secrets"]}
+    os.environ.update(job["secrets"])
+
+    try:
+        module = types.ModuleType(f"admyral_action_{job['job_id'].replace('-', '_')}")
+        module.__file__ = "action.py"
+        exec(compile(job["code"], "action.py", "exec"), module.__dict__)
+        func = getattr(module, action_type)
+
+        if inspect.iscoroutinefunction(func):
+            result = asyncio.run(func(**job["args"]))
+        else:
+            result = func(**job["args"])
+
+        with open(output_path, "w") as f:
+            f.write(json.dumps(result))
+        return 0
+
+    except Exception as e:
+        logger.error(f"Failed to execute {action_type} due to error: {str(e)}")
+        logger.error(traceback.format_exc())
+        with open(output_path, "w") as f:
+            f.write(json.dumps({"error": str(e)}))
+        return 1
+
+    finally:
+        # secrets must not leak into the next job
+        for key, value in previous_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def main() -> None:
+    token, work_dir = sys.argv[1], sys.argv[2]
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        status = _run_job(json.loads(line), work_dir)
+        for stream in (sys.stdout, sys.stderr):
+            stream.write(f"{JOB_DONE_MARKER}{token} {status}\n")
+            stream.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import gzip
+from typing import Sequence
+from pydantic import BaseModel
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+from admyral.config.config import CONFIG, TemporalPayloadCompression
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+GZIP_ENCODING = b"binary/gzip"
+ZSTD_ENCODING = b"binary/zstd"
+# the default level of gzip (9) is too expensive for every activity input and output
+GZIP_COMPRESSION_LEVEL = 6
+ZSTD_COMPRESSION_LEVEL = 3
+
+
+class PayloadCompressionMetrics(BaseModel):
+    payloads_encoded: int
+    payloads_compressed: int
+    uncompressed_bytes: int
+    compressed_bytes: int
+    compression_ratio: float
+    """ Uncompressed bytes divided by compressed bytes of the compressed payloads. """
+
+
+class CompressionPayloadCodec(PayloadCodec):
+    """
+    Compresses Temporal payloads which exceed a size threshold. Payloads which do
+    not shrink are passed through unchanged. If compression is disabled, every
+    payload is passed through unchanged.
+
+    Decoding supports every algorithm independent of the configured one, such that
+    workflow histories stay readable after the compression setting changed.
+    """
+
+    def __init__(
+        self, compression: TemporalPayloadCompression, threshold_bytes: int = 1024
+    ) -> None:
+        if compression == TemporalPayloadCompression.ZSTD and zstandard is None:
+            raise ValueError("zstd payload compression requires the zstandard package.")
+        self.compression = compression
+        self.threshold_bytes = threshold_bytes
+        self.payloads_encoded = 0
+        self.payloads_compressed = 0
+        self.uncompressed_bytes = 0
+        self.compressed_bytes = 0
+
+    def _compress(self, data: bytes) -> tuple[bytes, bytes]:
+        if self.compression == TemporalPayloadCompression.ZSTD:
+            return ZSTD_ENCODING, zstandard.ZstdCompressor(
+                level=ZSTD_COMPRESSION_LEVEL
+            ).compress(data)
+        return GZIP_ENCODING, gzip.compress(data, compresslevel=GZIP_COMPRESSION_LEVEL)
+
+    def _encode(self, payload: Payload) -> Payload:
+        self.payloads_encoded += 1
+        if self.compression == TemporalPayloadCompression.DISABLED:
+            return payload
+
+        data = payload.SerializeToString()
+        if len(data) < self.threshold_bytes:
+            return payload
+
+        encoding, compressed = self._compress(data)
+        if len(compressed) >= len(data):
+            return payload
+
+        self.payloads_compressed += 1
+        self.uncompressed_bytes += len(data)
+        self.compressed_bytes += len(compressed)
+        return Payload(metadata={"encoding": encoding}, data=compressed)
+
+    def _decode(self, payload: Payload) -> Payload:
+        encoding = payload.metadata.get("encoding")
+        if encoding == GZIP_ENCODING:
+            return Payload.FromString(gzip.decompress(payload.data))
+        if encoding == ZSTD_ENCODING:
+            if zstandard is None:
+                raise RuntimeError(
+                    "Received a zstd-compressed payload but the zstandard package is not installed."
+                )
+            return Payload.FromString(
+                zstandard.ZstdDecompressor().decompress(payload.data)
+            )
+        return payload
+
+    async def encode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        return [self._encode(payload) for payload in payloads]
+
+    async def decode(self, payloads: Sequence[Payload]) -> list[Payload]:
+        return [self._decode(payload) for payload in payloads]
+
+    def get_metrics(self) -> PayloadCompressionMetrics:
+        return PayloadCompressionMetrics(
+            payloads_encoded=self.payloads_encoded,
+            payloads_compressed=self.payloads_compressed,
+            uncompressed_bytes=self.uncompressed_bytes,
+            compressed_bytes=self.compressed_bytes,
+            compression_ratio=(
+                self.uncompressed_bytes / self.compressed_bytes
+                if self.compressed_bytes
+                else 1.0
+            ),
+        )
+
+
+_payload_codec: CompressionPayloadCodec | None = None
+
+
+def get_payload_codec() -> CompressionPayloadCodec:
+    """
+    Returns the process-wide payload codec. The codec is installed even if
+    compression is disabled such that compressed payloads written by other
+    processes or before the setting changed can still be decoded.
+    """
+    global _payload_codec
+    if _payload_codec is None:
+        _payload_codec = CompressionPayloadCodec(
+            CONFIG.temporal_payload_compression,
+            CONFIG.temporal_payload_compression_threshold_bytes,
+        )
+    return _payload_codec
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from admyral.utils.singleton import Singleton
+from admyral.utils.single_flight import SingleFlight
+from admyral.utils.time import utc_now_timestamp_seconds
+from admyral.db.store_interface import StoreInterface
+from admyral.models import PipLockfile
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+PIP_LOCKFILE_CACHE_SIZE = 1024
+
+
+class PipLockfileCache(metaclass=Singleton):
+    """
+    Worker-local cache of pip lockfiles keyed by the hash of the requirements.
+
+    Entries expire at the `expiration_time` of the lockfile. On a miss, the lockfile
+    is looked up in the store and only compiled if the store has no valid lockfile
+    either. Concurrent misses for the same requirements share a single lookup and
+    a single pip-compile.
+    """
+
+    _cache: OrderedDict[str, PipLockfile] = OrderedDict()
+    _inflight: SingleFlight[str, PipLockfile] = SingleFlight()
+    _max_size: int = PIP_LOCKFILE_CACHE_SIZE
+
+    @classmethod
+    async def get(
+        cls,
+        hash_id: str,
+        store: StoreInterface,
+        compile_lockfile: Callable[[], Awaitable[PipLockfile]],
+    ) -> PipLockfile:
+        pip_lockfile = cls._cache.get(hash_id)
+        if pip_lockfile is not None:
+            if pip_lockfile.expiration_time > utc_now_timestamp_seconds():
+                cls._cache.move_to_end(hash_id)
+                return pip_lockfile
+            del cls._cache[hash_id]
+
+        return await cls._inflight.do(
+            hash_id, lambda: cls._load(hash_id, store, compile_lockfile)
+        )
+
+    @classmethod
+    async def _load(
+        cls,
+        hash_id: str,
+        store: StoreInterface,
+        compile_lockfile: Callable[[], Awaitable[PipLockfile]],
+    ) -> PipLockfile:
+        pip_lockfile = await store.get_cached_pip_lockfile(hash_id)
+        if pip_lockfile and pip_lockfile.expiration_time > utc_now_timestamp_seconds():
+            # we still have a valid lockfile in our cache
+            logger.info("Skipping pip-compile. Found cached lockfile.")
+        else:
+            pip_lockfile = await compile_lockfile()
+
+        cls._cache[hash_id] = pip_lockfile
+        cls._cache.move_to_end(hash_id)
+        while len(cls._cache) > cls._max_size:
+            cls._cache.popitem(last=False)
+
+        return pip_lockfile
+
+    @classmethod
+    def invalidate(cls, hash_id: str | None = None) -> None:
+        if hash_id is None:
+            cls._cache.clear()
+        else:
+            cls._cache.pop(hash_id, None)
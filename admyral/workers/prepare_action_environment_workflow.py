@@ -0,0 +1,23 @@
+from temporalio import workflow
+from temporalio.common import RetryPolicy
+from datetime import timedelta
+
+
+PREPARE_ACTION_ENVIRONMENT_TIMEOUT = timedelta(minutes=30)
+
+
+@workflow.defn
+class PrepareActionEnvironmentWorkflow:
+    """
+    Prepares the Python environment of a pushed custom action in the background,
+    such that the first execution does not have to install the requirements.
+    """
+
+    @workflow.run
+    async def run(self, user_id: str, action_type: str) -> None:
+        await workflow.execute_activity(
+            "prepare_python_action_environment",
+            args=[user_id, action_type],
+            start_to_close_timeout=PREPARE_ACTION_ENVIRONMENT_TIMEOUT,
+            retry_policy=RetryPolicy(maximum_attempts=1),
+        )
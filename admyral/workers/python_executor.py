@@ -1,27 +1,42 @@
 import time
+import asyncio
 import aiofiles
 import aiofiles.os
-from typing import Any
+from temporalio import activity
+from typing import Any, Awaitable, Callable
 import tempfile
-import json
 import os
 import sys
+import shutil
 import itertools
+from functools import partial
 
 from admyral.utils.aio import makedirs, dirname
 from admyral.config.config import (
     ADMYRAL_CACHE_DIRECOTRY,
     ADMYRAL_PIP_CACHE_DIRECTORY,
     ADMYRAL_PIP_LOCK_CACHE_DIRECTORY,
+    ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY,
+    ADMYRAL_PIP_WHEEL_CACHE_DIRECTORY,
+    ADMYRAL_PIP_INSTALL_MODE,
+    ADMYRAL_PIP_INSTALL_CONCURRENCY,
+    PipInstallMode,
     ADMYRAL_DISABLE_NSJAIL,
     ADMYRAL_PIP_LOCKFILE_CACHE_TTL_IN_SECONDS,
     ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE,
 )
 from admyral.workers.shared_worker_state import SharedWorkerState
+from admyral.workers.pip_lockfile_cache import PipLockfileCache
+from admyral.workers.python_sandbox_pool import PythonSandboxPool, POOL_EXECUTOR_PATH
+from admyral.workers.site_packages_snapshot import (
+    get_site_packages_snapshot_path,
+    materialize_site_packages_snapshot,
+)
 from admyral.logger import get_logger
-from admyral.models import PythonAction, PipLockfile
+from admyral.models import PythonAction, PipLockfile, ActionEnvironmentStatus
 from admyral.db.store_interface import StoreInterface
 from admyral.utils.hash import calculate_sha256
+from admyral.utils.json import json_dumps, json_loads
 from admyral.utils.time import utc_now_timestamp_seconds
 from admyral.utils.aio import path_exists, getcwd, touch
 from admyral.utils.subprocess import run_subprocess_with_log_flushing
@@ -89,6 +104,8 @@ async def python_action_worker_setup() -> None:
         await makedirs(ADMYRAL_CACHE_DIRECOTRY)
         await makedirs(ADMYRAL_PIP_CACHE_DIRECTORY)
         await makedirs(ADMYRAL_PIP_LOCK_CACHE_DIRECTORY)
+        await makedirs(ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY)
+        await makedirs(ADMYRAL_PIP_WHEEL_CACHE_DIRECTORY)
 
 
 async def execute_python_action(action_type: str, action_args: dict[str, Any]) -> Any:
@@ -116,6 +133,17 @@ async def execute_python_action(action_type: str, action_args: dict[str, Any]) -
     with tempfile.TemporaryDirectory() as job_dir:
         logger.info(f"Job directory: {job_dir}")
 
+        if PythonSandboxPool.is_enabled():
+            await _write_requirements_file(job_dir, python_action)
+            result = await _run_python_action_in_sandbox_pool(
+                job_dir, python_action, action_args, store
+            )
+            job_end = time.monotonic_ns()
+            logger.info(
+                f"Python action with type '{action_type}' executed in {(job_end - job_start) / 1_000_000} ms (warm pool)"
+            )
+            return result
+
         # write Python action and requirements file
         await _prepare_python_action(job_dir, python_action, action_args)
 
@@ -127,7 +155,7 @@ async def execute_python_action(action_type: str, action_args: dict[str, Any]) -
             if output == "":
                 result = None
             else:
-                result = json.loads(output)
+                result = json_loads(output)
 
     job_end = time.monotonic_ns()
     logger.info(
@@ -138,11 +166,11 @@ async def execute_python_action(action_type: str, action_args: dict[str, Any]) -
 
 
 async def _load_secrets(python_action: PythonAction) -> dict[str, str]:
-    loaded_secrets = {}
-    for secret_placeholder in python_action.secrets_placeholders:
-        secret = await ctx.get().secrets.aget(secret_placeholder)
-        loaded_secrets[secret_placeholder] = json.dumps(secret)
-    return loaded_secrets
+    secrets = await ctx.get().secrets.aget_many(python_action.secrets_placeholders)
+    return {
+        secret_placeholder: json_dumps(secret)
+        for secret_placeholder, secret in secrets.items()
+    }
 
 
 def _build_python_action_module(python_action: PythonAction) -> str:
@@ -154,15 +182,44 @@ async def _prepare_python_action(
 ) -> None:
     # prepare input and output files
     async with aiofiles.open(os.path.join(job_dir, "input.json"), "w") as f:
-        await f.write(json.dumps(action_args))
+        await f.write(json_dumps(action_args))
 
     async with aiofiles.open(os.path.join(job_dir, "output.json"), "w") as f:
         await f.write("")
 
-    # Write requirements file
-    requirements_list = python_action.requirements
+    await _write_requirements_file(job_dir, python_action)
+
+    # Write Python files
+    async with aiofiles.open(os.path.join(job_dir, "action.py"), "w") as f:
+        action_module = _build_python_action_module(python_action)
+        await f.write(action_module)
+
+    nsjail_dir = await get_nsjail_dir()
+    async with aiofiles.open(
+        os.path.join(nsjail_dir, "template.python_action_executor.py.txt")
+    ) as f:
+        python_action_executor_template = await f.read()
+
+    python_action_executor = python_action_executor_template.format(
+        ACTION_PATH="action", ACTION_TYPE=python_action.action_type, JOB_DIR=job_dir
+    )
+
+    async with aiofiles.open(
+        os.path.join(job_dir, "python_action_executor.py"), "w"
+    ) as f:
+        await f.write(python_action_executor)
+
+
+def _get_requirements(python_action: PythonAction) -> list[str]:
+    # copy the requirements because the action must keep the requirements as stored
+    requirements_list = list(python_action.requirements or [])
     if "admyral" not in requirements_list:
         requirements_list.append("admyral")
+    return requirements_list
+
+
+async def _write_requirements_file(job_dir: str, python_action: PythonAction) -> None:
+    requirements_list = _get_requirements(python_action)
 
     if ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE:
         # remove admyral from requirements if we are using the local package
@@ -188,26 +245,6 @@ async def _prepare_python_action(
     async with aiofiles.open(os.path.join(job_dir, "requirements.in"), "w") as f:
         await f.write("\n".join(requirements_list))
 
-    # Write Python files
-    async with aiofiles.open(os.path.join(job_dir, "action.py"), "w") as f:
-        action_module = _build_python_action_module(python_action)
-        await f.write(action_module)
-
-    nsjail_dir = await get_nsjail_dir()
-    async with aiofiles.open(
-        os.path.join(nsjail_dir, "template.python_action_executor.py.txt")
-    ) as f:
-        python_action_executor_template = await f.read()
-
-    python_action_executor = python_action_executor_template.format(
-        ACTION_PATH="action", ACTION_TYPE=python_action.action_type, JOB_DIR=job_dir
-    )
-
-    async with aiofiles.open(
-        os.path.join(job_dir, "python_action_executor.py"), "w"
-    ) as f:
-        await f.write(python_action_executor)
-
 
 async def _run_python_action(
     job_dir: str,
@@ -260,17 +297,45 @@ async def _run_python_action_with_nsjail(
     await _jailed_python_execution(requirements_paths, job_dir, python_action)
 
 
+def _step_logs_appender(source: str) -> Callable[[list[str]], Awaitable[None]]:
+    async def _append_logs(logs: list[str]) -> None:
+        logger.info(
+            f"workflow_id={ctx.get().workflow_id}  run_id={ctx.get().run_id}  step_id={ctx.get().step_id} [{source}]: {''.join(logs)}"
+        )
+        await ctx.get().append_logs_async(logs)
+
+    return _append_logs
+
+
 async def _pip_compile(
-    job_dir: str, python_action: PythonAction, store: StoreInterface
+    job_dir: str,
+    python_action: PythonAction,
+    store: StoreInterface,
+    append_logs_fn: Callable[[list[str]], Awaitable[None]] | None = None,
 ) -> list[str]:
-    """Generate lockfile using pip-compile"""
-    hash_id = calculate_sha256(";".join(python_action.requirements))
-    pip_lockfile = await store.get_cached_pip_lockfile(hash_id)
-    if pip_lockfile and pip_lockfile.expiration_time > utc_now_timestamp_seconds():
-        # we still have a valid lockfile in our cache
-        logger.info("Skipping pip-compile. Found cached lockfile.")
-        return pip_lockfile.lockfile.split("\n")
+    """
+    Returns the lockfile of the requirements. The lockfile is looked up in the
+    worker-local cache and in the store before it is generated using pip-compile.
+    """
+    hash_id = calculate_sha256(";".join(_get_requirements(python_action)))
+    pip_lockfile = await PipLockfileCache.get(
+        hash_id,
+        store,
+        lambda: _generate_pip_lockfile(
+            job_dir, python_action, store, hash_id, append_logs_fn
+        ),
+    )
+    return pip_lockfile.lockfile.split("\n")
 
+
+async def _generate_pip_lockfile(
+    job_dir: str,
+    python_action: PythonAction,
+    store: StoreInterface,
+    hash_id: str,
+    append_logs_fn: Callable[[list[str]], Awaitable[None]] | None = None,
+) -> PipLockfile:
+    """Generate lockfile using pip-compile"""
     pip_compile_start = time.monotonic_ns()
 
     # we need to generate a new lockfile
@@ -285,13 +350,9 @@ async def _pip_compile(
         "--strip-extras",
     ]
 
-    async def _append_logs(logs: list[str]) -> None:
-        logger.info(
-            f"workflow_id={ctx.get().workflow_id}  run_id={ctx.get().run_id}  step_id={ctx.get().step_id} [_pip_compile]: {''.join(logs)}"
-        )
-        await ctx.get().append_logs_async(logs)
-
-    exit_code = await run_subprocess_with_log_flushing(cmd, _append_logs)
+    exit_code = await run_subprocess_with_log_flushing(
+        cmd, append_logs_fn or _step_logs_appender("_pip_compile")
+    )
 
     _handle_exit_code(exit_code, cmd, python_action.action_type)
 
@@ -312,21 +373,30 @@ async def _pip_compile(
     )
 
     # store lock file in cache
-    await store.cache_pip_lockfile(
-        PipLockfile(
-            hash=hash_id,
-            lockfile="\n".join(lockfile),
-            expiration_time=utc_now_timestamp_seconds()
-            + ADMYRAL_PIP_LOCKFILE_CACHE_TTL_IN_SECONDS,
-        )
+    pip_lockfile = PipLockfile(
+        hash=hash_id,
+        lockfile="\n".join(lockfile),
+        expiration_time=utc_now_timestamp_seconds()
+        + ADMYRAL_PIP_LOCKFILE_CACHE_TTL_IN_SECONDS,
     )
+    await store.cache_pip_lockfile(pip_lockfile)
 
-    return lockfile
+    return pip_lockfile
 
 
 async def _pip_install_requirements(
-    action_type: str, lockfile: list[str], job_dir: str
+    action_type: str,
+    lockfile: list[str],
+    job_dir: str,
+    append_logs_fn: Callable[[list[str]], Awaitable[None]] | None = None,
 ) -> list[str]:
+    """
+    Installs the requirements of the lockfile into the pip cache and merges them
+    into the site-packages snapshot of the lockfile.
+
+    Returns:
+        The paths which must be put on the PYTHONPATH of the action.
+    """
     pip_install_start = time.monotonic_ns()
 
     cwd = await getcwd()
@@ -346,20 +416,49 @@ async def _pip_install_requirements(
         cwd, "admyral", "workers", "nsjail", "install_requirement.sh"
     )
 
+    snapshot_path = get_site_packages_snapshot_path(
+        ADMYRAL_SITE_PACKAGES_SNAPSHOT_DIRECTORY, lockfile
+    )
+    if await path_exists(snapshot_path):
+        logger.info("Skipping pip install. Found site-packages snapshot.")
+        installed_requirements_paths.append(snapshot_path)
+        return installed_requirements_paths
+
+    append_logs_fn = append_logs_fn or _step_logs_appender("_pip_install_requirements")
+
+    requirement_cache_paths = []
+    uncached_requirements = []
     for requirement in lockfile:
         requirement_cache_path = os.path.join(ADMYRAL_PIP_CACHE_DIRECTORY, requirement)
-        installed_requirements_paths.append(requirement_cache_path)
-
+        requirement_cache_paths.append(requirement_cache_path)
         if not await path_exists(requirement_cache_path):
-            # requirement is not yet installed - pip install it
-            await _pip_install_requirement(
+            uncached_requirements.append((requirement, requirement_cache_path))
+
+    if uncached_requirements:
+        await append_logs_fn(
+            [
+                f"Installing {len(uncached_requirements)} of {len(lockfile)} requirements...\n"
+            ]
+        )
+        if ADMYRAL_PIP_INSTALL_MODE == PipInstallMode.BATCHED:
+            await _pip_install_requirements_batched(
+                action_type, uncached_requirements, job_dir, append_logs_fn
+            )
+        else:
+            await _pip_install_requirements_in_parallel(
                 action_type,
-                requirement,
-                requirement_cache_path,
+                uncached_requirements,
                 job_dir,
                 install_requirement_script,
+                append_logs_fn,
             )
 
+    # A single site-packages tree keeps the PYTHONPATH short and needs only one mount.
+    await asyncio.to_thread(
+        materialize_site_packages_snapshot, snapshot_path, requirement_cache_paths
+    )
+    installed_requirements_paths.append(snapshot_path)
+
     pip_install_end = time.monotonic_ns()
     logger.info(
         f"Pip Install Time: {(pip_install_end - pip_install_start) / 1_000_000} ms"
@@ -368,17 +467,110 @@ async def _pip_install_requirements(
     return installed_requirements_paths
 
 
+async def _pip_install_requirements_in_parallel(
+    action_type: str,
+    requirements: list[tuple[str, str]],
+    job_dir: str,
+    install_requirement_script: str,
+    append_logs_fn: Callable[[list[str]], Awaitable[None]],
+) -> None:
+    # concurrent installs of the same requirement by other actions or workers are
+    # serialized by the per-requirement flock in install_requirement.sh
+    semaphore = asyncio.Semaphore(ADMYRAL_PIP_INSTALL_CONCURRENCY)
+    num_installed = 0
+
+    async def _install(requirement: str, requirement_cache_path: str) -> None:
+        nonlocal num_installed
+        async with semaphore:
+            await _pip_install_requirement(
+                action_type,
+                requirement,
+                requirement_cache_path,
+                job_dir,
+                install_requirement_script,
+                append_logs_fn,
+            )
+        num_installed += 1
+        await append_logs_fn(
+            [f"Installed {requirement} ({num_installed}/{len(requirements)})\n"]
+        )
+
+    async with asyncio.TaskGroup() as tg:
+        for requirement, requirement_cache_path in requirements:
+            tg.create_task(_install(requirement, requirement_cache_path))
+
+
+async def _pip_install_requirements_batched(
+    action_type: str,
+    requirements: list[tuple[str, str]],
+    job_dir: str,
+    append_logs_fn: Callable[[list[str]], Awaitable[None]],
+) -> None:
+    requirements_spec = []
+    for requirement, requirement_cache_path in requirements:
+        req_lock_file = _get_requirement_lock_file(requirement)
+        await touch(req_lock_file)
+        requirements_spec.append(
+            {
+                "requirement": requirement,
+                "target": requirement_cache_path,
+                "flock": req_lock_file,
+            }
+        )
+
+    # the spec must be readable inside nsjail, hence, it is stored in the cache
+    spec_path = os.path.join(
+        ADMYRAL_PIP_LOCK_CACHE_DIRECTORY, f"batch-{os.path.basename(job_dir)}.json"
+    )
+    async with aiofiles.open(spec_path, "w") as f:
+        await f.write(
+            json_dumps(
+                {
+                    "wheelhouse": ADMYRAL_PIP_WHEEL_CACHE_DIRECTORY,
+                    "requirements": requirements_spec,
+                }
+            )
+        )
+
+    try:
+        nsjail_dir = await get_nsjail_dir()
+        async with aiofiles.open(
+            os.path.join(nsjail_dir, "template.pip_install_batch.cfg")
+        ) as f:
+            nsjail_config_template = await f.read()
+
+        nsjail_config = nsjail_config_template.format(
+            SPEC_PATH=spec_path,
+            INSTALL_REQUIREMENTS_SCRIPT_PATH=os.path.join(
+                nsjail_dir, "install_requirements_batch.py"
+            ),
+            CACHE_PATH=ADMYRAL_CACHE_DIRECOTRY,
+        )
+        nsjail_config_path = os.path.join(job_dir, "nsjail_pip_install_batch.cfg")
+        async with aiofiles.open(nsjail_config_path, "w") as f:
+            await f.write(nsjail_config)
+
+        cmd = ["nsjail", "--config", nsjail_config_path]
+        exit_code = await run_subprocess_with_log_flushing(cmd, append_logs_fn)
+        _handle_exit_code(exit_code, cmd, action_type)
+    finally:
+        await aiofiles.os.remove(spec_path)
+
+
+def _get_requirement_lock_file(requirement: str) -> str:
+    lock_name = requirement.replace("==", "_").replace(".", "_").replace("-", "_")
+    return os.path.join(ADMYRAL_PIP_LOCK_CACHE_DIRECTORY, f"pip-{lock_name}.lock")
+
+
 async def _pip_install_requirement(
     action_type: str,
     requirement: str,
     requirement_cache_path: str,
     job_dir: str,
     install_requirement_script: str,
+    append_logs_fn: Callable[[list[str]], Awaitable[None]] | None = None,
 ) -> None:
-    lock_name = requirement.replace("==", "_").replace(".", "_").replace("-", "_")
-    req_lock_file = os.path.join(
-        ADMYRAL_PIP_LOCK_CACHE_DIRECTORY, f"pip-{lock_name}.lock"
-    )
+    req_lock_file = _get_requirement_lock_file(requirement)
 
     # generate flock file if not exists
     await touch(req_lock_file)
@@ -408,13 +600,9 @@ async def _pip_install_requirement(
         nsjail_pip_install_config_path,
     ]
 
-    async def _append_logs(logs: list[str]) -> None:
-        logger.info(
-            f"workflow_id={ctx.get().workflow_id}  run_id={ctx.get().run_id}  step_id={ctx.get().step_id} [_pip_install_requirement]: {''.join(logs)}"
-        )
-        await ctx.get().append_logs_async(logs)
-
-    exit_code = await run_subprocess_with_log_flushing(cmd, _append_logs)
+    exit_code = await run_subprocess_with_log_flushing(
+        cmd, append_logs_fn or _step_logs_appender("_pip_install_requirement")
+    )
 
     _handle_exit_code(exit_code, cmd, action_type)
 
@@ -490,6 +678,98 @@ async def _jailed_python_execution(
     )
 
 
+async def _run_python_action_in_sandbox_pool(
+    job_dir: str,
+    python_action: PythonAction,
+    action_args: dict[str, Any],
+    store: StoreInterface,
+) -> Any:
+    if ADMYRAL_DISABLE_NSJAIL:
+        requirements_paths = []
+        build_cmd = _build_sandbox_cmd_without_nsjail
+    else:
+        lockfile = await _pip_compile(job_dir, python_action, store)
+        requirements_paths = await _pip_install_requirements(
+            python_action.action_type, lockfile, job_dir
+        )
+        build_cmd = partial(_build_sandbox_cmd_with_nsjail, requirements_paths)
+
+    # Executors are not shared across users because an action module might keep
+    # state on module level.
+    sandbox_key = calculate_sha256(";".join([ctx.get().user_id] + requirements_paths))
+
+    job = {
+        "action_type": python_action.action_type,
+        "code": _build_python_action_module(python_action),
+        "args": action_args,
+        "secrets": await _load_secrets(python_action),
+    }
+
+    async def _append_logs(logs: list[str]) -> None:
+        logger.info(
+            f"workflow_id={ctx.get().workflow_id}  run_id={ctx.get().run_id}  step_id={ctx.get().step_id} [_run_python_action_in_sandbox_pool]: {''.join(logs)}"
+        )
+        await ctx.get().append_logs_async(logs)
+
+    status, result = await PythonSandboxPool.run(
+        sandbox_key, build_cmd, job, _append_logs
+    )
+    if status != 0:
+        logger.error(
+            f"Python action with type '{python_action.action_type}' failed in the warm pool."
+        )
+        raise RuntimeError(
+            f"Failed to execute action: {python_action.action_type}. See logs for more details."
+        )
+
+    return result
+
+
+async def _build_sandbox_cmd_without_nsjail(token: str, work_dir: str) -> list[str]:
+    return [sys.executable, "-u", POOL_EXECUTOR_PATH, token, work_dir]
+
+
+async def _build_sandbox_cmd_with_nsjail(
+    requirements_paths: list[str], token: str, work_dir: str
+) -> list[str]:
+    requirements_mounts = "\n".join(
+        [
+            MOUNT_TEMPLATE.format(REQUIREMENT_PATH=requirement_path)
+            for requirement_path in requirements_paths
+        ]
+    )
+
+    async with aiofiles.open(
+        os.path.join("admyral", "workers", "nsjail", "template.python_action_pool.cfg")
+    ) as f:
+        nsjail_config_template = await f.read()
+
+    nsjail_config = nsjail_config_template.format(
+        EXECUTOR_PATH=POOL_EXECUTOR_PATH,
+        PYTHON_DEPENDENCIES=":".join([ADMYRAL_PYTHON_PATH] + requirements_paths),
+        PYTHON_DEPENDENCIES_MOUNT=requirements_mounts,
+        WORK_DIR=work_dir,
+        PATH=os.environ.get("PATH", ""),
+    )
+
+    # the config must outlive the job directory, hence, it is stored in the work directory
+    nsjail_config_path = os.path.join(work_dir, "executor.cfg")
+    async with aiofiles.open(nsjail_config_path, "w") as f:
+        await f.write(nsjail_config)
+
+    return [
+        shutil.which("nsjail") or "nsjail",
+        "--config",
+        nsjail_config_path,
+        "--",
+        ADMYRAL_PYTHON_PATH,
+        "-u",  # unbuffered binary stdout and stderr
+        "python_action_pool_executor.py",
+        token,
+        work_dir,
+    ]
+
+
 def _handle_exit_code(exit_code: int, cmd: list[str], action_type: str):
     if exit_code != 0:
         cmd_str = " ".join(cmd)
@@ -499,3 +779,56 @@ def _handle_exit_code(exit_code: int, cmd: list[str], action_type: str):
         raise RuntimeError(
             f"Failed to execute action: {action_type}. See logs for more details."
         )
+
+
+@activity.defn
+async def prepare_python_action_environment(user_id: str, action_type: str) -> None:
+    """
+    Resolves the lockfile of a custom Python action and installs its requirements
+    ahead of the first execution. The progress is tracked in the environment status
+    of the action.
+    """
+    store = SharedWorkerState.get_store()
+    python_action = await store.get_action(user_id, action_type)
+    if not python_action:
+        logger.warning(
+            f"Skipping environment preparation. Action with type '{action_type}' not found."
+        )
+        return
+
+    # the status is only updated if the stored requirements still match. hence, the
+    # requirements are copied before the environment is prepared.
+    requirements = (
+        list(python_action.requirements) if python_action.requirements else None
+    )
+
+    async def _set_environment_status(status: ActionEnvironmentStatus) -> None:
+        await store.set_action_environment_status(
+            user_id, action_type, requirements, status
+        )
+
+    if ADMYRAL_DISABLE_NSJAIL:
+        # without nsjail, actions use the packages of the worker environment
+        await _set_environment_status(ActionEnvironmentStatus.READY)
+        return
+
+    await _set_environment_status(ActionEnvironmentStatus.PREPARING)
+
+    async def _append_logs(logs: list[str]) -> None:
+        logger.info(
+            f"[prepare_python_action_environment] {action_type}: {''.join(logs)}"
+        )
+
+    try:
+        with tempfile.TemporaryDirectory() as job_dir:
+            await _write_requirements_file(job_dir, python_action)
+            lockfile = await _pip_compile(job_dir, python_action, store, _append_logs)
+            await _pip_install_requirements(
+                action_type, lockfile, job_dir, _append_logs
+            )
+    except Exception:
+        await _set_environment_status(ActionEnvironmentStatus.FAILED)
+        raise
+
+    await _set_environment_status(ActionEnvironmentStatus.READY)
+    logger.info(f"Prepared environment of Python action with type '{action_type}'.")
@@ -0,0 +1,287 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from asyncio.streams import StreamReader
+from collections import defaultdict
+from typing import Awaitable, Callable
+from uuid import uuid4
+import psutil
+
+from admyral.utils.singleton import Singleton
+from admyral.utils.json import json_dumps_bytes, json_loads
+from admyral.typings import JsonValue
+from admyral.logger import get_logger
+from admyral.config.config import (
+    ADMYRAL_PYTHON_SANDBOX_POOL_SIZE,
+    ADMYRAL_PYTHON_SANDBOX_MAX_JOBS,
+    ADMYRAL_PYTHON_SANDBOX_MAX_MEMORY_MB,
+    ADMYRAL_PYTHON_SANDBOX_IDLE_TIMEOUT_IN_SECONDS,
+    ADMYRAL_PYTHON_SANDBOX_JOB_TIMEOUT_IN_SECONDS,
+)
+
+
+logger = get_logger(__name__)
+
+
+POOL_EXECUTOR_PATH = os.path.join(
+    os.path.dirname(__file__), "nsjail", "python_action_pool_executor.py"
+)
+# must match the marker in python_action_pool_executor.py
+JOB_DONE_MARKER = "__admyral_sandbox_job_done__"
+# stdout and stderr both carry a job done marker
+NUM_STREAMS = 2
+# larger lines are truncated
+STREAM_LIMIT_BYTES = 1024 * 1024
+
+
+# builds the command which starts the executor given the token and the work directory
+BuildSandboxCommand = Callable[[str, str], Awaitable[list[str]]]
+AppendLogs = Callable[[list[str]], Awaitable[None]]
+
+
+class PythonSandbox:
+    """
+    A long-running Python action executor process which executes jobs one at a time.
+    """
+
+    def __init__(self, key: str, work_dir: str, token: str) -> None:
+        self.key = key
+        self.work_dir = work_dir
+        self.token = token
+        self.process: asyncio.subprocess.Process | None = None
+        self.num_jobs = 0
+        self.last_used = time.monotonic()
+        self.is_broken = False
+        self._reader_tasks: list[asyncio.Task] = []
+        self._job_lines: list[str] = []
+        self._job_done: asyncio.Future | None = None
+        self._job_status: int | None = None
+        self._num_markers = 0
+
+    @classmethod
+    async def start(cls, key: str, build_cmd: BuildSandboxCommand) -> "PythonSandbox":
+        work_dir = tempfile.mkdtemp(prefix="admyral-sandbox-")
+        sandbox = cls(key, work_dir, uuid4().hex)
+        cmd = await build_cmd(sandbox.token, work_dir)
+        # secrets are passed per job, hence, the executor starts with an empty environment
+        sandbox.process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env={},
+            limit=STREAM_LIMIT_BYTES,
+        )
+        sandbox._reader_tasks = [
+            asyncio.create_task(sandbox._read_stream(sandbox.process.stdout)),
+            asyncio.create_task(sandbox._read_stream(sandbox.process.stderr)),
+        ]
+        logger.info(f"Started Python sandbox with pid {sandbox.process.pid}.")
+        return sandbox
+
+    def is_alive(self) -> bool:
+        return (
+            not self.is_broken
+            and self.process is not None
+            and self.process.returncode is None
+        )
+
+    def memory_bytes(self) -> int:
+        """
+        Resident memory of the executor including its child processes (e.g., nsjail
+        forks the executor).
+        """
+        try:
+            process = psutil.Process(self.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes)
+        except psutil.Error:
+            return 0
+
+    async def _read_stream(self, stream: StreamReader) -> None:
+        marker = f"{JOB_DONE_MARKER}{self.token} "
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                self._job_lines.append(
+                    "Truncated log stream because chunks are too large to be read."
+                )
+                continue
+            if not line:
+                break
+
+            line = line.decode("utf-8", errors="replace")
+            marker_pos = line.find(marker)
+            if marker_pos == -1:
+                self._job_lines.append(line)
+                continue
+
+            # the marker might follow output which did not end with a newline
+            if marker_pos > 0:
+                self._job_lines.append(line[:marker_pos] + "\n")
+            self._job_status = int(line[marker_pos + len(marker) :].strip())
+            self._num_markers += 1
+            if self._num_markers == NUM_STREAMS and self._job_done is not None:
+                if not self._job_done.done():
+                    self._job_done.set_result(None)
+
+        # the executor exited
+        self.is_broken = True
+        if self._job_done is not None and not self._job_done.done():
+            self._job_done.set_exception(
+                RuntimeError("Python sandbox exited unexpectedly.")
+            )
+
+    async def _flush_logs(self, append_logs_fn: AppendLogs) -> None:
+        lines = self._job_lines
+        self._job_lines = []
+        if lines:
+            await append_logs_fn(lines)
+
+    async def run_job(
+        self,
+        job: dict[str, JsonValue],
+        append_logs_fn: AppendLogs,
+        timeout: float = ADMYRAL_PYTHON_SANDBOX_JOB_TIMEOUT_IN_SECONDS,
+    ) -> tuple[int, JsonValue]:
+        """
+        Executes a job and streams its logs to `append_logs_fn`.
+
+        Returns:
+            The exit status and the output of the job.
+        """
+        job_id = str(uuid4())
+        self._job_lines = []
+        self._job_status = None
+        self._num_markers = 0
+        self._job_done = asyncio.get_running_loop().create_future()
+
+        stop_flushing = asyncio.Event()
+
+        async def flush_periodically() -> None:
+            while not stop_flushing.is_set():
+                try:
+                    await asyncio.wait_for(stop_flushing.wait(), 0.5)
+                except asyncio.TimeoutError:
+                    pass
+                await self._flush_logs(append_logs_fn)
+
+        flush_task = asyncio.create_task(flush_periodically())
+        try:
+            self.process.stdin.write(
+                json_dumps_bytes({**job, "job_id": job_id}) + b"\n"
+            )
+            await self.process.stdin.drain()
+            await asyncio.wait_for(self._job_done, timeout)
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            self.is_broken = True
+            raise RuntimeError(f"Python sandbox failed to execute job: {e}") from e
+        finally:
+            stop_flushing.set()
+            await flush_task
+            self._job_done = None
+            self.num_jobs += 1
+            self.last_used = time.monotonic()
+
+        output_path = os.path.join(self.work_dir, f"{job_id}.json")
+        with open(output_path) as f:
+            output = f.read()
+        os.remove(output_path)
+
+        return self._job_status, json_loads(output) if output else None
+
+    async def close(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), 5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        for task in self._reader_tasks:
+            task.cancel()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class PythonSandboxPool(metaclass=Singleton):
+    """
+    Worker-local pool of warm Python action executors.
+
+    Executors are keyed by the user and the installed requirements. Hence, heavy
+    dependencies are imported only once per executor instead of once per action
+    execution. Executors are recycled after `max_jobs` jobs, once they exceed
+    `max_memory_mb`, or after being idle for `idle_timeout` seconds.
+    """
+
+    _idle: dict[str, list[PythonSandbox]] = defaultdict(list)
+    pool_size: int = ADMYRAL_PYTHON_SANDBOX_POOL_SIZE
+    max_jobs: int = ADMYRAL_PYTHON_SANDBOX_MAX_JOBS
+    max_memory_mb: int = ADMYRAL_PYTHON_SANDBOX_MAX_MEMORY_MB
+    idle_timeout: int = ADMYRAL_PYTHON_SANDBOX_IDLE_TIMEOUT_IN_SECONDS
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls.pool_size > 0
+
+    @classmethod
+    async def run(
+        cls,
+        key: str,
+        build_cmd: BuildSandboxCommand,
+        job: dict[str, JsonValue],
+        append_logs_fn: AppendLogs,
+    ) -> tuple[int, JsonValue]:
+        sandbox = await cls._acquire(key, build_cmd)
+        try:
+            return await sandbox.run_job(job, append_logs_fn)
+        finally:
+            await cls._release(sandbox)
+
+    @classmethod
+    async def _acquire(cls, key: str, build_cmd: BuildSandboxCommand) -> PythonSandbox:
+        await cls._evict_idle()
+        idle_sandboxes = cls._idle[key]
+        while idle_sandboxes:
+            sandbox = idle_sandboxes.pop()
+            if sandbox.is_alive():
+                return sandbox
+            await sandbox.close()
+        return await PythonSandbox.start(key, build_cmd)
+
+    @classmethod
+    async def _release(cls, sandbox: PythonSandbox) -> None:
+        if (
+            not sandbox.is_alive()
+            or sandbox.num_jobs >= cls.max_jobs
+            or sandbox.memory_bytes() > cls.max_memory_mb * 1024 * 1024
+            or len(cls._idle[sandbox.key]) >= cls.pool_size
+        ):
+            await sandbox.close()
+            return
+        cls._idle[sandbox.key].append(sandbox)
+
+    @classmethod
+    async def _evict_idle(cls) -> None:
+        now = time.monotonic()
+        for key in list(cls._idle.keys()):
+            keep = []
+            for sandbox in cls._idle[key]:
+                if now - sandbox.last_used > cls.idle_timeout:
+                    await sandbox.close()
+                else:
+                    keep.append(sandbox)
+            if keep:
+                cls._idle[key] = keep
+            else:
+                del cls._idle[key]
+
+    @classmethod
+    async def close(cls) -> None:
+        idle = cls._idle
+        cls._idle = defaultdict(list)
+        for sandboxes in idle.values():
+            for sandbox in sandboxes:
+                await sandbox.close()
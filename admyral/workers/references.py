@@ -1,8 +1,11 @@
 import re
-import json
+from enum import Enum
+from functools import lru_cache
+from typing import NamedTuple
 
 from admyral.typings import JsonValue
 from admyral.exceptions import AdmyralFailureError
+from admyral.utils.json import json_loads
 
 
 REFERENCE_REGEX = re.compile(r"{{((?!}}).)*}}")
@@ -20,88 +23,226 @@ INDEX_ACCESS_REGEX = re.compile(PATTERN3)
 ACCESS_PATH_REGEX = re.compile(r"\[((?!\]).)*\]")
 
 
-def _resolve_access_path(action_outputs: dict, input: str) -> JsonValue:
-    input = input.strip()
-    if not input.startswith("{{") or not input.endswith("}}"):
-        # we have a JSON-serialized constant as input
-        return json.loads(input)
+# Node args are static per workflow version, hence the same templates are
+# evaluated over and over again. We compile each template only once.
+COMPILED_TEMPLATE_CACHE_SIZE = 8192
+
+
+# Large action results are offloaded to the blob store and only a blob reference
+# is kept in the execution state of the workflow. References into such results
+# cannot be evaluated inside the workflow. Instead, the remaining access path is
+# attached to the blob reference and evaluated by the activity which consumes it.
+BLOB_REFERENCE_KEY = "__admyral_blob__"
+BLOB_TEMPLATE_KEY = "__admyral_blob_template__"
+
+
+def is_blob_reference(value: JsonValue) -> bool:
+    return isinstance(value, dict) and BLOB_REFERENCE_KEY in value
+
+
+def is_blob_template(value: JsonValue) -> bool:
+    return isinstance(value, dict) and BLOB_TEMPLATE_KEY in value
+
+
+class SegmentType(Enum):
+    KEY = "key"
+    INDEX = "index"
+    INVALID = "invalid"
+
+
+class Segment(NamedTuple):
+    type: SegmentType
+    value: str | int
+    """ The key, the index, or the error message for invalid segments. """
+
+
+class CompiledAccessPath(NamedTuple):
+    access_path: str
+    variable: str
+    segments: tuple[Segment, ...]
+
+
+class CompiledTemplate(NamedTuple):
+    """
+    Interpolation plan for a string value.
+
+    - `reference` is set if the whole string is a single reference, i.e., "{{ reference }}".
+      Then, the referenced value is returned as is (no string conversion).
+    - Otherwise, `parts` contains the literal strings and the references in the order of
+      their appearance. References are converted into strings during interpolation.
+    """
+
+    reference: CompiledAccessPath | None
+    parts: tuple[str | CompiledAccessPath, ...]
+
+
+def _compile_segment(access_path: str, raw_value: str) -> Segment:
+    if OBJECT_ACCESS_REGEX.match(raw_value) or OBJECT_ACCESS_2_REGEX.match(raw_value):
+        # Case - Object Access: ['key'] or ["key"]
+        return Segment(SegmentType.KEY, raw_value[2:-2])
+
+    if INDEX_ACCESS_REGEX.match(raw_value):
+        # Case - Array Access: [index]
+        try:
+            return Segment(SegmentType.INDEX, int(raw_value[1:-1]))
+        except ValueError:
+            return Segment(
+                SegmentType.INVALID,
+                f"Invalid access path: {access_path}. Expected an integer, got {raw_value}.",
+            )
+
+    return Segment(
+        SegmentType.INVALID,
+        f"Invalid access path segment: {access_path}. Must be either a string or integer.",
+    )
+
+
+@lru_cache(maxsize=COMPILED_TEMPLATE_CACHE_SIZE)
+def compile_access_path(reference: str) -> CompiledAccessPath:
+    """
+    Parses a reference of the form "{{ variable['key'][0] }}" into the base variable
+    and a tuple of typed access path segments.
 
-    access_path = input.lstrip("{{").rstrip("}}").strip()
+    Invalid segments are not raised during compilation but during evaluation, such that
+    errors are only raised if the access path is actually reached.
+    """
+    access_path = reference.strip().lstrip("{{").rstrip("}}").strip()
     if len(access_path) == 0:
         raise AdmyralFailureError(message="Invalid reference: Access path is empty.")
-    current_value = action_outputs
 
-    # access the base variable and check if it exists
     variable = access_path
     access_path_start = access_path.find("[")
     if access_path_start != -1:
         variable = access_path[:access_path_start]
-    current_value = current_value.get(variable)
+
+    segments = tuple(
+        _compile_segment(access_path, key.group())
+        for key in ACCESS_PATH_REGEX.finditer(access_path)
+    )
+
+    return CompiledAccessPath(access_path, variable, segments)
+
+
+@lru_cache(maxsize=COMPILED_TEMPLATE_CACHE_SIZE)
+def compile_template(value: str) -> CompiledTemplate:
+    """
+    Parses a string which contains references into an interpolation plan.
+    """
+    reference_matches = list(REFERENCE_REGEX.finditer(value))
+
+    if value.startswith("{{") and value.endswith("}}") and len(reference_matches) == 1:
+        # We have something like: "{{ reference }}"
+        return CompiledTemplate(compile_access_path(value), ())
+
+    parts = []
+    last_end = 0
+    for match in reference_matches:
+        if match.start() > last_end:
+            parts.append(value[last_end : match.start()])
+        parts.append(compile_access_path(match.group()))
+        last_end = match.end()
+    if last_end < len(value):
+        parts.append(value[last_end:])
+
+    return CompiledTemplate(None, tuple(parts))
+
+
+def _evaluate_access_path(
+    action_outputs: dict, compiled: CompiledAccessPath
+) -> JsonValue:
+    # access the base variable and check if it exists
+    current_value = action_outputs.get(compiled.variable)
     if current_value is None:
         return None
 
-    for key in ACCESS_PATH_REGEX.finditer(access_path):
-        raw_value = key.group()
+    access_path = compiled.access_path
+    if is_blob_reference(current_value):
+        return _defer_blob_access_path(current_value, compiled)
 
-        if OBJECT_ACCESS_REGEX.match(raw_value) or OBJECT_ACCESS_2_REGEX.match(
-            raw_value
-        ):
-            # Case - Object Access: ['key'] or ["key"]
-            raw_value = raw_value[2:-2]
+    for segment_type, segment_value in compiled.segments:
+        if segment_type == SegmentType.KEY:
             if not isinstance(current_value, dict):
                 raise AdmyralFailureError(
                     message=f"Invalid access path: {access_path}. Expected a dictionary, got {type(current_value).__name__}."
                 )
-            if raw_value not in current_value:
-                raise AdmyralFailureError(
-                    message=f"Invalid access path: {access_path}. Key '{raw_value}' not found."
-                )
-            current_value = current_value[raw_value]
-        elif INDEX_ACCESS_REGEX.match(raw_value):
-            # Case - Array Access: [index]
-            try:
-                raw_value = int(raw_value[1:-1])
-            except ValueError:
+            if segment_value not in current_value:
                 raise AdmyralFailureError(
-                    message=f"Invalid access path: {access_path}. Expected an integer, got {raw_value}."
+                    message=f"Invalid access path: {access_path}. Key '{segment_value}' not found."
                 )
+            current_value = current_value[segment_value]
+        elif segment_type == SegmentType.INDEX:
             if not isinstance(current_value, list):
                 raise AdmyralFailureError(
                     message=f"Invalid access path: {access_path}. Expected a list, got {type(current_value).__name__}."
                 )
-            if raw_value >= len(current_value) or raw_value < -len(current_value):
+            if segment_value >= len(current_value) or segment_value < -len(
+                current_value
+            ):
                 raise AdmyralFailureError(
-                    message=f"Invalid access path: {access_path}. Index {raw_value} out of bounds."
+                    message=f"Invalid access path: {access_path}. Index {segment_value} out of bounds."
                 )
-            current_value = current_value[raw_value]
+            current_value = current_value[segment_value]
         else:
-            raise AdmyralFailureError(
-                message=f"Invalid access path segment: {access_path}. Must be either a string or integer."
-            )
+            raise AdmyralFailureError(message=segment_value)
 
     return current_value
 
 
+def _defer_blob_access_path(
+    blob_reference: dict, compiled: CompiledAccessPath
+) -> JsonValue:
+    for segment_type, segment_value in compiled.segments:
+        if segment_type == SegmentType.INVALID:
+            raise AdmyralFailureError(message=segment_value)
+    return {
+        BLOB_REFERENCE_KEY: blob_reference[BLOB_REFERENCE_KEY],
+        "path": blob_reference.get("path", [])
+        + [segment_value for _, segment_value in compiled.segments],
+        "access_path": compiled.access_path,
+    }
+
+
+def interpolate(parts: list[JsonValue]) -> str:
+    return "".join(
+        part if isinstance(part, str) else (str(part) if part is not None else "null")
+        for part in parts
+    )
+
+
+def _resolve_access_path(action_outputs: dict, input: str) -> JsonValue:
+    stripped_input = input.strip()
+    if not stripped_input.startswith("{{") or not stripped_input.endswith("}}"):
+        # we have a JSON-serialized constant as input
+        return json_loads(stripped_input)
+    return _evaluate_access_path(action_outputs, compile_access_path(input))
+
+
 def evaluate_references(value: JsonValue, execution_state: dict) -> JsonValue:
     if value is None or isinstance(value, (bool, int, float)):
         return value
 
     if isinstance(value, str):
-        reference_matches = [match.group() for match in REFERENCE_REGEX.finditer(value)]
-
-        if (
-            value.startswith("{{")
-            and value.endswith("}}")
-            and len(reference_matches) == 1
-        ):
-            # We have something like: "{{ reference }}"
-            return _resolve_access_path(execution_state, value)
-
-        for reference in reference_matches:
-            resolved_ref = _resolve_access_path(execution_state, reference)
-            resolved_ref_str = str(resolved_ref) if resolved_ref is not None else "null"
-            value = value.replace(reference, resolved_ref_str)
-        return value
+        if "{{" not in value:
+            # fast path: no references
+            return value
+
+        compiled = compile_template(value)
+        if compiled.reference is not None:
+            return _evaluate_access_path(execution_state, compiled.reference)
+
+        interpolated = []
+        has_blob_reference = False
+        for part in compiled.parts:
+            if isinstance(part, str):
+                interpolated.append(part)
+                continue
+            resolved_ref = _evaluate_access_path(execution_state, part)
+            has_blob_reference |= is_blob_reference(resolved_ref)
+            interpolated.append(resolved_ref)
+        if has_blob_reference:
+            # the interpolation is completed by the activity once the blob is loaded
+            return {BLOB_TEMPLATE_KEY: interpolated}
+        return interpolate(interpolated)
 
     if isinstance(value, dict):
         out = {}
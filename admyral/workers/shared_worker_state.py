@@ -1,20 +1,42 @@
+from typing import TYPE_CHECKING
+
 from admyral.utils.singleton import Singleton
 from admyral.db.store_interface import StoreInterface
-from admyral.secret.secrets_manager import SecretsManager
+from admyral.db.write_behind_buffer import WorkflowRunStepWriteBuffer
+from admyral.blob_store.blob_store import BlobStore, blob_store_factory
 from admyral.workers.workers_client import WorkersClient
 from admyral.config.config import CONFIG
 
+if TYPE_CHECKING:
+    # avoid circular import
+    from admyral.secret.secrets_manager import SecretsManager
+
 
 class SharedWorkerState(metaclass=Singleton):
     _store: StoreInterface = None
-    _secrets_manager: SecretsManager = None
+    _secrets_manager: "SecretsManager" = None
     _workers_client: WorkersClient = None
+    _step_write_buffer: WorkflowRunStepWriteBuffer = None
+    _blob_store: BlobStore | None = None
 
     @classmethod
-    async def init(cls, store: StoreInterface, secrets_manager: SecretsManager) -> None:
+    async def init(
+        cls, store: StoreInterface, secrets_manager: "SecretsManager"
+    ) -> None:
         cls._store = store
         cls._secrets_manager = secrets_manager
         cls._workers_client = await WorkersClient.connect(store, CONFIG.temporal_host)
+        cls._step_write_buffer = WorkflowRunStepWriteBuffer(
+            store,
+            max_batch_size=CONFIG.step_result_batch_size,
+            flush_interval_ms=CONFIG.step_result_flush_interval_ms,
+        )
+        cls._blob_store = blob_store_factory()
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        if cls._step_write_buffer:
+            await cls._step_write_buffer.close()
 
     @classmethod
     def get_store(cls) -> StoreInterface:
@@ -23,7 +45,7 @@ class SharedWorkerState(metaclass=Singleton):
         return cls._store
 
     @classmethod
-    def get_secrets_manager(cls) -> SecretsManager:
+    def get_secrets_manager(cls) -> "SecretsManager":
         if not cls._secrets_manager:
             raise RuntimeError("SharedWorkerState not initialized.")
         return cls._secrets_manager
@@ -33,3 +55,16 @@ class SharedWorkerState(metaclass=Singleton):
         if not cls._workers_client:
             raise RuntimeError("SharedWorkerState not initialized.")
         return cls._workers_client
+
+    @classmethod
+    def get_step_write_buffer(cls) -> WorkflowRunStepWriteBuffer:
+        if not cls._step_write_buffer:
+            raise RuntimeError("SharedWorkerState not initialized.")
+        return cls._step_write_buffer
+
+    @classmethod
+    def get_blob_store(cls) -> BlobStore | None:
+        """
+        Returns the blob store or None if offloading large results is disabled.
+        """
+        return cls._blob_store
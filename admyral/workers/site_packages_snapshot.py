@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+
+from admyral.utils.hash import calculate_sha256
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def get_site_packages_snapshot_path(
+    snapshot_directory: str, lockfile: list[str]
+) -> str:
+    """
+    Snapshots are content-addressed by the lockfile. The order of the requirements
+    does not matter.
+    """
+    return os.path.join(
+        snapshot_directory, calculate_sha256("\n".join(sorted(lockfile)))
+    )
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    if os.path.islink(src):
+        os.symlink(os.readlink(src), dst)
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        # hardlinks do not work across filesystems
+        shutil.copy2(src, dst)
+
+
+def _merge_tree(src_root: str, dst_root: str) -> None:
+    for dirpath, dirnames, filenames in os.walk(src_root):
+        rel_dir = os.path.relpath(dirpath, src_root)
+        dst_dir = os.path.join(dst_root, rel_dir)
+        os.makedirs(dst_dir, exist_ok=True)
+
+        # os.walk does not follow symlinked directories, hence, we copy the link
+        for name in dirnames + filenames:
+            src = os.path.join(dirpath, name)
+            if name in dirnames and not os.path.islink(src):
+                continue
+            dst = os.path.join(dst_dir, name)
+            if os.path.lexists(dst):
+                # the first requirement wins, e.g., for shared namespace packages
+                continue
+            _link_or_copy(src, dst)
+
+
+def materialize_site_packages_snapshot(
+    snapshot_path: str, requirement_paths: list[str]
+) -> str:
+    """
+    Merges the installed requirements into a single site-packages tree. The tree is
+    built in a temporary directory and then atomically renamed, hence, a snapshot is
+    never observed partially and is immutable once it exists.
+
+    Args:
+        snapshot_path: The path of the snapshot. See `get_site_packages_snapshot_path`.
+        requirement_paths: The pip install targets of the requirements.
+
+    Returns:
+        The snapshot path.
+    """
+    if os.path.exists(snapshot_path):
+        return snapshot_path
+
+    snapshot_directory = os.path.dirname(snapshot_path)
+    os.makedirs(snapshot_directory, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=snapshot_directory, prefix=".tmp-")
+    try:
+        for requirement_path in requirement_paths:
+            _merge_tree(requirement_path, tmp_path)
+        os.chmod(tmp_path, 0o755)
+        os.rename(tmp_path, snapshot_path)
+        logger.info(f"Materialized site-packages snapshot {snapshot_path}.")
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.exists(snapshot_path):
+            raise
+        # another worker materialized the snapshot concurrently
+
+    return snapshot_path
@@ -1,3 +1,4 @@
+import asyncio
 from temporalio.client import Client
 from temporalio.worker import Worker
 from concurrent.futures import ThreadPoolExecutor
@@ -6,19 +7,36 @@ from admyral.workers.workflow_executor import WorkflowExecutor
 from admyral.workers.python_executor import (
     execute_python_action,
     python_action_worker_setup,
+    prepare_python_action_environment,
+)
+from admyral.workers.prepare_action_environment_workflow import (
+    PrepareActionEnvironmentWorkflow,
 )
 from admyral.workers.shared_worker_state import SharedWorkerState
 from admyral.action_registry import ActionRegistry
 from admyral.db.admyral_store import AdmyralStore
+from admyral.config.config import (
+    CONFIG,
+    DatabasePoolProfile,
+    TemporalPayloadCompression,
+)
 from admyral.logger import get_logger
 from admyral.workers.action_executor import action_executor
 from admyral.workers.workflow_run_initializer import init_workflow_run
 from admyral.workers.workflow_run_completor import mark_workflow_as_completed
+from admyral.workers.workflow_definition_resolver import load_workflow_definition
 from admyral.secret.secrets_manager import secrets_manager_factory
 from admyral.workers.if_condition_executor import execute_if_condition
 from admyral.utils.future_executor import capture_main_event_loop
 from admyral.workers.store_reference_error import store_reference_resolution_error
 from admyral.workers.store_workflow_error import store_action_input_too_large_error
+from admyral.workers.data_converter import get_data_converter
+from admyral.workers.payload_codec import get_payload_codec
+from admyral.workers.python_sandbox_pool import PythonSandboxPool
+from admyral.utils.metrics import log_metrics_periodically
+from admyral.workers.blob_garbage_collector import (
+    collect_unreferenced_blobs_periodically,
+)
 
 logger = get_logger(__name__)
 
@@ -26,7 +44,9 @@ logger = get_logger(__name__)
 async def _setup():
     await python_action_worker_setup()
 
-    admyral_store = await AdmyralStore.create_store(skip_setup=True)
+    admyral_store = await AdmyralStore.create_store(
+        skip_setup=True, profile=DatabasePoolProfile.WORKER
+    )
     secrets_manager = secrets_manager_factory(admyral_store)
     await SharedWorkerState.init(admyral_store, secrets_manager)
 
@@ -53,18 +73,49 @@ async def run_worker(
         action_executor("if_condition", execute_if_condition),
         init_workflow_run,
         mark_workflow_as_completed,
+        load_workflow_definition,
         store_reference_resolution_error,
         store_action_input_too_large_error,
+        prepare_python_action_environment,
+    ]
+
+    metrics_sources = {"Database pool": SharedWorkerState.get_store().get_pool_metrics}
+    if CONFIG.temporal_payload_compression != TemporalPayloadCompression.DISABLED:
+        metrics_sources["Temporal payload compression"] = (
+            get_payload_codec().get_metrics
+        )
+    background_tasks = [
+        asyncio.create_task(
+            log_metrics_periodically(metrics_sources, CONFIG.metrics_log_interval)
+        )
     ]
+    if blob_store := SharedWorkerState.get_blob_store():
+        background_tasks.append(
+            asyncio.create_task(
+                collect_unreferenced_blobs_periodically(
+                    SharedWorkerState.get_store(),
+                    blob_store,
+                    CONFIG.blob_gc_interval,
+                    CONFIG.blob_gc_grace_period_seconds,
+                )
+            )
+        )
 
     logger.info(f"Starting worker {worker_name}...")
-    client = await Client.connect(target_host)
+    client = await Client.connect(target_host, data_converter=get_data_converter())
     worker = Worker(
         client=client,
         task_queue=task_queue,
-        workflows=[WorkflowExecutor],
+        workflows=[WorkflowExecutor, PrepareActionEnvironmentWorkflow],
         activities=activities,
         activity_executor=ThreadPoolExecutor(thread_pool_size),
         debug_mode=worker_debug_mode,
     )
-    await worker.run()
+    try:
+        await worker.run()
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        # persist buffered step results before the process exits
+        await SharedWorkerState.shutdown()
+        await PythonSandboxPool.close()
@@ -5,15 +5,18 @@ from temporalio.client import (
     ScheduleSpec,
     ScheduleIntervalSpec,
 )
-from temporalio.common import RetryPolicy
+from temporalio.common import RetryPolicy, WorkflowIDReusePolicy
 from uuid import uuid4
 from datetime import timedelta
 import temporalio
 
 from admyral.logger import get_logger
 from admyral.db.store_interface import StoreInterface
-from admyral.models import WorkflowSchedule, Workflow
+from admyral.models import WorkflowSchedule, Workflow, PythonAction
 from admyral.typings import JsonValue
+from admyral.config.config import CONFIG
+from admyral.workers.data_converter import get_data_converter
+from admyral.utils.hash import calculate_sha256
 
 
 logger = get_logger(__name__)
@@ -30,9 +33,43 @@ class WorkersClient:
     @classmethod
     async def connect(cls, store: StoreInterface, host: str) -> "WorkersClient":
         logger.info(f"Connecting to Temporal at host {host}...")
-        client = await Client.connect(host)
+        client = await Client.connect(host, data_converter=get_data_converter())
         return cls(store, client)
 
+    def _build_workflow_params(
+        self,
+        user_id: str,
+        workflow: Workflow,
+        source_name: str,
+        payload: dict[str, JsonValue],
+        trigger_default_args: dict[str, JsonValue],
+    ) -> dict[str, JsonValue]:
+        params = {
+            "user_id": user_id,
+            "source_name": source_name,
+            "payload": payload,
+            "trigger_default_args": trigger_default_args,
+        }
+        if CONFIG.workflow_params_by_reference and workflow.version_hash:
+            # the workers resolve the workflow definition from the store
+            params["workflow_id"] = workflow.workflow_id
+            params["workflow_version"] = workflow.version_hash
+        else:
+            params["workflow"] = workflow
+        return params
+
+    def _build_idempotency_key(
+        self, user_id: str, workflow: Workflow, idempotency_key: str
+    ) -> str:
+        return calculate_sha256(
+            ";".join([user_id, workflow.workflow_id, idempotency_key])
+        )
+
+    def _log_duplicate(self, workflow: Workflow, idempotency_key: str) -> None:
+        logger.info(
+            f"Skipping duplicate run of workflow {workflow.workflow_id} with idempotency key {idempotency_key}."
+        )
+
     async def start_workflow(
         self,
         user_id: str,
@@ -40,28 +77,98 @@ class WorkersClient:
         source_name: str,
         payload: dict[str, JsonValue] = {},
         trigger_default_args: dict[str, JsonValue] = {},
-    ) -> None:
+        idempotency_key: str | None = None,
+        rpc_timeout: timedelta | None = None,
+    ) -> bool:
+        """
+        Starts a workflow run.
+
+        Args:
+            idempotency_key: If provided, the run is only started if no run with the
+                same idempotency key was started within the idempotency window.
+            rpc_timeout: Timeout of the start request to Temporal. Defaults to the
+                timeout of the Temporal client.
+
+        Returns:
+            False if the run was rejected as a duplicate, otherwise True.
+        """
         logger.info(
             f"Executing workflow {workflow.workflow_id} from source {source_name}."
         )
 
         from admyral.workers.workflow_executor import WorkflowExecutor
 
-        # TODO: should we unify the temporal_workflow_id across triggers?
-        temporal_workflow_id = str(uuid4())
-        await self.client.start_workflow(
-            WorkflowExecutor.run,
-            {
-                "user_id": user_id,
-                "workflow": workflow,
-                "source_name": source_name,
-                "payload": payload,
-                "trigger_default_args": trigger_default_args,
-            },
-            id=temporal_workflow_id,
-            task_queue="workflow-queue",
-            retry_policy=RETRY_POLICY,
+        if idempotency_key is None:
+            # TODO: should we unify the temporal_workflow_id across triggers?
+            temporal_workflow_id = str(uuid4())
+            id_reuse_policy = WorkflowIDReusePolicy.ALLOW_DUPLICATE
+        else:
+            # the first start within the idempotency window claims the key. further
+            # starts are rejected as duplicates without calling Temporal. if the
+            # claiming start did not reach Temporal (e.g., the request timed out),
+            # retries reuse its Temporal workflow id so that Temporal deduplicates
+            # them.
+            key = self._build_idempotency_key(user_id, workflow, idempotency_key)
+            claim = await self.store.claim_idempotency_key(
+                key,
+                f"{workflow.workflow_id}-{uuid4()}",
+                CONFIG.idempotency_window_seconds,
+            )
+            if claim.is_started:
+                self._log_duplicate(workflow, idempotency_key)
+                return False
+            temporal_workflow_id = claim.temporal_workflow_id
+            id_reuse_policy = WorkflowIDReusePolicy.REJECT_DUPLICATE
+
+        try:
+            await self.client.start_workflow(
+                WorkflowExecutor.run,
+                self._build_workflow_params(
+                    user_id, workflow, source_name, payload, trigger_default_args
+                ),
+                id=temporal_workflow_id,
+                task_queue="workflow-queue",
+                retry_policy=RETRY_POLICY,
+                id_reuse_policy=id_reuse_policy,
+                rpc_timeout=rpc_timeout,
+            )
+        except temporalio.exceptions.WorkflowAlreadyStartedError:
+            if idempotency_key is not None:
+                await self.store.mark_idempotency_key_started(key, temporal_workflow_id)
+            self._log_duplicate(workflow, idempotency_key)
+            return False
+
+        if idempotency_key is not None:
+            await self.store.mark_idempotency_key_started(key, temporal_workflow_id)
+
+        return True
+
+    async def prepare_action_environment(
+        self, user_id: str, python_action: PythonAction
+    ) -> None:
+        """
+        Enqueues the installation of the requirements of a custom Python action.
+        Preparing the same requirements again while a preparation is running is a no-op.
+        """
+        from admyral.workers.prepare_action_environment_workflow import (
+            PrepareActionEnvironmentWorkflow,
+        )
+
+        requirements_hash = calculate_sha256(
+            ";".join([user_id, python_action.action_type] + python_action.requirements)
         )
+        try:
+            await self.client.start_workflow(
+                PrepareActionEnvironmentWorkflow.run,
+                args=[user_id, python_action.action_type],
+                id=f"prepare-action-environment-{requirements_hash}",
+                task_queue="workflow-queue",
+                retry_policy=RETRY_POLICY,
+            )
+        except temporalio.exceptions.WorkflowAlreadyStartedError:
+            logger.info(
+                f"Environment of action {python_action.action_type} is already being prepared."
+            )
 
     def _build_temporal_schedule_spec(self, schedule: WorkflowSchedule) -> ScheduleSpec:
         if schedule.cron:
@@ -95,13 +202,9 @@ class WorkersClient:
             Schedule(
                 action=ScheduleActionStartWorkflow(
                     WorkflowExecutor.run,
-                    {
-                        "user_id": user_id,
-                        "workflow": workflow,
-                        "source_name": "schedule",
-                        "payload": {},
-                        "trigger_default_args": schedule.default_args,
-                    },
+                    self._build_workflow_params(
+                        user_id, workflow, "schedule", {}, schedule.default_args
+                    ),
                     id=temmporal_workflow_id,
                     task_queue="workflow-queue",
                     retry_policy=RETRY_POLICY,
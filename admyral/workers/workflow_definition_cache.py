@@ -0,0 +1,101 @@
+from collections import OrderedDict
+
+from admyral.utils.singleton import Singleton
+from admyral.utils.single_flight import SingleFlight
+from admyral.utils.future_executor import schedule_future
+from admyral.models import Workflow
+from admyral.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+WORKFLOW_DEFINITION_CACHE_SIZE = 1024
+
+
+class WorkflowDefinitionCache(metaclass=Singleton):
+    """
+    Worker-local cache of workflow definitions keyed by workflow ID and version hash.
+
+    Workflow runs which are started by reference only carry the workflow ID and the
+    version hash. The definition is loaded once from the store and then served from
+    memory. Concurrent misses for the same version share a single store lookup. The
+    version hash is the hash of the workflow DAG. Hence, the definition of a version
+    never changes and replays resolve the same definition.
+    """
+
+    _cache: OrderedDict[tuple[str, str], Workflow] = OrderedDict()
+    _inflight: SingleFlight[tuple[str, str], Workflow] = SingleFlight()
+    _max_size: int = WORKFLOW_DEFINITION_CACHE_SIZE
+
+    @classmethod
+    async def get(cls, user_id: str, workflow_id: str, version_hash: str) -> Workflow:
+        key = (workflow_id, version_hash)
+        workflow = cls._cache.get(key)
+        if workflow is not None:
+            cls._cache.move_to_end(key)
+            return workflow
+
+        return await cls._inflight.do(
+            key, lambda: cls._load(user_id, workflow_id, version_hash)
+        )
+
+    @classmethod
+    def peek(cls, workflow_id: str, version_hash: str) -> Workflow | None:
+        """
+        Returns the cached definition without loading it. Safe to call from
+        workflow code.
+        """
+        return cls._cache.get((workflow_id, version_hash))
+
+    @classmethod
+    def prefetch(cls, user_id: str, workflow_id: str, version_hash: str) -> None:
+        """
+        Loads the definition on the main event loop without waiting for it. Safe to
+        call from workflow code.
+        """
+
+        async def _prefetch() -> None:
+            try:
+                await cls.get(user_id, workflow_id, version_hash)
+            except Exception as e:
+                logger.error(
+                    f'Failed to prefetch workflow "{workflow_id}" version "{version_hash}": {e}'
+                )
+
+        schedule_future(_prefetch())
+
+    @classmethod
+    async def _fetch_workflow(
+        cls, user_id: str, workflow_id: str, version_hash: str
+    ) -> Workflow | None:
+        # avoid circular import
+        from admyral.workers.shared_worker_state import SharedWorkerState
+
+        return await SharedWorkerState.get_store().get_workflow_version(
+            user_id, workflow_id, version_hash
+        )
+
+    @classmethod
+    async def _load(cls, user_id: str, workflow_id: str, version_hash: str) -> Workflow:
+        workflow = await cls._fetch_workflow(user_id, workflow_id, version_hash)
+        if workflow is None:
+            raise RuntimeError(
+                f'Workflow "{workflow_id}" version "{version_hash}" does not exist.'
+            )
+
+        key = (workflow_id, version_hash)
+        cls._cache[key] = workflow
+        cls._cache.move_to_end(key)
+        while len(cls._cache) > cls._max_size:
+            cls._cache.popitem(last=False)
+
+        return workflow
+
+    @classmethod
+    def invalidate(cls, workflow_id: str | None = None) -> None:
+        if workflow_id is None:
+            cls._cache.clear()
+        else:
+            for key in [key for key in cls._cache if key[0] == workflow_id]:
+                del cls._cache[key]
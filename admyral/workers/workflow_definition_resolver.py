@@ -0,0 +1,20 @@
+from temporalio import activity
+
+from admyral.exceptions import NonRetryableActionError
+from admyral.workers.workflow_definition_cache import WorkflowDefinitionCache
+
+
+@activity.defn
+async def load_workflow_definition(
+    user_id: str, workflow_id: str, version_hash: str
+) -> None:
+    """
+    Loads a workflow which was started by reference into the definition cache of
+    this worker. Executed as a local activity, i.e., in the worker which executes the
+    workflow. The definition is not returned because it would be recorded in the
+    workflow history.
+    """
+    try:
+        await WorkflowDefinitionCache.get(user_id, workflow_id, version_hash)
+    except RuntimeError as e:
+        raise NonRetryableActionError(str(e)) from e
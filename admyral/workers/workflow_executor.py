@@ -4,7 +4,7 @@ from temporalio.common import RetryPolicy
 from temporalio.exceptions import ActivityError
 from dataclasses import dataclass
 from datetime import timedelta
-from collections import deque, defaultdict
+from collections import deque
 from admyral.utils.collections import is_not_empty
 import asyncio
 from pydantic import BaseModel, JsonValue
@@ -17,21 +17,26 @@ with workflow.unsafe.imports_passed_through():
     from admyral.models import (
         ActionNode,
         IfNode,
-        WorkflowDAG,
         Workflow,
+        WorkflowExecutionPlan,
+    )
+    from admyral.compiler.execution_plan_compiler import (
+        compile_execution_plan,
+        compile_argument_filters,
     )
-    from admyral.action_registry import ActionRegistry
     from admyral.workers.references import evaluate_references
     from admyral.workers.if_condition_executor import ConditionReferenceResolution
     from admyral.utils.collections import is_not_empty
     from admyral.utils.memory import count_json_payload_bytes
     from admyral.config.config import TEMPORAL_PAYLOAD_LIMIT
+    from admyral.workers.workflow_definition_cache import WorkflowDefinitionCache
 
 
 logger = get_logger(__name__)
 
 
 START_TO_CLOSE_TIMEOUT = timedelta(seconds=6 * 60 * 60)  # 6 hours
+LOAD_WORKFLOW_DEFINITION_TIMEOUT = timedelta(seconds=30)
 ACTION_RETRY_POLICY = RetryPolicy(
     maximum_attempts=3,
     non_retryable_error_types=["NonRetryableActionError"],
@@ -43,14 +48,18 @@ ACTION_RETRY_POLICY = RetryPolicy(
 @dataclass
 class WorkflowParams:
     user_id: str
-    workflow: Workflow
     source_name: str
     payload: dict[str, Any]
     trigger_default_args: dict[str, Any]
+    workflow: Workflow | None = None
+    # If the workflow is passed by reference, it is resolved by the worker.
+    workflow_id: str | None = None
+    workflow_version: str | None = None
 
 
 class JobQueueEntry(BaseModel):
-    action_id: str
+    node: int
+    """ The index of the node in the execution plan. """
     prev_step_id: Optional[str] = None
 
 
@@ -112,30 +121,74 @@ async def _store_reference_resolution_error(
     )
 
 
+async def _resolve_workflow(params: WorkflowParams) -> Workflow:
+    if params.workflow is not None:
+        return params.workflow
+    if params.workflow_id is None or params.workflow_version is None:
+        raise RuntimeError("Workflow params must contain a workflow or a reference.")
+    # workflow code must not perform I/O. hence, the definition is loaded into the
+    # cache of this worker by a local activity. the definition of a version hash
+    # never changes. hence, reading it from the cache is deterministic. the local
+    # activity is always executed such that replays issue the same commands.
+    try:
+        await workflow.execute_local_activity(
+            "load_workflow_definition",
+            args=[params.user_id, params.workflow_id, params.workflow_version],
+            start_to_close_timeout=LOAD_WORKFLOW_DEFINITION_TIMEOUT,
+            retry_policy=ACTION_RETRY_POLICY,
+        )
+    except ActivityError as e:
+        logger.error(
+            f"Error loading workflow {params.workflow_id} version {params.workflow_version}: {e.message}. Cause: {e.cause}"
+        )
+        raise e
+
+    wf = WorkflowDefinitionCache.peek(params.workflow_id, params.workflow_version)
+    if wf is None:
+        # replays do not execute the local activity again. hence, a worker which
+        # replays the workflow, e.g., after a restart, might not have loaded the
+        # definition yet. failing the workflow task makes Temporal retry it.
+        with workflow.unsafe.sandbox_unrestricted():
+            WorkflowDefinitionCache.prefetch(
+                params.user_id, params.workflow_id, params.workflow_version
+            )
+        raise RuntimeError(
+            f"Workflow {params.workflow_id} version {params.workflow_version} is not loaded yet. Retrying the workflow task."
+        )
+    return wf
+
+
 @workflow.defn(name="WorkflowExecutor")
 class WorkflowExecutor:
     @workflow.run
     async def run(self, params: WorkflowParams) -> None:
-        workflow_dag = params.workflow.workflow_dag
-        in_deg = workflow_dag.get_in_deg()
+        wf = await _resolve_workflow(params)
+        # workflows pushed before execution plans were introduced must be compiled here
+        plan = wf.execution_plan or compile_execution_plan(wf.workflow_dag)
+        nodes = [wf.workflow_dag.dag[node_id] for node_id in plan.node_ids]
+        # path elimination mutates the incoming degrees, hence we need a copy
+        in_deg = list(plan.in_deg)
+        # computed from the action definitions of this worker because they might
+        # differ from the ones of the process which compiled the plan
+        defined_args = compile_argument_filters(wf.workflow_dag, plan)
 
         # initialize workflow run
         payload = self._inject_default_args(params.payload, params.trigger_default_args)
 
         workflow_run_id = await _execute_activity(
             "init_workflow_run",
-            args=[params.workflow.workflow_id, params.source_name, payload],
+            args=[wf.workflow_id, params.source_name, payload],
         )
 
         logger.info(
-            f'Triggering workflow "{params.workflow.workflow_id}" from source "{params.source_name}" with run ID "{workflow_run_id}".'
+            f'Triggering workflow "{wf.workflow_id}" from source "{params.source_name}" with run ID "{workflow_run_id}".'
         )
 
         # setup states for workflow execution
         execution_state = {"payload": payload}
 
         eliminated_nodes = set()
-        resolved_dependencies = defaultdict(int)
+        resolved_dependencies = [0] * plan.num_nodes
 
         number_of_running_tasks = 0
 
@@ -149,18 +202,20 @@ class WorkflowExecutor:
 
         exception_queue = asyncio.Queue()
 
-        async def task(action_id: str, prev_step_id: str):
+        async def task(node_idx: int, prev_step_id: str):
             nonlocal number_of_running_tasks
             nonlocal eliminated_nodes
             nonlocal resolved_dependencies
 
+            action_id = plan.node_ids[node_idx]
+
             try:
-                node = params.workflow.workflow_dag.dag[action_id]
+                node = nodes[node_idx]
 
                 # TODO: strong type?
                 ctx_dict = {
                     "user_id": params.user_id,
-                    "workflow_id": params.workflow.workflow_id,
+                    "workflow_id": wf.workflow_id,
                     "run_id": workflow_run_id,
                     "action_type": node.type,
                     "prev_step_id": prev_step_id,
@@ -172,41 +227,38 @@ class WorkflowExecutor:
                 if isinstance(node, IfNode):
                     step_id, newly_eliminated_nodes = await self._execute_if_condition(
                         node,
+                        node_idx,
                         execution_state,
-                        params.workflow.workflow_dag,
+                        plan,
                         in_deg,
                         ctx_dict,
                     )
                     eliminated_nodes |= newly_eliminated_nodes
-                    candidates = node.true_children + node.false_children
                 elif isinstance(node, ActionNode):
-                    if node.id != "start":
+                    if node_idx != 0:
                         if node.type == "wait":
                             await asyncio.sleep(node.args.get("seconds", 0))
 
                         step_id, execution_result = await self._execute_action_node(
-                            node, execution_state, ctx_dict
+                            node, defined_args[node_idx], execution_state, ctx_dict
                         )
                         if node.result_name is not None:
                             execution_state[node.result_name] = execution_result
                     else:
                         step_id = None
-                    candidates = node.children
                 else:
                     raise RuntimeError(f"Invalid node type: {type(node)}")
 
                 # schedule next actions
-                for child_id in candidates:
+                for child in plan.children(node_idx):
                     # mark the current node as resolved for each child
-                    resolved_dependencies[child_id] += 1
+                    resolved_dependencies[child] += 1
                     # we only schedule a child if all its dependencies (i.e., its parents) are resolved
                     if (
-                        child_id not in eliminated_nodes
-                        and resolved_dependencies[child_id] == in_deg[child_id]
+                        child not in eliminated_nodes
+                        and resolved_dependencies[child] == in_deg[child]
                     ):
-                        await push_job(
-                            JobQueueEntry(action_id=child_id, prev_step_id=step_id)
-                        )
+                        await push_job(JobQueueEntry(node=child, prev_step_id=step_id))
 
             except Exception as e:
                 logger.error(f"Error executing task: {action_id}. Exception: {e}")
@@ -221,7 +273,7 @@ class WorkflowExecutor:
                 job_queue.task_done()
 
         # job trigger loop
-        await push_job(JobQueueEntry(action_id="start", prev_step_id=None))
+        await push_job(JobQueueEntry(node=0, prev_step_id=None))
 
         exception = None
         async with asyncio.TaskGroup() as tg:
@@ -245,10 +297,10 @@ class WorkflowExecutor:
 
                 # launch new task
                 logger.info(
-                    f"Scheduling action: {job.action_id}"
+                    f"Scheduling action: {plan.node_ids[job.node]}"
                 )  # TODO: better log message
                 number_of_running_tasks += 1
-                tg.create_task(task(job.action_id, job.prev_step_id))
+                tg.create_task(task(job.node, job.prev_step_id))
 
         if exception:
             logger.error(
@@ -259,7 +311,7 @@ class WorkflowExecutor:
         await _execute_activity("mark_workflow_as_completed", args=[workflow_run_id])
 
         logger.info(
-            f'Workflow execution of workflow "{params.workflow.workflow_id}" with run ID "{workflow_run_id}" completed successfully.'
+            f'Workflow execution of workflow "{wf.workflow_id}" with run ID "{workflow_run_id}" completed successfully.'
         )
 
     def _inject_default_args(
@@ -279,7 +331,11 @@ class WorkflowExecutor:
         return payload
 
     async def _execute_action_node(
-        self, node: ActionNode, execution_state: dict, ctx_dict: dict[str, Any]
+        self,
+        node: ActionNode,
+        defined_args: tuple[str, ...] | None,
+        execution_state: dict,
+        ctx_dict: dict[str, Any],
     ) -> tuple[str, Any]:
         # evaluate the references of the action arguments
         try:
@@ -296,8 +352,7 @@ class WorkflowExecutor:
 
         action_type = node.type
 
-        action = ActionRegistry.get_or_none(action_type)
-        if not action:
+        if defined_args is None:
             # Custom Python action
             # Note: we filter the action_args in execute_python_action
             # because first need to fetch the custom action.
@@ -316,7 +371,6 @@ class WorkflowExecutor:
         # i.e., an argument might have been removed. This would cause the
         # function call to fail. Hence, we filter the arguments to only include
         # the ones that are actually defined by the action.
-        defined_args = set(map(lambda arg: arg.arg_name, action.arguments))
         action_args = {k: v for k, v in action_args.items() if k in defined_args}
 
         return await _execute_action(
@@ -328,11 +382,12 @@ class WorkflowExecutor:
     async def _execute_if_condition(
         self,
         dag_node: IfNode,
+        node_idx: int,
         execution_state: dict,
-        workflow_dag: WorkflowDAG,
-        in_deg: dict[str, int],
+        plan: WorkflowExecutionPlan,
+        in_deg: list[int],
         ctx_dict: dict[str, Any],
-    ) -> tuple[str, set[str]]:
+    ) -> tuple[str, set[int]]:
         # 1) evaluate if-condition
 
         # if we perform model_dump directly on the condition, we get a circular reference error for
@@ -361,19 +416,19 @@ class WorkflowExecutor:
         eliminated_nodes = set()
         if condition_result:
             eliminated_nodes |= path_elimination(
-                dag_node.false_children, workflow_dag, in_deg
+                plan.false_children(node_idx), plan, in_deg
             )
         else:
             eliminated_nodes |= path_elimination(
-                dag_node.true_children, workflow_dag, in_deg
+                plan.true_children(node_idx), plan, in_deg
             )
 
         return step_id, eliminated_nodes
 
 
 def path_elimination(
-    node_ids: list[str], workflow_dag: WorkflowDAG, in_deg: dict[str, int]
-) -> set[str]:
+    nodes: tuple[int, ...], plan: WorkflowExecutionPlan, in_deg: list[int]
+) -> set[int]:
     """
     Path Elimination for if-conditions.
 
@@ -396,29 +451,16 @@ def path_elimination(
     eliminated_nodes = set()
 
     # BFS traversal for elimination - don't expand nodes with in_deg > 0
-    queue = deque(node_ids)
+    queue = deque(nodes)
     while is_not_empty(queue):
-        current_node_id = queue.popleft()
-        eliminated_nodes.add(current_node_id)
+        current_node = queue.popleft()
+        eliminated_nodes.add(current_node)
 
         # reduce in_deg of children
-        node = workflow_dag.dag[current_node_id]
-        if isinstance(node, IfNode):
-            for child_id in node.true_children:
-                in_deg[child_id] -= 1
-                # remove child if it does not have a dependency anymore (i.e., in_deg == 0)
-                if in_deg[child_id] == 0:
-                    queue.append(child_id)
-            for child_id in node.false_children:
-                in_deg[child_id] -= 1
-                # remove child if it does not have a dependency anymore (i.e., in_deg == 0)
-                if in_deg[child_id] == 0:
-                    queue.append(child_id)
-        else:
-            for child_id in node.children:
-                in_deg[child_id] -= 1
-                # remove child if it does not have a dependency anymore (i.e., in_deg == 0)
-                if in_deg[child_id] == 0:
-                    queue.append(child_id)
+        for child in plan.children(current_node):
+            in_deg[child] -= 1
+            # remove child if it does not have a dependency anymore (i.e., in_deg == 0)
+            if in_deg[child] == 0:
+                queue.append(child)
 
     return eliminated_nodes
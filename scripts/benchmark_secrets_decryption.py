@@ -0,0 +1,42 @@
+"""
+Compares decrypting secrets with a new cipher object per secret against reusing
+the cipher objects of SecretsCipher.
+
+Usage: poetry run python scripts/benchmark_secrets_decryption.py [num_secrets]
+"""
+
+import os
+import sys
+import time
+from base64 import urlsafe_b64decode
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from admyral.utils.crypto import SecretsCipher
+
+
+def main(num_secrets: int) -> None:
+    key = os.urandom(32)
+    cipher = SecretsCipher(key)
+    ciphertexts = [
+        cipher.encrypt('{"api_key": "' + "x" * 64 + '"}') for _ in range(num_secrets)
+    ]
+
+    start = time.perf_counter()
+    for ciphertext in ciphertexts:
+        # baseline: a new cipher object per secret
+        iv_ciphertext = urlsafe_b64decode(ciphertext)
+        AESGCM(key).decrypt(iv_ciphertext[:12], iv_ciphertext[12:], None)
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cipher.decrypt_many(ciphertexts)
+    batched = time.perf_counter() - start
+
+    print(
+        f"decrypt {num_secrets} secrets: new cipher per secret {baseline * 1000:.2f} ms, "
+        f"reused cipher {batched * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
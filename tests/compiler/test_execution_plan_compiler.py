@@ -0,0 +1,87 @@
+from admyral.models import (
+    ActionNode,
+    ConstantConditionExpression,
+    IfNode,
+    WorkflowDAG,
+    WorkflowStart,
+)
+from admyral.compiler.execution_plan_compiler import (
+    compile_execution_plan,
+    compile_argument_filters,
+)
+from admyral.workers.workflow_executor import path_elimination
+
+
+WORKFLOW_WITH_IF_CONDITION = WorkflowDAG(
+    name="workflow_with_if_condition",
+    start=WorkflowStart(triggers=[]),
+    dag={
+        "start": ActionNode(
+            id="start",
+            type="start",
+            children=["if_condition"],
+        ),
+        "if_condition": IfNode(
+            id="if_condition",
+            type="if_condition",
+            condition_str="payload['is_valid']",
+            condition=ConstantConditionExpression(value="{{ payload['is_valid'] }}"),
+            true_children=["transform"],
+            false_children=["custom_action"],
+        ),
+        "transform": ActionNode(
+            id="transform",
+            type="transform",
+            children=["join"],
+        ),
+        "custom_action": ActionNode(
+            id="custom_action",
+            type="custom_action",
+            children=["join"],
+        ),
+        "join": ActionNode(
+            id="join",
+            type="transform",
+        ),
+    },
+)
+
+
+def test_compile_execution_plan():
+    plan = compile_execution_plan(WORKFLOW_WITH_IF_CONDITION)
+
+    assert plan.node_ids == (
+        "start",
+        "if_condition",
+        "transform",
+        "custom_action",
+        "join",
+    )
+    assert plan.children(0) == (1,)
+    assert plan.true_children(1) == (2,)
+    assert plan.false_children(1) == (3,)
+    assert plan.children(1) == (2, 3)
+    assert plan.children(4) == ()
+    assert plan.in_deg == (0, 1, 1, 1, 2)
+
+
+def test_compile_argument_filters():
+    plan = compile_execution_plan(WORKFLOW_WITH_IF_CONDITION)
+    defined_args = compile_argument_filters(WORKFLOW_WITH_IF_CONDITION, plan)
+
+    assert defined_args[2] == ("value",)
+    # custom Python actions and if-conditions are not registered
+    assert defined_args[1] is None
+    assert defined_args[3] is None
+
+
+def test_path_elimination_with_execution_plan():
+    plan = compile_execution_plan(WORKFLOW_WITH_IF_CONDITION)
+    in_deg = list(plan.in_deg)
+
+    eliminated_nodes = path_elimination(plan.false_children(1), plan, in_deg)
+
+    assert eliminated_nodes == {3}
+    assert in_deg[4] == 1
+    # the plan itself must not be mutated
+    assert plan.in_deg == (0, 1, 1, 1, 2)
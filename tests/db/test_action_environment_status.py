@@ -0,0 +1,59 @@
+import pytest
+from uuid import uuid4
+
+from admyral.db.admyral_store import AdmyralStore
+from admyral.models import ActionEnvironmentStatus, PythonAction
+from admyral.config.config import TEST_USER_ID
+
+
+def _build_action(action_type: str, requirements: list[str]) -> PythonAction:
+    return PythonAction(
+        action_type=action_type,
+        import_statements="",
+        code=f"def {action_type}():\n    return 1",
+        arguments=[],
+        display_name="Custom Action",
+        display_namespace="Custom Actions",
+        requirements=requirements,
+    )
+
+
+async def _get_environment_status(
+    store: AdmyralStore, action_type: str
+) -> ActionEnvironmentStatus:
+    actions = await store.list_actions(TEST_USER_ID)
+    return next(
+        action.environment_status
+        for action in actions
+        if action.action_type == action_type
+    )
+
+
+@pytest.mark.asyncio
+async def test_set_action_environment_status_ignores_outdated_requirements(
+    store: AdmyralStore,
+):
+    action_type = f"custom_action_{uuid4().hex}"
+    old_requirements = ["requests==2.32.3"]
+    await store.store_action(TEST_USER_ID, _build_action(action_type, old_requirements))
+    await store.set_action_environment_status(
+        TEST_USER_ID, action_type, old_requirements, ActionEnvironmentStatus.PREPARING
+    )
+    assert (
+        await _get_environment_status(store, action_type)
+        == ActionEnvironmentStatus.PREPARING
+    )
+
+    # pushed again with different requirements while preparing
+    await store.store_action(
+        TEST_USER_ID, _build_action(action_type, ["requests==2.32.4"])
+    )
+    await store.set_action_environment_status(
+        TEST_USER_ID, action_type, old_requirements, ActionEnvironmentStatus.READY
+    )
+    assert (
+        await _get_environment_status(store, action_type)
+        == ActionEnvironmentStatus.PENDING
+    )
+
+    await store.delete_action(TEST_USER_ID, action_type)
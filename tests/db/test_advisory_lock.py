@@ -0,0 +1,17 @@
+import pytest
+
+from admyral.db.admyral_store import AdmyralStore
+
+
+@pytest.mark.asyncio
+async def test_try_advisory_lock(store: AdmyralStore):
+    lock_id = 4_242_424_242
+
+    async with store.try_advisory_lock(lock_id) as is_acquired:
+        assert is_acquired
+        # another connection must not acquire the same lock
+        async with store.try_advisory_lock(lock_id) as is_acquired_again:
+            assert not is_acquired_again
+
+    async with store.try_advisory_lock(lock_id) as is_acquired:
+        assert is_acquired
@@ -0,0 +1,37 @@
+import pytest
+from uuid import uuid4
+
+from admyral.db.admyral_store import AdmyralStore
+
+
+@pytest.mark.asyncio
+async def test_claim_idempotency_key(store: AdmyralStore):
+    key = str(uuid4())
+
+    claim = await store.claim_idempotency_key(key, "run-1", 60)
+    assert claim.temporal_workflow_id == "run-1"
+    assert not claim.is_started
+
+    # the existing claim is kept within the window
+    claim = await store.claim_idempotency_key(key, "run-2", 60)
+    assert claim.temporal_workflow_id == "run-1"
+    assert not claim.is_started
+
+    await store.mark_idempotency_key_started(key, "run-1")
+    claim = await store.claim_idempotency_key(key, "run-3", 60)
+    assert claim.temporal_workflow_id == "run-1"
+    assert claim.is_started
+
+
+@pytest.mark.asyncio
+async def test_expired_idempotency_key_is_claimed_again(store: AdmyralStore):
+    key = str(uuid4())
+
+    await store.claim_idempotency_key(key, "run-1", 0)
+    await store.mark_idempotency_key_started(key, "run-1")
+
+    claim = await store.claim_idempotency_key(key, "run-2", 0)
+    assert claim.temporal_workflow_id == "run-2"
+    assert not claim.is_started
+
+    assert await store.delete_expired_idempotency_keys() >= 1
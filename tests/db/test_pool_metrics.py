@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from admyral.db.pool_metrics import PoolMetricsCollector
+
+
+def test_pool_metrics_collector():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=3)
+    collector = PoolMetricsCollector()
+
+    collector.record_checkout(2_000_000)
+    collector.record_checkout(6_000_000)
+
+    with engine.connect():
+        metrics = collector.snapshot(engine.pool)
+
+    assert metrics.pool_size == 3
+    assert metrics.checked_out == 1
+    assert metrics.checkouts == 2
+    assert metrics.total_checkout_wait_ms == 8.0
+    assert metrics.max_checkout_wait_ms == 6.0
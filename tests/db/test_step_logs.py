@@ -0,0 +1,56 @@
+import pytest
+from uuid import uuid4
+
+from admyral.db.admyral_store import AdmyralStore
+from admyral.models import Workflow, WorkflowDAG, WorkflowStart, ActionNode
+from admyral.config.config import TEST_USER_ID
+
+
+@pytest.mark.asyncio
+async def test_append_logs_preserves_chunk_order(store: AdmyralStore):
+    workflow_id = str(uuid4())
+    workflow = Workflow(
+        workflow_id=workflow_id,
+        workflow_name=f"test_append_logs_{workflow_id}",
+        workflow_dag=WorkflowDAG(
+            name=f"test_append_logs_{workflow_id}",
+            start=WorkflowStart(triggers=[]),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=True,
+    )
+    await store.store_workflow(TEST_USER_ID, workflow)
+
+    run_id = str(uuid4())
+    start_step_id = str(uuid4())
+    await store.init_workflow_run(run_id, start_step_id, workflow_id, "test", {})
+
+    step_id = str(uuid4())
+    for idx in range(5):
+        await store.append_logs(
+            step_id,
+            run_id,
+            "transform",
+            start_step_id,
+            [f"line {idx}a", f"line {idx}b"],
+        )
+
+    expected_logs = "\n".join(f"line {idx}a\nline {idx}b" for idx in range(5))
+    step = await store.get_workflow_run_step(TEST_USER_ID, workflow_id, run_id, step_id)
+    assert step.logs == expected_logs
+
+    streamed_logs = "".join(
+        [
+            log_chunk
+            async for log_chunk in store.stream_workflow_run_step_logs(
+                TEST_USER_ID, workflow_id, run_id, step_id
+            )
+        ]
+    )
+    assert streamed_logs == expected_logs
+
+    with pytest.raises(ValueError, match="not found"):
+        async for _ in store.stream_workflow_run_step_logs(
+            TEST_USER_ID, workflow_id, run_id, str(uuid4())
+        ):
+            pass
@@ -0,0 +1,43 @@
+import pytest
+from datetime import timedelta
+from uuid import uuid4
+
+from admyral.db.admyral_store import AdmyralStore
+from admyral.models import Workflow, WorkflowDAG, WorkflowStart, ActionNode
+from admyral.config.config import TEST_USER_ID
+from admyral.utils.time import utc_now
+
+
+def _build_workflow(workflow_id: str, description: str) -> Workflow:
+    return Workflow(
+        workflow_id=workflow_id,
+        workflow_name=f"test_workflow_versions_{workflow_id}",
+        workflow_dag=WorkflowDAG(
+            name=f"test_workflow_versions_{workflow_id}",
+            description=description,
+            start=WorkflowStart(triggers=[]),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_previous_workflow_versions_are_retained(store: AdmyralStore):
+    workflow_id = str(uuid4())
+    await store.store_workflow(TEST_USER_ID, _build_workflow(workflow_id, "v1"))
+    v1 = (await store.get_workflow_by_id(TEST_USER_ID, workflow_id)).version_hash
+    await store.store_workflow(TEST_USER_ID, _build_workflow(workflow_id, "v2"))
+    v2 = (await store.get_workflow_by_id(TEST_USER_ID, workflow_id)).version_hash
+    assert v1 != v2
+
+    workflow = await store.get_workflow_version(TEST_USER_ID, workflow_id, v1)
+    assert workflow.workflow_dag.description == "v1"
+    assert await store.get_workflow_version("other_user", workflow_id, v1) is None
+
+    # the current version is never deleted
+    await store.delete_workflow_versions(utc_now() + timedelta(days=1))
+    assert await store.get_workflow_version(TEST_USER_ID, workflow_id, v1) is None
+    assert await store.get_workflow_version(TEST_USER_ID, workflow_id, v2)
+
+    await store.remove_workflow(TEST_USER_ID, workflow_id)
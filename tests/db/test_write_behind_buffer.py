@@ -0,0 +1,66 @@
+import asyncio
+
+from admyral.db.write_behind_buffer import WorkflowRunStepWriteBuffer
+from admyral.models import WorkflowRunStepUpdate
+
+
+class RecordingStore:
+    def __init__(self) -> None:
+        self.batches: list[list[WorkflowRunStepUpdate]] = []
+
+    async def store_workflow_run_steps(
+        self, step_updates: list[WorkflowRunStepUpdate]
+    ) -> None:
+        await asyncio.sleep(0.01)
+        self.batches.append(step_updates)
+
+
+async def _store_result(buffer: WorkflowRunStepWriteBuffer, idx: int) -> None:
+    await buffer.store_action_result(
+        f"step_{idx}", "run", "transform", None, {"idx": idx}, {}
+    )
+
+
+async def test_write_behind_buffer_flushes_on_batch_size():
+    store = RecordingStore()
+    buffer = WorkflowRunStepWriteBuffer(
+        store, max_batch_size=5, flush_interval_ms=10_000
+    )
+
+    await asyncio.gather(*[_store_result(buffer, idx) for idx in range(10)])
+
+    assert [len(batch) for batch in store.batches] == [5, 5]
+
+
+async def test_write_behind_buffer_flushes_on_interval():
+    store = RecordingStore()
+    buffer = WorkflowRunStepWriteBuffer(store, max_batch_size=100, flush_interval_ms=5)
+
+    await asyncio.gather(
+        *[_store_result(buffer, idx) for idx in range(3)],
+        buffer.store_workflow_run_error(
+            "step_error", "run", "transform", None, "error", {}
+        ),
+    )
+
+    assert len(store.batches) == 1
+    assert [step_update.error for step_update in store.batches[0]] == [
+        None,
+        None,
+        None,
+        "error",
+    ]
+
+
+async def test_write_behind_buffer_close_flushes_pending():
+    store = RecordingStore()
+    buffer = WorkflowRunStepWriteBuffer(
+        store, max_batch_size=100, flush_interval_ms=10_000
+    )
+
+    task = asyncio.create_task(_store_result(buffer, 0))
+    await asyncio.sleep(0)
+    await buffer.close()
+    await task
+
+    assert len(store.batches) == 1
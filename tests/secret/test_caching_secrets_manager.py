@@ -0,0 +1,118 @@
+import asyncio
+
+from admyral.models import Secret, SecretMetadata
+from admyral.utils.time import utc_now
+from admyral.secret.secrets_manager import SecretsManager, CachingSecretsManager
+from admyral.secret.secrets_access import SecretsStoreAccessImpl
+
+
+class CountingSecretsManager(SecretsManager):
+    def __init__(self) -> None:
+        self.secrets: dict[tuple[str, str], dict[str, str]] = {}
+        self.num_gets = 0
+        self.num_batch_gets = 0
+
+    async def get(self, user_id: str, secret_id: str) -> Secret | None:
+        self.num_gets += 1
+        secret = self.secrets.get((user_id, secret_id))
+        return Secret(secret_id=secret_id, secret=secret) if secret else None
+
+    async def get_many(self, user_id: str, secret_ids: list[str]) -> dict[str, Secret]:
+        self.num_batch_gets += 1
+        return {
+            secret_id: Secret(secret_id=secret_id, secret=secret)
+            for secret_id in secret_ids
+            if (secret := self.secrets.get((user_id, secret_id)))
+        }
+
+    async def update(self, user_id: str, delta_secret: Secret) -> SecretMetadata:
+        return await self.set(user_id, delta_secret)
+
+    async def set(self, user_id: str, secret: Secret) -> SecretMetadata:
+        self.secrets[(user_id, secret.secret_id)] = secret.secret
+        return SecretMetadata(
+            secret_id=secret.secret_id,
+            secret_schema=list(secret.secret.keys()),
+            email="test@admyral.ai",
+            created_at=utc_now(),
+            updated_at=utc_now(),
+            secret_type=secret.secret_type,
+        )
+
+    async def delete(self, user_id: str, secret_id: str) -> None:
+        self.secrets.pop((user_id, secret_id), None)
+
+    async def list(self, user_id: str) -> list[SecretMetadata]:
+        return []
+
+
+async def test_caching_secrets_manager_caches_per_user():
+    inner = CountingSecretsManager()
+    secrets_manager = CachingSecretsManager(inner, ttl=60)
+    await inner.set("user1", Secret(secret_id="api", secret={"key": "a"}))
+    await inner.set("user2", Secret(secret_id="api", secret={"key": "b"}))
+
+    assert (await secrets_manager.get("user1", "api")).secret == {"key": "a"}
+    assert (await secrets_manager.get("user1", "api")).secret == {"key": "a"}
+    assert (await secrets_manager.get("user2", "api")).secret == {"key": "b"}
+    assert inner.num_gets == 2
+
+    # callers cannot modify the cached secret
+    secret = await secrets_manager.get("user1", "api")
+    secret.secret["key"] = "modified"
+    assert (await secrets_manager.get("user1", "api")).secret == {"key": "a"}
+
+
+async def test_caching_secrets_manager_invalidates_on_write():
+    inner = CountingSecretsManager()
+    secrets_manager = CachingSecretsManager(inner, ttl=60)
+    await secrets_manager.set("user", Secret(secret_id="api", secret={"key": "a"}))
+    assert (await secrets_manager.get("user", "api")).secret == {"key": "a"}
+
+    await secrets_manager.update("user", Secret(secret_id="api", secret={"key": "b"}))
+    assert (await secrets_manager.get("user", "api")).secret == {"key": "b"}
+
+    await secrets_manager.delete("user", "api")
+    assert await secrets_manager.get("user", "api") is None
+    assert inner.num_gets == 3
+
+
+async def test_caching_secrets_manager_expires_entries():
+    inner = CountingSecretsManager()
+    secrets_manager = CachingSecretsManager(inner, ttl=0.01)
+    await inner.set("user", Secret(secret_id="api", secret={"key": "a"}))
+
+    await secrets_manager.get("user", "api")
+    await asyncio.sleep(0.02)
+    await secrets_manager.get("user", "api")
+    assert inner.num_gets == 2
+
+
+async def test_caching_secrets_manager_batch_fetch():
+    inner = CountingSecretsManager()
+    secrets_manager = CachingSecretsManager(inner, ttl=60)
+    await inner.set("user", Secret(secret_id="a", secret={"key": "a"}))
+    await inner.set("user", Secret(secret_id="b", secret={"key": "b"}))
+    await inner.set("user", Secret(secret_id="c", secret={"key": "c"}))
+
+    await secrets_manager.get("user", "a")
+    secrets = await secrets_manager.get_many("user", ["a", "b", "c", "missing"])
+    assert set(secrets.keys()) == {"a", "b", "c"}
+    assert inner.num_batch_gets == 1
+
+    await secrets_manager.get_many("user", ["a", "b", "c"])
+    assert inner.num_batch_gets == 1
+
+
+async def test_secrets_access_loads_placeholders_in_one_batch():
+    inner = CountingSecretsManager()
+    await inner.set("user", Secret(secret_id="slack", secret={"token": "s"}))
+    await inner.set("user", Secret(secret_id="jira", secret={"token": "j"}))
+    secrets_access = SecretsStoreAccessImpl(
+        "user", {"SLACK": "slack", "JIRA": "jira"}, inner
+    )
+
+    secrets = await secrets_access.aget_many(["SLACK", "JIRA"])
+    assert secrets == {"SLACK": {"token": "s"}, "JIRA": {"token": "j"}}
+    assert inner.num_batch_gets == 1
+    assert inner.num_gets == 0
@@ -0,0 +1,85 @@
+import time
+
+from admyral.models import AuthenticatedUser
+from admyral.server.auth_cache import AuthCache
+
+
+def test_auth_cache_hit_and_miss():
+    cache = AuthCache(ttl=60, max_size=10)
+    user = AuthenticatedUser(user_id="user", email="user@admyral.ai")
+
+    assert cache.get("api_key:secret") is None
+    cache.put("api_key:secret", user, cache.generation)
+    assert cache.get("api_key:secret") == user
+    assert cache.get("api_key:other") is None
+
+    metrics = cache.get_metrics()
+    assert metrics.hits == 1
+    assert metrics.misses == 2
+    assert metrics.size == 1
+
+
+def test_auth_cache_never_stores_plaintext_credentials():
+    cache = AuthCache(ttl=60, max_size=10)
+    cache.put(
+        "api_key:secret", AuthenticatedUser(user_id="user", email="e"), cache.generation
+    )
+    assert all("secret" not in key for key in cache._entries)
+
+
+def test_auth_cache_invalidate_user():
+    cache = AuthCache(ttl=60, max_size=10)
+    cache.put(
+        "api_key:a", AuthenticatedUser(user_id="user1", email="e1"), cache.generation
+    )
+    cache.put("jwt:b", AuthenticatedUser(user_id="user1", email="e1"), cache.generation)
+    cache.put(
+        "api_key:c", AuthenticatedUser(user_id="user2", email="e2"), cache.generation
+    )
+
+    cache.invalidate_user("user1")
+    assert cache.get("api_key:a") is None
+    assert cache.get("jwt:b") is None
+    assert cache.get("api_key:c") is not None
+    assert cache.get_metrics().invalidations == 1
+
+
+def test_auth_cache_expiration_and_bound():
+    cache = AuthCache(ttl=60, max_size=2)
+    user = AuthenticatedUser(user_id="user", email="e")
+
+    # entries never outlive the credential
+    cache.put("jwt:expiring", user, cache.generation, expires_in=0.01)
+    time.sleep(0.02)
+    assert cache.get("jwt:expiring") is None
+
+    cache.put("api_key:a", user, cache.generation)
+    cache.put("api_key:b", user, cache.generation)
+    cache.put("api_key:c", user, cache.generation)
+    assert cache.get("api_key:a") is None
+    assert cache.get_metrics().size == 2
+
+
+def test_auth_cache_disabled():
+    cache = AuthCache(ttl=0, max_size=10)
+    cache.put(
+        "api_key:a", AuthenticatedUser(user_id="user", email="e"), cache.generation
+    )
+    assert cache.get("api_key:a") is None
+
+
+def test_auth_cache_skips_put_after_concurrent_invalidation():
+    cache = AuthCache(ttl=60, max_size=10)
+    user = AuthenticatedUser(user_id="user1", email="e1")
+
+    # the API key is deleted while its lookup is in flight
+    generation = cache.generation
+    cache.invalidate_user("user1")
+    cache.put("api_key:revoked", user, generation)
+    assert cache.get("api_key:revoked") is None
+
+    # invalidations of other users do not affect the put
+    generation = cache.generation
+    cache.invalidate_user("user2")
+    cache.put("api_key:a", user, generation)
+    assert cache.get("api_key:a") == user
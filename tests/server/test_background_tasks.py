@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+from admyral.server import background_tasks
+from admyral.server.auth_cache import get_auth_cache
+
+
+async def test_background_tasks_log_auth_cache_metrics(monkeypatch):
+    logged_sources = {}
+
+    async def log_metrics_periodically(sources, metrics_interval):
+        logged_sources.update(sources)
+
+    async def cleanup(cleanup_interval):
+        pass
+
+    monkeypatch.setattr(
+        background_tasks, "log_metrics_periodically", log_metrics_periodically
+    )
+    for cleanup_task in [
+        "cleanup_pip_lockfile_cache",
+        "cleanup_workflow_versions",
+        "cleanup_idempotency_keys",
+    ]:
+        monkeypatch.setattr(background_tasks, cleanup_task, cleanup)
+    monkeypatch.setattr(
+        background_tasks,
+        "get_admyral_store",
+        lambda: SimpleNamespace(get_pool_metrics=lambda: None),
+    )
+    monkeypatch.setattr(background_tasks.CONFIG, "webhook_fast_ack", False)
+    monkeypatch.setattr(background_tasks.CONFIG, "run_retention_days", None)
+
+    background_tasks.start_background_tasks()
+    await asyncio.sleep(0)
+
+    assert logged_sources["Auth cache"] == get_auth_cache().get_metrics
+    assert "Database pool" in logged_sources
@@ -0,0 +1,176 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from admyral.models import (
+    Workflow,
+    WorkflowDAG,
+    WorkflowStart,
+    ActionNode,
+    WorkflowWebhookTrigger,
+)
+from admyral.config.config import CONFIG
+from admyral.server.endpoints import webhook_endpoints
+from admyral.server.webhook_routing_table import WebhookRoutingTable
+from admyral.utils.json import json_dumps
+
+
+class RecordingWorkersClient:
+    def __init__(self) -> None:
+        self.started_payloads = []
+        self.idempotency_keys = set()
+
+    async def start_workflow(
+        self,
+        user_id,
+        workflow,
+        source_name,
+        payload={},
+        trigger_default_args={},
+        idempotency_key=None,
+    ) -> bool:
+        if payload.get("fail"):
+            raise RuntimeError("Failed to start workflow.")
+        if idempotency_key is not None:
+            if idempotency_key in self.idempotency_keys:
+                return False
+            self.idempotency_keys.add(idempotency_key)
+        self.started_payloads.append(payload)
+        return True
+
+
+@pytest.fixture
+def workers_client(monkeypatch):
+    workflow = Workflow(
+        workflow_id="bulk_workflow",
+        workflow_name="bulk_workflow",
+        workflow_dag=WorkflowDAG(
+            name="bulk_workflow",
+            start=WorkflowStart(
+                triggers=[WorkflowWebhookTrigger(idempotency_key="alert.id")]
+            ),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=True,
+    )
+
+    async def fetch_route(cls, webhook_id: str):
+        return "secret", "user", workflow
+
+    workers_client = RecordingWorkersClient()
+    monkeypatch.setattr(WebhookRoutingTable, "_fetch_route", classmethod(fetch_route))
+    monkeypatch.setattr(webhook_endpoints, "get_workers_client", lambda: workers_client)
+    WebhookRoutingTable.invalidate()
+    yield workers_client
+    WebhookRoutingTable.invalidate()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(webhook_endpoints.router, prefix="/webhooks")
+    return TestClient(app)
+
+
+def test_bulk_webhook_json_array(client, workers_client):
+    response = client.post(
+        "/webhooks/bulk/webhook/secret",
+        content=json_dumps([{"alert": 1}, {"alert": 2}, "invalid", {"fail": True}]),
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "FAILED"
+    assert [result["status"] for result in body["results"]] == [
+        "SUCCESS",
+        "SUCCESS",
+        "FAILED",
+        "FAILED",
+    ]
+    assert body["results"][2]["error"] == "Payload must be a JSON object."
+    assert sorted(p["alert"] for p in workers_client.started_payloads) == [1, 2]
+
+
+def test_bulk_webhook_ndjson(client, workers_client):
+    response = client.post(
+        "/webhooks/bulk/webhook",
+        content='{"alert": 1}\n\n{"alert": 2}\n',
+        headers={"Content-Type": "application/x-ndjson", "Authorization": "secret"},
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "SUCCESS"
+    assert len(workers_client.started_payloads) == 2
+
+
+def test_bulk_webhook_too_many_events(client, workers_client, monkeypatch):
+    monkeypatch.setattr(CONFIG, "webhook_bulk_max_events", 2)
+    response = client.post(
+        "/webhooks/bulk/webhook/secret",
+        content=json_dumps([{"alert": 1}, {"alert": 2}, {"alert": 3}]),
+    )
+    assert response.status_code == 413
+    assert workers_client.started_payloads == []
+
+
+@pytest.mark.parametrize(
+    "content,content_type",
+    [
+        ('[{"alert": 1}', "application/json"),
+        ('{"alert": 1}\n{"alert": ', "application/x-ndjson"),
+    ],
+)
+def test_bulk_webhook_malformed_body(client, workers_client, content, content_type):
+    response = client.post(
+        "/webhooks/bulk/webhook/secret",
+        content=content,
+        headers={"Content-Type": content_type},
+    )
+    assert response.status_code == 400
+    assert workers_client.started_payloads == []
+
+
+def test_bulk_webhook_invalid_secret(client, workers_client):
+    with pytest.raises(ValueError, match="Invalid webhook secret."):
+        client.post("/webhooks/bulk/webhook/wrong", content=json_dumps([{"a": 1}]))
+    assert workers_client.started_payloads == []
+
+
+def test_webhook_idempotency_key_header(client, workers_client):
+    headers = {"Idempotency-Key": "delivery-1"}
+    response = client.post(
+        "/webhooks/webhook/secret", content=json_dumps({"a": 1}), headers=headers
+    )
+    assert response.json()["status"] == "SUCCESS"
+    response = client.post(
+        "/webhooks/webhook/secret", content=json_dumps({"a": 1}), headers=headers
+    )
+    assert response.json()["status"] == "DUPLICATE"
+    assert workers_client.idempotency_keys == {"delivery-1"}
+
+
+def test_bulk_webhook_idempotency_key_path(client, workers_client):
+    response = client.post(
+        "/webhooks/bulk/webhook/secret",
+        content=json_dumps(
+            [{"alert": {"id": 1}}, {"alert": {"id": 1}}, {"alert": {"id": "x"}}]
+        ),
+    )
+    body = response.json()
+    assert body["status"] == "SUCCESS"
+    # the events are started concurrently, hence, either of the first two events
+    # might be the duplicate
+    assert sorted(result["status"] for result in body["results"]) == [
+        "DUPLICATE",
+        "SUCCESS",
+        "SUCCESS",
+    ]
+    assert workers_client.idempotency_keys == {"1", "x"}
+
+
+def test_bulk_webhook_idempotency_key_header(client, workers_client):
+    response = client.post(
+        "/webhooks/bulk/webhook/secret",
+        content=json_dumps([{"a": 1}, {"a": 2}]),
+        headers={"Idempotency-Key": "batch"},
+    )
+    assert response.json()["status"] == "SUCCESS"
+    assert workers_client.idempotency_keys == {"batch:0", "batch:1"}
@@ -0,0 +1,21 @@
+from admyral.server.idempotency import (
+    extract_idempotency_key_from_payload,
+    get_idempotency_key,
+)
+
+
+def test_extract_idempotency_key_from_payload():
+    payload = {"alert": {"id": "abc", "num": 42, "tags": ["x", {"id": 7}]}}
+    assert extract_idempotency_key_from_payload(payload, "alert.id") == "abc"
+    assert extract_idempotency_key_from_payload(payload, "alert.num") == "42"
+    assert extract_idempotency_key_from_payload(payload, "alert.tags.1.id") == "7"
+    assert extract_idempotency_key_from_payload(payload, "alert.tags.5") is None
+    assert extract_idempotency_key_from_payload(payload, "alert.missing") is None
+    assert extract_idempotency_key_from_payload(payload, "alert.id.nested") is None
+
+
+def test_get_idempotency_key_header_takes_precedence():
+    payload = {"id": "from-payload"}
+    assert get_idempotency_key("from-header", payload, "id") == "from-header"
+    assert get_idempotency_key(None, payload, "id") == "from-payload"
+    assert get_idempotency_key(None, payload, None) is None
@@ -0,0 +1,110 @@
+import gzip
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from admyral.config.config import GlobalConfig
+from admyral.models import WorkflowRunArchive
+from admyral.server.run_retention import (
+    RUN_RETENTION_LOCK_ID,
+    enforce_run_retention,
+)
+from admyral.utils.time import utc_now
+
+
+class InMemoryRunStore:
+    def __init__(self, runs: dict[str, tuple[str, datetime]]) -> None:
+        # run_id -> (workflow_id, created_at)
+        self.runs = runs
+        self.deleted_batches = []
+        self.held_locks = set()
+
+    @asynccontextmanager
+    async def try_advisory_lock(self, lock_id: int):
+        if lock_id in self.held_locks:
+            yield False
+            return
+        self.held_locks.add(lock_id)
+        try:
+            yield True
+        finally:
+            self.held_locks.remove(lock_id)
+
+    async def list_all_workflow_ids(self) -> list[str]:
+        return sorted({workflow_id for workflow_id, _ in self.runs.values()})
+
+    async def list_workflow_run_ids_created_before(
+        self, workflow_id: str, created_before: datetime, limit: int
+    ) -> list[str]:
+        return sorted(
+            run_id
+            for run_id, (run_workflow_id, created_at) in self.runs.items()
+            if run_workflow_id == workflow_id and created_at < created_before
+        )[:limit]
+
+    async def get_workflow_runs_for_archive(
+        self, run_ids: list[str]
+    ) -> list[WorkflowRunArchive]:
+        return [
+            WorkflowRunArchive(
+                run_id=run_id,
+                workflow_id=self.runs[run_id][0],
+                source_name="webhook",
+                created_at=self.runs[run_id][1],
+            )
+            for run_id in run_ids
+        ]
+
+    async def delete_workflow_runs(self, run_ids: list[str]) -> None:
+        self.deleted_batches.append(run_ids)
+        for run_id in run_ids:
+            del self.runs[run_id]
+
+
+async def test_enforce_run_retention(tmp_path):
+    old = utc_now() - timedelta(days=40)
+    new = utc_now() - timedelta(days=1)
+    store = InMemoryRunStore(
+        {
+            "run_1": ("workflow_a", old),
+            "run_2": ("workflow_a", old),
+            "run_3": ("workflow_a", old),
+            "run_4": ("workflow_a", new),
+            "run_5": ("workflow_b", old),
+            "run_6": ("workflow_c", new),
+        }
+    )
+    config = GlobalConfig(
+        id="test",
+        run_retention_days=30,
+        run_retention_days_by_workflow={"workflow_b": None, "workflow_c": 0},
+        run_retention_batch_size=2,
+        run_archive_directory=str(tmp_path),
+    )
+
+    num_deleted_runs = await enforce_run_retention(store, config)
+
+    assert num_deleted_runs == 4
+    assert store.deleted_batches == [["run_1", "run_2"], ["run_3"], ["run_6"]]
+    # workflow_b keeps its runs forever
+    assert set(store.runs.keys()) == {"run_4", "run_5"}
+
+    archived_run_ids = set()
+    for archive_file in os.listdir(tmp_path):
+        with gzip.open(os.path.join(tmp_path, archive_file), "rt") as f:
+            archived_run_ids |= {json.loads(line)["run_id"] for line in f}
+    assert archived_run_ids == {"run_1", "run_2", "run_3", "run_6"}
+
+
+async def test_enforce_run_retention_skips_while_another_replica_holds_the_lock():
+    store = InMemoryRunStore({"run_1": ("workflow_a", utc_now() - timedelta(days=40))})
+    config = GlobalConfig(id="test", run_retention_days=30)
+
+    async with store.try_advisory_lock(RUN_RETENTION_LOCK_ID):
+        assert await enforce_run_retention(store, config) == 0
+    assert store.deleted_batches == []
+
+    # the lock is released after the other replica's pass
+    assert await enforce_run_retention(store, config) == 1
+    assert store.held_locks == set()
@@ -0,0 +1,319 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+
+from admyral.config.config import GlobalConfig
+from admyral.models import (
+    Workflow,
+    WorkflowDAG,
+    WorkflowStart,
+    ActionNode,
+    WebhookEvent,
+    WebhookIngestionQueueStats,
+)
+from admyral.server.webhook_ingestion import WebhookIngestionDispatcher
+from admyral.server.webhook_routing_table import WebhookRoutingTable
+
+
+class InMemoryQueueStore:
+    def __init__(self) -> None:
+        self.events: dict[int, WebhookEvent] = {}
+        self.claimed: set[int] = set()
+        self.errors: dict[int, str] = {}
+        self.failed_at: dict[int, datetime] = {}
+        self.fail_webhook_event_error: Exception | None = None
+
+    async def enqueue_webhook_events(
+        self, webhook_id: str, payloads: list, idempotency_keys: list | None = None
+    ) -> None:
+        for payload, idempotency_key in zip(
+            payloads, idempotency_keys or [None] * len(payloads)
+        ):
+            event_id = len(self.events) + len(self.errors) + 1
+            self.events[event_id] = WebhookEvent(
+                event_id=event_id,
+                webhook_id=webhook_id,
+                payload=payload,
+                idempotency_key=idempotency_key,
+            )
+
+    async def claim_webhook_events(
+        self, limit: int, lease_seconds: int, max_attempts: int
+    ) -> list[WebhookEvent]:
+        events = [
+            event
+            for event in self.events.values()
+            if event.event_id not in self.claimed and event.attempts < max_attempts
+        ][:limit]
+        self.claimed.update(event.event_id for event in events)
+        return events
+
+    async def complete_webhook_events(self, event_ids: list[int]) -> None:
+        for event_id in event_ids:
+            del self.events[event_id]
+
+    async def fail_webhook_event(
+        self, event_id: int, error: str, retry_in_seconds: int
+    ) -> None:
+        if self.fail_webhook_event_error is not None:
+            raise self.fail_webhook_event_error
+        self.events[event_id].attempts += 1
+        self.errors[event_id] = error
+        self.failed_at[event_id] = datetime.now()
+        # the event is due again immediately in this test store
+        self.claimed.discard(event_id)
+
+    async def delete_failed_webhook_events(
+        self, max_attempts: int, failed_before: datetime
+    ) -> int:
+        event_ids = [
+            event.event_id
+            for event in self.events.values()
+            if event.attempts >= max_attempts
+            and self.failed_at[event.event_id] < failed_before.replace(tzinfo=None)
+        ]
+        for event_id in event_ids:
+            del self.events[event_id]
+        return len(event_ids)
+
+    async def get_webhook_ingestion_queue_stats(
+        self, max_attempts: int
+    ) -> WebhookIngestionQueueStats:
+        return WebhookIngestionQueueStats(
+            pending_events=sum(
+                event.attempts < max_attempts for event in self.events.values()
+            ),
+            failed_events=sum(
+                event.attempts >= max_attempts for event in self.events.values()
+            ),
+        )
+
+
+class FlakyWorkersClient:
+    def __init__(self, num_failures: int = 0, delay: float = 0) -> None:
+        self.num_failures = num_failures
+        self.delay = delay
+        self.rpc_timeouts = []
+        self.started_payloads = []
+        self.idempotency_keys = set()
+
+    async def start_workflow(
+        self,
+        user_id,
+        workflow,
+        source_name,
+        payload={},
+        trigger_default_args={},
+        idempotency_key=None,
+        rpc_timeout=None,
+    ) -> bool:
+        self.rpc_timeouts.append(rpc_timeout)
+        await asyncio.sleep(self.delay)
+        if self.num_failures > 0:
+            self.num_failures -= 1
+            raise RuntimeError("Temporal unavailable")
+        if idempotency_key in self.idempotency_keys:
+            return False
+        self.idempotency_keys.add(idempotency_key)
+        self.started_payloads.append(payload)
+        return True
+
+
+def _build_workflow(is_active: bool) -> Workflow:
+    return Workflow(
+        workflow_id="fast_ack_workflow",
+        workflow_name="fast_ack_workflow",
+        workflow_dag=WorkflowDAG(
+            name="fast_ack_workflow",
+            start=WorkflowStart(triggers=[]),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=is_active,
+    )
+
+
+@pytest.fixture
+def routes(monkeypatch):
+    routes = {"webhook": _build_workflow(is_active=True)}
+
+    async def fetch_route(cls, webhook_id: str):
+        if webhook_id not in routes:
+            raise ValueError(f"Webhook with id {webhook_id} not found.")
+        return "secret", "user", routes[webhook_id]
+
+    monkeypatch.setattr(WebhookRoutingTable, "_fetch_route", classmethod(fetch_route))
+    WebhookRoutingTable.invalidate()
+    yield routes
+    WebhookRoutingTable.invalidate()
+
+
+async def test_dispatch_batch(routes):
+    store = InMemoryQueueStore()
+    workers_client = FlakyWorkersClient()
+    dispatcher = WebhookIngestionDispatcher(
+        store, workers_client, GlobalConfig(id="test", webhook_dispatch_batch_size=2)
+    )
+
+    await dispatcher.enqueue("webhook", [{"alert": i} for i in range(3)])
+    assert await dispatcher.dispatch_batch() == 2
+    assert await dispatcher.dispatch_batch() == 1
+    assert await dispatcher.dispatch_batch() == 0
+
+    assert workers_client.started_payloads == [{"alert": i} for i in range(3)]
+    assert store.events == {}
+
+    metrics = await dispatcher.get_metrics()
+    assert metrics.enqueued_events == 3
+    assert metrics.dispatched_events == 3
+    assert metrics.pending_events == 0
+
+
+async def test_dispatch_retries_and_gives_up(routes):
+    store = InMemoryQueueStore()
+    workers_client = FlakyWorkersClient(num_failures=3)
+    dispatcher = WebhookIngestionDispatcher(
+        store, workers_client, GlobalConfig(id="test", webhook_dispatch_max_attempts=2)
+    )
+
+    await dispatcher.enqueue("webhook", [{"alert": 1}])
+    await dispatcher.dispatch_batch()
+    await dispatcher.dispatch_batch()
+    # max attempts reached
+    assert await dispatcher.dispatch_batch() == 0
+
+    metrics = await dispatcher.get_metrics()
+    assert metrics.retried_events == 2
+    assert metrics.failed_events == 1
+    assert workers_client.started_payloads == []
+
+
+async def test_dispatch_drops_events_of_deleted_or_inactive_workflows(routes):
+    store = InMemoryQueueStore()
+    workers_client = FlakyWorkersClient()
+    dispatcher = WebhookIngestionDispatcher(
+        store, workers_client, GlobalConfig(id="test")
+    )
+    routes["inactive"] = _build_workflow(is_active=False)
+
+    await dispatcher.enqueue("deleted", [{"alert": 1}])
+    await dispatcher.enqueue("inactive", [{"alert": 2}])
+    await dispatcher.dispatch_batch()
+
+    assert store.events == {}
+    assert workers_client.started_payloads == []
+    assert (await dispatcher.get_metrics()).dropped_events == 2
+
+
+async def test_dispatch_deduplicates_events(routes):
+    store = InMemoryQueueStore()
+    workers_client = FlakyWorkersClient()
+    dispatcher = WebhookIngestionDispatcher(
+        store, workers_client, GlobalConfig(id="test")
+    )
+
+    await dispatcher.enqueue(
+        "webhook", [{"alert": 1}, {"alert": 1}, {"alert": 2}], ["a", "a", None]
+    )
+    await dispatcher.dispatch_batch()
+
+    assert workers_client.started_payloads == [{"alert": 1}, {"alert": 2}]
+    # events without a key are deduplicated by their event id
+    assert "webhook-event:3" in workers_client.idempotency_keys
+    assert store.events == {}
+
+    metrics = await dispatcher.get_metrics()
+    assert metrics.dispatched_events == 2
+    assert metrics.duplicate_events == 1
+
+
+async def test_dispatch_completes_started_events_if_recording_a_failure_fails(routes):
+    store = InMemoryQueueStore()
+    store.fail_webhook_event_error = RuntimeError("database unavailable")
+    workers_client = FlakyWorkersClient(num_failures=1)
+    dispatcher = WebhookIngestionDispatcher(
+        store,
+        workers_client,
+        GlobalConfig(
+            id="test", webhook_dispatch_batch_size=2, webhook_dispatch_concurrency=1
+        ),
+    )
+
+    await dispatcher.enqueue("webhook", [{"alert": 1}, {"alert": 2}])
+    assert await dispatcher.dispatch_batch() == 2
+
+    # the failed event stays claimed until its lease expires
+    assert workers_client.started_payloads == [{"alert": 2}]
+    assert list(store.events) == [1]
+    assert (await dispatcher.get_metrics()).retried_events == 1
+
+
+async def test_dispatch_retries_events_if_the_route_lookup_fails(routes, monkeypatch):
+    store = InMemoryQueueStore()
+    dispatcher = WebhookIngestionDispatcher(
+        store, FlakyWorkersClient(), GlobalConfig(id="test")
+    )
+
+    async def fetch_route(cls, webhook_id: str):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(WebhookRoutingTable, "_fetch_route", classmethod(fetch_route))
+
+    await dispatcher.enqueue("webhook", [{"alert": 1}])
+    await dispatcher.dispatch_batch()
+
+    assert store.events[1].attempts == 1
+    assert "database unavailable" in store.errors[1]
+    assert (await dispatcher.get_metrics()).dropped_events == 0
+
+
+async def test_dispatch_start_timeout(routes):
+    store = InMemoryQueueStore()
+    workers_client = FlakyWorkersClient(delay=2)
+    dispatcher = WebhookIngestionDispatcher(
+        store,
+        workers_client,
+        GlobalConfig(id="test", webhook_dispatch_start_timeout_seconds=1),
+    )
+
+    await dispatcher.enqueue("webhook", [{"alert": 1}])
+    await dispatcher.dispatch_batch()
+
+    assert workers_client.rpc_timeouts == [timedelta(seconds=1)]
+    assert store.events[1].attempts == 1
+    assert "timed out" in store.errors[1]
+
+
+def test_dispatch_start_timeout_must_be_shorter_than_the_lease():
+    with pytest.raises(ValueError):
+        WebhookIngestionDispatcher(
+            InMemoryQueueStore(),
+            FlakyWorkersClient(),
+            GlobalConfig(
+                id="test",
+                webhook_dispatch_batch_size=100,
+                webhook_dispatch_concurrency=10,
+                webhook_dispatch_lease_seconds=60,
+                webhook_dispatch_start_timeout_seconds=6,
+            ),
+        )
+
+
+async def test_delete_failed_events(routes):
+    store = InMemoryQueueStore()
+    dispatcher = WebhookIngestionDispatcher(
+        store,
+        FlakyWorkersClient(num_failures=2),
+        GlobalConfig(
+            id="test",
+            webhook_dispatch_max_attempts=1,
+            webhook_failed_event_retention_days=0,
+        ),
+    )
+
+    await dispatcher.enqueue("webhook", [{"alert": 1}, {"alert": 2}])
+    await dispatcher.dispatch_batch()
+    await dispatcher.enqueue("webhook", [{"alert": 3}])
+
+    assert await dispatcher.delete_failed_events() == 2
+    # pending events are kept
+    assert [event.payload for event in store.events.values()] == [{"alert": 3}]
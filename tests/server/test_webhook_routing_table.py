@@ -0,0 +1,124 @@
+import asyncio
+
+from admyral.models import (
+    Workflow,
+    WorkflowDAG,
+    WorkflowStart,
+    WorkflowWebhookTrigger,
+    ActionNode,
+)
+from admyral.server.webhook_routing_table import WebhookRoutingTable
+
+
+class CountingStore:
+    def __init__(self, workflow: Workflow) -> None:
+        self.workflow = workflow
+        self.num_loads = 0
+
+    async def fetch_route(self, webhook_id: str) -> tuple[str, str, Workflow]:
+        self.num_loads += 1
+        await asyncio.sleep(0.01)
+        return "webhook_secret", "user", self.workflow
+
+
+def _build_workflow(is_active: bool) -> Workflow:
+    return Workflow(
+        workflow_id="webhook_workflow",
+        workflow_name="webhook_workflow",
+        workflow_dag=WorkflowDAG(
+            name="webhook_workflow",
+            start=WorkflowStart(
+                triggers=[
+                    WorkflowWebhookTrigger(
+                        default_args=[{"name": "severity", "value": "high"}]
+                    )
+                ]
+            ),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=is_active,
+    )
+
+
+async def test_webhook_routing_table(monkeypatch):
+    store = CountingStore(_build_workflow(is_active=True))
+    monkeypatch.setattr(
+        WebhookRoutingTable,
+        "_fetch_route",
+        classmethod(lambda cls, webhook_id: store.fetch_route(webhook_id)),
+    )
+    monkeypatch.setattr(WebhookRoutingTable, "ttl", 60)
+    WebhookRoutingTable.invalidate()
+
+    try:
+        # concurrent misses share a single store lookup
+        routes = await asyncio.gather(
+            *[WebhookRoutingTable.get("webhook") for _ in range(10)]
+        )
+        assert store.num_loads == 1
+        route = routes[0]
+        assert route.user_id == "user"
+        assert route.is_active
+        assert route.default_args == {"severity": "high"}
+        assert route.verify_secret("webhook_secret")
+        assert not route.verify_secret("wrong_secret")
+        assert not route.verify_secret(None)
+
+        # cache hit
+        await WebhookRoutingTable.get("webhook")
+        assert store.num_loads == 1
+
+        # deactivating the workflow invalidates the routes
+        store.workflow = _build_workflow(is_active=False)
+        WebhookRoutingTable.invalidate()
+        route = await WebhookRoutingTable.get("webhook")
+        assert store.num_loads == 2
+        assert not route.is_active
+    finally:
+        WebhookRoutingTable.invalidate()
+
+
+async def test_webhook_routing_table_expires_routes(monkeypatch):
+    store = CountingStore(_build_workflow(is_active=True))
+    monkeypatch.setattr(
+        WebhookRoutingTable,
+        "_fetch_route",
+        classmethod(lambda cls, webhook_id: store.fetch_route(webhook_id)),
+    )
+    monkeypatch.setattr(WebhookRoutingTable, "ttl", 0.01)
+    WebhookRoutingTable.invalidate()
+
+    try:
+        await WebhookRoutingTable.get("webhook")
+        await asyncio.sleep(0.02)
+        await WebhookRoutingTable.get("webhook")
+        assert store.num_loads == 2
+    finally:
+        WebhookRoutingTable.invalidate()
+
+
+async def test_webhook_routing_table_leader_cancellation(monkeypatch):
+    store = CountingStore(_build_workflow(is_active=True))
+    monkeypatch.setattr(
+        WebhookRoutingTable,
+        "_fetch_route",
+        classmethod(lambda cls, webhook_id: store.fetch_route(webhook_id)),
+    )
+    WebhookRoutingTable.invalidate()
+
+    try:
+        # e.g., the client of the first request disconnected
+        leader = asyncio.create_task(WebhookRoutingTable.get("webhook"))
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.create_task(WebhookRoutingTable.get("webhook")) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        routes = await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+        assert leader.cancelled()
+        assert all(route.user_id == "user" for route in routes)
+        assert store.num_loads == 2
+    finally:
+        WebhookRoutingTable.invalidate()
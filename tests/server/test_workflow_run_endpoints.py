@@ -0,0 +1,72 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from admyral.models import AuthenticatedUser
+from admyral.server.auth import authenticate
+from admyral.server.endpoints import workflow_run_endpoints
+
+
+class LogStore:
+    def __init__(self, logs: dict[str, list[str]]) -> None:
+        self.logs = logs
+        self.num_open_streams = 0
+
+    async def stream_workflow_run_step_logs(
+        self, user_id: str, workflow_id: str, run_id: str, step_id: str
+    ):
+        if step_id not in self.logs:
+            raise ValueError(f"Workflow run step {step_id} not found.")
+        self.num_open_streams += 1
+        try:
+            for idx, log_chunk in enumerate(self.logs[step_id]):
+                yield log_chunk if idx == 0 else "\n" + log_chunk
+        finally:
+            self.num_open_streams -= 1
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    store = LogStore({"step": ["first", "second"], "empty_step": []})
+    monkeypatch.setattr(workflow_run_endpoints, "get_admyral_store", lambda: store)
+
+    app = FastAPI()
+    app.include_router(workflow_run_endpoints.router, prefix="/runs")
+    app.dependency_overrides[authenticate] = lambda: AuthenticatedUser(
+        user_id="user", email="user@admyral.dev"
+    )
+    return TestClient(app)
+
+
+def test_stream_step_logs(client):
+    response = client.get("/runs/workflow/run/step/logs")
+    assert response.status_code == 200
+    assert response.text == "first\nsecond"
+
+    response = client.get("/runs/workflow/run/empty_step/logs")
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_stream_step_logs_of_missing_step(client):
+    response = client.get("/runs/workflow/run/missing_step/logs")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Step not found"
+
+
+async def test_stream_step_logs_closes_store_stream_on_disconnect(monkeypatch):
+    store = LogStore({"step": ["first", "second", "third"]})
+    monkeypatch.setattr(workflow_run_endpoints, "get_admyral_store", lambda: store)
+
+    response = await workflow_run_endpoints.stream_workflow_run_step_logs(
+        "workflow",
+        "run",
+        "step",
+        AuthenticatedUser(user_id="user", email="user@admyral.dev"),
+    )
+    assert await anext(response.body_iterator) == "first"
+    assert store.num_open_streams == 1
+
+    # the client disconnects after the first chunk
+    await response.body_iterator.aclose()
+    assert store.num_open_streams == 0
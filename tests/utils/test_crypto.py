@@ -1,4 +1,12 @@
-from admyral.utils.crypto import encrypt_aes256_gcm, decrypt_aes256_gcm, _generate_hs256
+import os
+import pytest
+
+from admyral.utils.crypto import (
+    encrypt_aes256_gcm,
+    decrypt_aes256_gcm,
+    _generate_hs256,
+    SecretsCipher,
+)
 
 
 TEST_SECRET = bytes.fromhex(
@@ -20,3 +28,27 @@ def test_hs256():
         TEST_SECRET, "this is my securely hashed message - hello world!"
     )
     assert h is not None
+
+
+def test_secrets_cipher_batch_decrypt():
+    cipher = SecretsCipher(TEST_SECRET)
+    messages = [f"secret {i}" for i in range(10)]
+    ciphertexts = [cipher.encrypt(msg) for msg in messages]
+    assert cipher.decrypt_many(ciphertexts) == messages
+    # compatible with the format of encrypt_aes256_gcm
+    assert decrypt_aes256_gcm(TEST_SECRET, ciphertexts[0]) == messages[0]
+    assert cipher.decrypt(encrypt_aes256_gcm(TEST_SECRET, "hello")) == "hello"
+
+
+def test_secrets_cipher_key_rotation():
+    new_key = os.urandom(32)
+    old_ciphertext = SecretsCipher(TEST_SECRET).encrypt("rotated secret")
+
+    cipher = SecretsCipher(new_key, [TEST_SECRET])
+    assert cipher.decrypt(old_ciphertext) == "rotated secret"
+
+    new_ciphertext = cipher.encrypt(cipher.decrypt(old_ciphertext))
+    assert SecretsCipher(new_key).decrypt(new_ciphertext) == "rotated secret"
+
+    with pytest.raises(ValueError):
+        SecretsCipher(new_key).decrypt(old_ciphertext)
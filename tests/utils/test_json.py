@@ -0,0 +1,90 @@
+import dataclasses
+import pytest
+from temporalio.converter import JSONPlainPayloadConverter
+
+from admyral.utils import json as json_codec
+from admyral.utils.json import json_dumps, json_dumps_bytes, json_loads
+from admyral.models import Workflow, WorkflowDAG, WorkflowStart, ActionNode
+
+
+PAYLOADS = [
+    None,
+    "abc",
+    {"a": [1, 2.5, None, True, False, "x"], "b": {"c": {}}, "d": []},
+    {"unicode": "äöü 🚀", "escapes": 'quote " backslash \\ \n\t'},
+    {"b": 1, "a": 2},
+]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_fast_and_fallback_codec_produce_same_output(payload, monkeypatch):
+    fast = json_dumps_bytes(payload, sort_keys=True)
+    monkeypatch.setattr(json_codec, "orjson", None)
+    fallback = json_dumps_bytes(payload, sort_keys=True)
+
+    assert fast == fallback
+    assert json_loads(fast) == payload
+    assert json_dumps(payload) == json_dumps_bytes(payload).decode("utf-8")
+
+
+def test_codec_falls_back_for_unsupported_values():
+    value = {"big": 2**70}
+    assert json_loads(json_dumps_bytes(value)) == value
+
+
+@pytest.mark.parametrize(
+    "value", [2**64 - 1, 2**64, 2**70 + 1, -(2**63), -(2**63) - 1, 10**30 + 7]
+)
+def test_json_loads_preserves_big_integers(value):
+    # orjson parses integers exceeding 64 bit as (lossy) floats
+    for data in (json_dumps_bytes({"a": [value]}), json_dumps({"a": [value]})):
+        loaded = json_loads(data)["a"][0]
+        assert type(loaded) is int
+        assert loaded == value
+
+
+def test_json_loads_raises_value_error():
+    with pytest.raises(ValueError):
+        json_loads("{invalid")
+
+
+@dataclasses.dataclass
+class _Params:
+    workflow: Workflow
+    payload: dict
+    tags: set
+
+
+def _build_params() -> _Params:
+    return _Params(
+        workflow=Workflow(
+            workflow_id="workflow",
+            workflow_name="workflow",
+            workflow_dag=WorkflowDAG(
+                name="workflow",
+                start=WorkflowStart(triggers=[]),
+                dag={"start": ActionNode(id="start", type="start")},
+            ),
+            is_active=True,
+        ),
+        payload={"alert": "äöü"},
+        tags={"a"},
+    )
+
+
+def test_models_and_dataclasses_are_serialized_in_one_pass(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected fallback")
+
+    monkeypatch.setattr(json_codec, "_stdlib_dumps", fail)
+    data = json_dumps_bytes(_build_params(), sort_keys=True)
+
+    # same format as Temporal's default JSON encoder
+    expected = JSONPlainPayloadConverter().to_payload(_build_params()).data
+    assert json_loads(data) == json_loads(expected)
+
+
+def test_fallback_serializes_models_and_dataclasses(monkeypatch):
+    fast = json_dumps_bytes(_build_params(), sort_keys=True)
+    monkeypatch.setattr(json_codec, "orjson", None)
+    assert json_dumps_bytes(_build_params(), sort_keys=True) == fast
@@ -0,0 +1,25 @@
+import pytest
+
+from admyral.utils.memory import count_json_payload_bytes
+from admyral.utils.json import json_dumps_bytes
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {},
+        [],
+        None,
+        True,
+        "",
+        -12345678901234567890,
+        1.5e-7,
+        {"a": [1, 2.5, None, True, False, "x"], "b": {"c": {}}, "d": []},
+        {"unicode": "äöü 🚀  ", "escapes": 'quote " backslash \\ \n\t'},
+        {1: "int key", 2.5: "float key", True: "bool key", None: "null key"},
+        [("tuple", 1), [[[]]]],
+        {"large": ["x" * 1000] * 100},
+    ],
+)
+def test_count_json_payload_bytes(payload):
+    assert count_json_payload_bytes(payload) == len(json_dumps_bytes(payload))
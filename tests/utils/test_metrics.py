@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from pydantic import BaseModel
+
+from admyral.utils import metrics
+
+
+class CounterMetrics(BaseModel):
+    count: int
+
+
+class RecordingLogger:
+    def __init__(self) -> None:
+        self.messages = []
+
+    def info(self, message: str) -> None:
+        self.messages.append(message)
+
+    def error(self, message: str) -> None:
+        self.messages.append(message)
+
+
+async def test_log_metrics_periodically(monkeypatch):
+    logger = RecordingLogger()
+    monkeypatch.setattr(metrics, "logger", logger)
+
+    async def get_async_metrics() -> CounterMetrics:
+        return CounterMetrics(count=2)
+
+    def get_failing_metrics() -> CounterMetrics:
+        raise RuntimeError("unavailable")
+
+    task = asyncio.create_task(
+        metrics.log_metrics_periodically(
+            {
+                "Sync": lambda: CounterMetrics(count=1),
+                "Failing": get_failing_metrics,
+                "Async": get_async_metrics,
+            },
+            metrics_interval=0,
+        )
+    )
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert logger.messages[:3] == [
+        "Sync metrics: {'count': 1}",
+        "Failed to collect Failing metrics: unavailable",
+        # a failing source does not prevent the other sources from being logged
+        "Async metrics: {'count': 2}",
+    ]
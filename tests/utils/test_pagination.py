@@ -0,0 +1,18 @@
+import pytest
+from datetime import datetime, timezone
+
+from admyral.utils.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2024, 8, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+    cursor = encode_cursor(created_at, "run_id")
+
+    assert decode_cursor(cursor) == (created_at, "run_id")
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(ValueError) as e:
+        decode_cursor("not a cursor")
+    assert e.value.args[0] == "Invalid cursor."
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+
+from admyral.utils.single_flight import SingleFlight
+
+
+async def test_single_flight_shares_result():
+    single_flight = SingleFlight[str, int]()
+    num_loads = 0
+
+    async def load() -> int:
+        nonlocal num_loads
+        num_loads += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*[single_flight.do("key", load) for _ in range(10)])
+    assert results == [42] * 10
+    assert num_loads == 1
+    assert len(single_flight) == 0
+
+
+async def test_single_flight_shares_exception():
+    single_flight = SingleFlight[str, int]()
+
+    async def load() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("load failed")
+
+    results = await asyncio.gather(
+        *[single_flight.do("key", load) for _ in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(single_flight) == 0
+
+
+async def test_single_flight_follower_takes_over_when_leader_is_cancelled():
+    single_flight = SingleFlight[str, int]()
+    num_loads = 0
+
+    async def load() -> int:
+        nonlocal num_loads
+        num_loads += 1
+        await asyncio.sleep(0.05)
+        return num_loads
+
+    leader = asyncio.create_task(single_flight.do("key", load))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(single_flight.do("key", load)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    results = await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert results == [2, 2, 2]
+    assert num_loads == 2
+    assert len(single_flight) == 0
+
+
+async def test_single_flight_cancelled_follower_does_not_cancel_leader():
+    single_flight = SingleFlight[str, int]()
+
+    async def load() -> int:
+        await asyncio.sleep(0.02)
+        return 42
+
+    leader = asyncio.create_task(single_flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(single_flight.do("key", load))
+    await asyncio.sleep(0.01)
+    follower.cancel()
+
+    assert await leader == 42
+    assert follower.cancelled()
@@ -0,0 +1,76 @@
+import os
+import time
+
+from admyral.blob_store.blob_store import FileSystemBlobStore
+from admyral.workers.blob_garbage_collector import collect_unreferenced_blobs
+
+
+class BlobReferenceStore:
+    def __init__(self, referenced_blob_ids: set[str]) -> None:
+        self.referenced_blob_ids = referenced_blob_ids
+
+    async def filter_referenced_blobs(self, blob_ids: list[str]) -> set[str]:
+        return self.referenced_blob_ids & set(blob_ids)
+
+
+def _age_blob(blob_store: FileSystemBlobStore, blob_id: str, seconds: int) -> None:
+    path = blob_store._get_path(blob_id)
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+async def test_collect_unreferenced_blobs(tmp_path):
+    blob_store = FileSystemBlobStore(str(tmp_path))
+    referenced_blob_id = blob_store.put(b"referenced")
+    purged_blob_id = blob_store.put(b"purged")
+    fresh_blob_id = blob_store.put(b"fresh")
+    _age_blob(blob_store, referenced_blob_id, 7200)
+    _age_blob(blob_store, purged_blob_id, 7200)
+
+    store = BlobReferenceStore({referenced_blob_id})
+    num_deleted_blobs = await collect_unreferenced_blobs(
+        store, blob_store, grace_period_seconds=3600
+    )
+
+    assert num_deleted_blobs == 1
+    assert blob_store.get(referenced_blob_id) == b"referenced"
+    # blobs within the grace period are kept although they are not referenced yet
+    assert blob_store.get(fresh_blob_id) == b"fresh"
+    assert blob_store.list_blobs(time.time()) != []
+    assert purged_blob_id not in blob_store.list_blobs(time.time())
+
+    # deleting a missing blob is a no-op
+    blob_store.delete(purged_blob_id)
+
+
+async def test_stored_again_blob_is_not_collected(tmp_path):
+    blob_store = FileSystemBlobStore(str(tmp_path))
+    blob_id = blob_store.put(b"deduplicated")
+    _age_blob(blob_store, blob_id, 7200)
+
+    # the blob is stored again by an action whose reference is not stored yet
+    assert blob_store.put(b"deduplicated") == blob_id
+
+    num_deleted_blobs = await collect_unreferenced_blobs(
+        BlobReferenceStore(set()), blob_store, grace_period_seconds=3600
+    )
+    assert num_deleted_blobs == 0
+    assert blob_store.get(blob_id) == b"deduplicated"
+
+
+async def test_blob_stored_again_while_collecting_is_not_deleted(tmp_path):
+    blob_store = FileSystemBlobStore(str(tmp_path))
+    blob_id = blob_store.put(b"deduplicated")
+    _age_blob(blob_store, blob_id, 7200)
+
+    class StoringAgainStore(BlobReferenceStore):
+        async def filter_referenced_blobs(self, blob_ids: list[str]) -> set[str]:
+            # stored again after the blob was listed for deletion
+            blob_store.put(b"deduplicated")
+            return set()
+
+    num_deleted_blobs = await collect_unreferenced_blobs(
+        StoringAgainStore(set()), blob_store, grace_period_seconds=3600
+    )
+    assert num_deleted_blobs == 0
+    assert blob_store.get(blob_id) == b"deduplicated"
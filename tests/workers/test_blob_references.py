@@ -0,0 +1,62 @@
+import json
+import pytest
+
+from admyral.blob_store.blob_store import FileSystemBlobStore
+from admyral.workers.blob_references import offload_result, resolve_blob_references
+from admyral.workers.references import evaluate_references
+from admyral.exceptions import AdmyralFailureError
+
+
+def test_file_system_blob_store(tmp_path):
+    blob_store = FileSystemBlobStore(str(tmp_path))
+
+    blob_id = blob_store.put(b"large result")
+    assert blob_store.put(b"large result") == blob_id
+    assert blob_store.get(blob_id) == b"large result"
+
+    with pytest.raises(ValueError):
+        blob_store.get("../../etc/passwd")
+
+
+#########################################################################################################
+
+
+def test_references_into_offloaded_result(tmp_path):
+    blob_store = FileSystemBlobStore(str(tmp_path))
+    result = {"items": [{"name": "a"}, {"name": "b"}], "count": 2}
+    execution_state = {
+        "result": offload_result(blob_store, json.dumps(result).encode())
+    }
+
+    args = evaluate_references(
+        {
+            "whole": "{{ result }}",
+            "name": "{{ result['items'][1]['name'] }}",
+            "text": "count: {{ result['count'] }}",
+        },
+        execution_state,
+    )
+    # the workflow only passes references around
+    assert args["whole"] == execution_state["result"] | {"access_path": "result"}
+    assert args["name"]["path"] == ["items", 1, "name"]
+
+    assert resolve_blob_references(blob_store, args) == {
+        "whole": result,
+        "name": "b",
+        "text": "count: 2",
+    }
+
+
+#########################################################################################################
+
+
+def test_invalid_reference_into_offloaded_result(tmp_path):
+    blob_store = FileSystemBlobStore(str(tmp_path))
+    execution_state = {
+        "result": offload_result(blob_store, json.dumps({"a": 1}).encode())
+    }
+
+    args = evaluate_references("{{ result['b'] }}", execution_state)
+    with pytest.raises(AdmyralFailureError) as e:
+        resolve_blob_references(blob_store, args)
+    assert e.value.message == "Invalid access path: result['b']. Key 'b' not found."
@@ -0,0 +1,33 @@
+import os
+import zipfile
+
+from admyral.workers.nsjail.install_requirements_batch import (
+    _find_wheel,
+    _unpack_wheel,
+)
+
+
+def test_find_and_unpack_wheel(tmp_path):
+    wheelhouse = tmp_path / "wheels"
+    wheelhouse.mkdir()
+    wheel_path = wheelhouse / "Typing_Extensions-4.12.2-py3-none-any.whl"
+    with zipfile.ZipFile(wheel_path, "w") as wheel:
+        wheel.writestr("typing_extensions.py", "# module")
+        wheel.writestr("typing_extensions-4.12.2.dist-info/METADATA", "Name: x")
+        wheel.writestr("typing_extensions-4.12.2.data/platlib/_native.py", "# native")
+        wheel.writestr("typing_extensions-4.12.2.data/scripts/tool", "#!/bin/sh")
+
+    assert _find_wheel(str(wheelhouse), "typing-extensions==4.12.2") == str(wheel_path)
+    assert _find_wheel(str(wheelhouse), "typing-extensions==4.12.1") is None
+
+    target = tmp_path / "pip" / "typing-extensions==4.12.2"
+    target.parent.mkdir()
+    _unpack_wheel(str(wheel_path), str(target))
+
+    assert sorted(os.listdir(target)) == [
+        "_native.py",
+        "typing_extensions-4.12.2.dist-info",
+        "typing_extensions.py",
+    ]
+    # no temporary directories are left behind
+    assert os.listdir(target.parent) == ["typing-extensions==4.12.2"]
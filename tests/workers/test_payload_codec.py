@@ -0,0 +1,45 @@
+from temporalio.api.common.v1 import Payload
+
+from admyral.config.config import TemporalPayloadCompression
+from admyral.workers.payload_codec import CompressionPayloadCodec, GZIP_ENCODING
+
+
+def _json_payload(data: bytes) -> Payload:
+    return Payload(metadata={"encoding": b"json/plain"}, data=data)
+
+
+async def test_compression_payload_codec():
+    codec = CompressionPayloadCodec(
+        TemporalPayloadCompression.GZIP, threshold_bytes=100
+    )
+    large = _json_payload(b'{"alert":"suspicious login"},' * 100)
+    small = _json_payload(b'{"a":1}')
+
+    encoded = await codec.encode([large, small])
+
+    assert encoded[0].metadata["encoding"] == GZIP_ENCODING
+    assert len(encoded[0].data) < len(large.data)
+    # payloads below the threshold are not compressed
+    assert encoded[1] == small
+
+    assert await codec.decode(encoded) == [large, small]
+
+    metrics = codec.get_metrics()
+    assert metrics.payloads_encoded == 2
+    assert metrics.payloads_compressed == 1
+    assert metrics.compression_ratio > 10
+
+
+async def test_disabled_compression_still_decodes():
+    large = _json_payload(b'{"alert":"suspicious login"},' * 100)
+    encoded = await CompressionPayloadCodec(
+        TemporalPayloadCompression.GZIP, threshold_bytes=100
+    ).encode([large])
+
+    # e.g., a worker whose compression was disabled while workflows were running
+    codec = CompressionPayloadCodec(
+        TemporalPayloadCompression.DISABLED, threshold_bytes=100
+    )
+    assert await codec.encode([large]) == [large]
+    assert await codec.decode(encoded) == [large]
+    assert codec.get_metrics().payloads_compressed == 0
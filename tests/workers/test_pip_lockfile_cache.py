@@ -0,0 +1,124 @@
+import asyncio
+
+from admyral.models import PipLockfile
+from admyral.utils.time import utc_now_timestamp_seconds
+from admyral.workers.pip_lockfile_cache import PipLockfileCache
+
+
+class CountingStore:
+    def __init__(self, pip_lockfile: PipLockfile | None = None) -> None:
+        self.pip_lockfile = pip_lockfile
+        self.num_loads = 0
+
+    async def get_cached_pip_lockfile(self, hash: str) -> PipLockfile | None:
+        self.num_loads += 1
+        await asyncio.sleep(0.01)
+        return self.pip_lockfile
+
+
+def _build_lockfile(hash_id: str, ttl: int = 3600) -> PipLockfile:
+    return PipLockfile(
+        hash=hash_id,
+        lockfile="requests==2.32.3\nurllib3==2.2.2",
+        expiration_time=utc_now_timestamp_seconds() + ttl,
+    )
+
+
+async def test_pip_lockfile_cache_single_flight():
+    PipLockfileCache.invalidate()
+    store = CountingStore()
+    num_compiles = 0
+
+    async def compile_lockfile() -> PipLockfile:
+        nonlocal num_compiles
+        num_compiles += 1
+        await asyncio.sleep(0.01)
+        return _build_lockfile("single_flight")
+
+    results = await asyncio.gather(
+        *[
+            PipLockfileCache.get("single_flight", store, compile_lockfile)
+            for _ in range(50)
+        ]
+    )
+    assert num_compiles == 1
+    assert store.num_loads == 1
+    assert all(result.lockfile == results[0].lockfile for result in results)
+
+    # served from memory without a store round trip
+    await PipLockfileCache.get("single_flight", store, compile_lockfile)
+    assert store.num_loads == 1
+    assert num_compiles == 1
+
+
+async def test_pip_lockfile_cache_uses_store_and_respects_expiration():
+    PipLockfileCache.invalidate()
+    store = CountingStore(_build_lockfile("expiring", ttl=-1))
+    num_compiles = 0
+
+    async def compile_lockfile() -> PipLockfile:
+        nonlocal num_compiles
+        num_compiles += 1
+        return _build_lockfile("expiring", ttl=-1)
+
+    # expired in the store
+    await PipLockfileCache.get("expiring", store, compile_lockfile)
+    assert num_compiles == 1
+
+    # expired in memory
+    store.pip_lockfile = _build_lockfile("expiring")
+    await PipLockfileCache.get("expiring", store, compile_lockfile)
+    assert store.num_loads == 2
+    assert num_compiles == 1
+
+    await PipLockfileCache.get("expiring", store, compile_lockfile)
+    assert store.num_loads == 2
+
+
+async def test_pip_lockfile_cache_propagates_errors():
+    PipLockfileCache.invalidate()
+    store = CountingStore()
+
+    async def compile_lockfile() -> PipLockfile:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("pip-compile failed")
+
+    results = await asyncio.gather(
+        *[PipLockfileCache.get("failing", store, compile_lockfile) for _ in range(3)],
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    # failures are not cached
+    store.pip_lockfile = _build_lockfile("failing")
+    result = await PipLockfileCache.get("failing", store, compile_lockfile)
+    assert result.hash == "failing"
+
+
+async def test_pip_lockfile_cache_leader_cancellation():
+    PipLockfileCache.invalidate()
+    store = CountingStore()
+    num_compiles = 0
+
+    async def compile_lockfile() -> PipLockfile:
+        nonlocal num_compiles
+        num_compiles += 1
+        await asyncio.sleep(0.05)
+        return _build_lockfile("cancelled")
+
+    leader = asyncio.create_task(
+        PipLockfileCache.get("cancelled", store, compile_lockfile)
+    )
+    await asyncio.sleep(0)
+    followers = [
+        asyncio.create_task(PipLockfileCache.get("cancelled", store, compile_lockfile))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.02)
+    leader.cancel()
+
+    # the followers neither hang nor inherit the cancellation
+    results = await asyncio.wait_for(asyncio.gather(*followers), timeout=1)
+    assert leader.cancelled()
+    assert all(result.hash == "cancelled" for result in results)
+    assert num_compiles == 2
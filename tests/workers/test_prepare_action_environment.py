@@ -0,0 +1,134 @@
+import os
+import pytest
+
+from admyral.models import ActionEnvironmentStatus, PipLockfile, PythonAction
+from admyral.workers import python_executor
+from admyral.workers.python_executor import prepare_python_action_environment
+from admyral.workers.shared_worker_state import SharedWorkerState
+
+
+class InMemoryActionStore:
+    def __init__(self) -> None:
+        self.actions: dict[tuple[str, str], PythonAction] = {}
+        self.statuses: dict[tuple[str, str], list[ActionEnvironmentStatus]] = {}
+        self.requirements_files: list[list[str]] = []
+
+    async def store_action(self, user_id: str, action: PythonAction) -> None:
+        key = (user_id, action.action_type)
+        # like the database, the store does not share objects with its callers
+        self.actions[key] = action.model_copy(deep=True)
+        self.statuses.setdefault(key, []).append(ActionEnvironmentStatus.PENDING)
+
+    async def get_action(self, user_id: str, action_type: str) -> PythonAction | None:
+        action = self.actions.get((user_id, action_type))
+        return action.model_copy(deep=True) if action else None
+
+    async def set_action_environment_status(
+        self,
+        user_id: str,
+        action_type: str,
+        requirements: list[str] | None,
+        environment_status: ActionEnvironmentStatus,
+    ) -> None:
+        key = (user_id, action_type)
+        # same guard as the store: ignore updates for outdated requirements
+        if key in self.actions and self.actions[key].requirements == requirements:
+            self.statuses[key].append(environment_status)
+
+    def get_status(self, user_id: str, action_type: str) -> ActionEnvironmentStatus:
+        return self.statuses[(user_id, action_type)][-1]
+
+
+def _build_action(requirements: list[str]) -> PythonAction:
+    return PythonAction(
+        action_type="custom_action",
+        import_statements="",
+        code="def custom_action():\n    return 1",
+        arguments=[],
+        display_name="Custom Action",
+        display_namespace="Custom Actions",
+        requirements=requirements,
+    )
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InMemoryActionStore()
+    monkeypatch.setattr(SharedWorkerState, "get_store", classmethod(lambda cls: store))
+    monkeypatch.setattr(python_executor, "ADMYRAL_DISABLE_NSJAIL", False)
+    monkeypatch.setattr(python_executor, "ADMYRAL_USE_LOCAL_ADMYRAL_PIP_PACKAGE", False)
+
+    async def pip_compile(job_dir, python_action, store, append_logs=None):
+        with open(os.path.join(job_dir, "requirements.in")) as f:
+            store.requirements_files.append(f.read().split("\n"))
+        return PipLockfile(hash="hash", lockfile="", expiration_time=0)
+
+    monkeypatch.setattr(python_executor, "_pip_compile", pip_compile)
+    return store
+
+
+def _mock_pip_install(monkeypatch, pip_install):
+    monkeypatch.setattr(python_executor, "_pip_install_requirements", pip_install)
+
+
+async def test_prepare_environment_succeeds(store, monkeypatch):
+    await store.store_action("user", _build_action(["requests==2.32.3"]))
+
+    async def pip_install(action_type, lockfile, job_dir, append_logs=None):
+        assert (
+            store.get_status("user", action_type) == ActionEnvironmentStatus.PREPARING
+        )
+        return []
+
+    _mock_pip_install(monkeypatch, pip_install)
+
+    await prepare_python_action_environment("user", "custom_action")
+
+    assert store.statuses[("user", "custom_action")] == [
+        ActionEnvironmentStatus.PENDING,
+        ActionEnvironmentStatus.PREPARING,
+        ActionEnvironmentStatus.READY,
+    ]
+    # the requirements file contains admyral while the action keeps its requirements
+    assert "admyral" in store.requirements_files[0]
+    assert store.actions[("user", "custom_action")].requirements == ["requests==2.32.3"]
+
+
+async def test_prepare_environment_fails(store, monkeypatch):
+    await store.store_action("user", _build_action(["does-not-exist==0.0.0"]))
+
+    async def pip_install(action_type, lockfile, job_dir, append_logs=None):
+        raise RuntimeError("pip install failed")
+
+    _mock_pip_install(monkeypatch, pip_install)
+
+    with pytest.raises(RuntimeError):
+        await prepare_python_action_environment("user", "custom_action")
+
+    assert store.statuses[("user", "custom_action")] == [
+        ActionEnvironmentStatus.PENDING,
+        ActionEnvironmentStatus.PREPARING,
+        ActionEnvironmentStatus.FAILED,
+    ]
+
+
+async def test_prepare_environment_ignores_outdated_requirements(store, monkeypatch):
+    await store.store_action("user", _build_action(["requests==2.32.3"]))
+
+    async def pip_install(action_type, lockfile, job_dir, append_logs=None):
+        # the action is pushed again with different requirements while its
+        # environment is being prepared
+        await store.store_action("user", _build_action(["requests==2.32.4"]))
+        return []
+
+    _mock_pip_install(monkeypatch, pip_install)
+
+    await prepare_python_action_environment("user", "custom_action")
+
+    # the preparation of the outdated requirements does not mark the action ready
+    assert store.get_status("user", "custom_action") == ActionEnvironmentStatus.PENDING
+
+
+async def test_prepare_environment_of_missing_action(store):
+    await prepare_python_action_environment("user", "custom_action")
+    assert store.statuses == {}
@@ -0,0 +1,85 @@
+import os
+import sys
+
+from admyral.workers.python_sandbox_pool import (
+    PythonSandboxPool,
+    POOL_EXECUTOR_PATH,
+)
+
+
+ADMYRAL_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+ACTION_CODE = """
+import os
+
+def my_action(value: int) -> dict:
+    print("computing", value)
+    if value < 0:
+        raise ValueError("negative value")
+    return {"value": value * 2, "pid": os.getpid(), "secret": os.environ.get("MY_SECRET")}
+"""
+
+
+async def _build_cmd(token: str, work_dir: str) -> list[str]:
+    return [
+        "env",
+        f"PYTHONPATH={ADMYRAL_ROOT}",
+        sys.executable,
+        "-u",
+        POOL_EXECUTOR_PATH,
+        token,
+        work_dir,
+    ]
+
+
+def _job(value: int, secrets: dict[str, str] | None = None) -> dict:
+    return {
+        "action_type": "my_action",
+        "code": ACTION_CODE,
+        "args": {"value": value},
+        "secrets": secrets or {},
+    }
+
+
+async def test_python_sandbox_pool_reuses_executor(monkeypatch):
+    monkeypatch.setattr(PythonSandboxPool, "pool_size", 1)
+    monkeypatch.setattr(PythonSandboxPool, "max_jobs", 3)
+
+    logs = []
+
+    async def append_logs(lines: list[str]) -> None:
+        logs.extend(lines)
+
+    try:
+        status, first = await PythonSandboxPool.run(
+            "key", _build_cmd, _job(1, {"MY_SECRET": "abc"}), append_logs
+        )
+        assert status == 0
+        assert first["value"] == 2
+        assert first["secret"] == "abc"
+        assert "computing 1\n" in logs
+
+        # the warm executor is reused and secrets of the previous job are gone
+        status, second = await PythonSandboxPool.run(
+            "key", _build_cmd, _job(2), append_logs
+        )
+        assert status == 0
+        assert second["pid"] == first["pid"]
+        assert second["secret"] is None
+
+        # failures are reported per job and do not kill the executor
+        status, _ = await PythonSandboxPool.run(
+            "key", _build_cmd, _job(-1), append_logs
+        )
+        assert status == 1
+        assert any("negative value" in line for line in logs)
+
+        # the executor is recycled after max_jobs jobs
+        status, fourth = await PythonSandboxPool.run(
+            "key", _build_cmd, _job(4), append_logs
+        )
+        assert status == 0
+        assert fourth["pid"] != first["pid"]
+    finally:
+        await PythonSandboxPool.close()
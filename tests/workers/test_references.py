@@ -1,6 +1,6 @@
 import pytest
 
-from admyral.workers.references import evaluate_references
+from admyral.workers.references import evaluate_references, compile_template
 from admyral.exceptions import AdmyralFailureError
 
 
@@ -173,3 +173,38 @@ def test_reverse_list_access():
     execution_state = {"a": [0, 1]}
     value = "{{ a[-1] }}"
     assert evaluate_references(value, execution_state) == 1
+
+
+#########################################################################################################
+
+
+def test_string_interpolation_with_literals():
+    execution_state = {"a": {"b": [1, 2]}, "c": None}
+    value = "prefix {{ a['b'][1] }} - {{ c }} - {{ a['b'] }} suffix"
+    assert (
+        evaluate_references(value, execution_state) == "prefix 2 - null - [1, 2] suffix"
+    )
+
+
+#########################################################################################################
+
+
+def test_compiled_template_is_cached():
+    compile_template.cache_clear()
+    value = "{{ a['b'][0] }} and {{ c }}"
+
+    assert evaluate_references(value, {"a": {"b": ["x"]}, "c": "y"}) == "x and y"
+    assert evaluate_references(value, {"a": {"b": ["z"]}, "c": "w"}) == "z and w"
+
+    cache_info = compile_template.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+
+#########################################################################################################
+
+
+def test_invalid_segment_of_missing_variable_resolves_to_none():
+    execution_state = {"a": "abc"}
+    value = "{{ b[True] }}"
+    assert evaluate_references(value, execution_state) is None
@@ -0,0 +1,47 @@
+import os
+
+from admyral.workers.site_packages_snapshot import (
+    get_site_packages_snapshot_path,
+    materialize_site_packages_snapshot,
+)
+
+
+def _write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_materialize_site_packages_snapshot(tmp_path):
+    pip_cache = tmp_path / "pip"
+    requests_path = str(pip_cache / "requests==2.32.3")
+    idna_path = str(pip_cache / "idna==3.7")
+    _write(os.path.join(requests_path, "requests", "__init__.py"), "requests")
+    _write(os.path.join(idna_path, "idna", "__init__.py"), "idna")
+    _write(os.path.join(idna_path, "bin", "tool"), "idna tool")
+    _write(os.path.join(requests_path, "bin", "tool"), "requests tool")
+
+    snapshot_directory = str(tmp_path / "site-packages")
+    snapshot_path = get_site_packages_snapshot_path(
+        snapshot_directory, ["requests==2.32.3", "idna==3.7"]
+    )
+    # content-addressed independent of the requirement order
+    assert snapshot_path == get_site_packages_snapshot_path(
+        snapshot_directory, ["idna==3.7", "requests==2.32.3"]
+    )
+
+    materialize_site_packages_snapshot(snapshot_path, [requests_path, idna_path])
+
+    assert sorted(os.listdir(snapshot_path)) == ["bin", "idna", "requests"]
+    # files are hardlinked from the pip cache
+    assert os.path.samefile(
+        os.path.join(snapshot_path, "requests", "__init__.py"),
+        os.path.join(requests_path, "requests", "__init__.py"),
+    )
+    # the first requirement wins on conflicts
+    with open(os.path.join(snapshot_path, "bin", "tool")) as f:
+        assert f.read() == "requests tool"
+
+    # existing snapshots are reused as is
+    assert materialize_site_packages_snapshot(snapshot_path, []) == snapshot_path
+    assert os.listdir(snapshot_directory) == [os.path.basename(snapshot_path)]
@@ -0,0 +1,147 @@
+import pytest
+from temporalio.exceptions import WorkflowAlreadyStartedError
+
+from admyral.config.config import CONFIG
+from admyral.models import (
+    Workflow,
+    WorkflowDAG,
+    WorkflowStart,
+    ActionNode,
+    IdempotencyKeyClaim,
+)
+from admyral.workers.workers_client import WorkersClient
+
+
+class FakeStore:
+    """
+    Mirrors the claim semantics of the idempotency_keys table.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        # key -> (temporal workflow id, is started, expires at)
+        self.keys: dict[str, tuple[str, bool, float]] = {}
+
+    async def claim_idempotency_key(
+        self, key: str, temporal_workflow_id: str, window_seconds: int
+    ) -> IdempotencyKeyClaim:
+        if key not in self.keys or self.keys[key][2] <= self.now:
+            self.keys[key] = (temporal_workflow_id, False, self.now + window_seconds)
+        temporal_workflow_id, is_started, _ = self.keys[key]
+        return IdempotencyKeyClaim(
+            temporal_workflow_id=temporal_workflow_id, is_started=is_started
+        )
+
+    async def mark_idempotency_key_started(
+        self, key: str, temporal_workflow_id: str
+    ) -> None:
+        claimed_workflow_id, _, expires_at = self.keys[key]
+        if claimed_workflow_id == temporal_workflow_id:
+            self.keys[key] = (temporal_workflow_id, True, expires_at)
+
+
+class FakeTemporalClient:
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.num_requests = 0
+        self.fail_next_start_after_accepting = False
+
+    async def start_workflow(self, workflow, params, id: str, **kwargs) -> None:
+        self.num_requests += 1
+        if id in self.started:
+            raise WorkflowAlreadyStartedError(id, "WorkflowExecutor")
+        self.started.append(id)
+        if self.fail_next_start_after_accepting:
+            self.fail_next_start_after_accepting = False
+            raise TimeoutError("response lost")
+
+
+def _build_workflow() -> Workflow:
+    return Workflow(
+        workflow_id="idempotent_workflow",
+        workflow_name="idempotent_workflow",
+        workflow_dag=WorkflowDAG(
+            name="idempotent_workflow",
+            start=WorkflowStart(triggers=[]),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=True,
+    )
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(CONFIG, "idempotency_window_seconds", 100)
+    return FakeStore()
+
+
+async def test_duplicates_are_rejected_without_calling_temporal(store):
+    temporal_client = FakeTemporalClient()
+    workers_client = WorkersClient(store, temporal_client)
+    workflow = _build_workflow()
+
+    store.now = 1090.0
+    assert await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+
+    store.now = 1189.0
+    assert not await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+    assert temporal_client.num_requests == 1
+
+    # other keys are not affected
+    assert await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-2"
+    )
+    assert len(temporal_client.started) == 2
+
+
+async def test_idempotency_window_expires(store):
+    temporal_client = FakeTemporalClient()
+    workers_client = WorkersClient(store, temporal_client)
+    workflow = _build_workflow()
+
+    store.now = 1090.0
+    assert await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+
+    store.now = 1190.0
+    assert await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+
+    # the window restarts with the accepted start
+    store.now = 1250.0
+    assert not await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+    assert len(temporal_client.started) == 2
+    assert temporal_client.started[0] != temporal_client.started[1]
+
+
+async def test_retry_after_failed_start_is_deduplicated_by_temporal(store):
+    temporal_client = FakeTemporalClient()
+    workers_client = WorkersClient(store, temporal_client)
+    workflow = _build_workflow()
+
+    # Temporal accepted the start but the response was lost
+    temporal_client.fail_next_start_after_accepting = True
+    with pytest.raises(TimeoutError):
+        await workers_client.start_workflow(
+            "user", workflow, "webhook", idempotency_key="alert-1"
+        )
+
+    # the retry reuses the Temporal workflow id of the claim
+    assert not await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+    assert len(temporal_client.started) == 1
+
+    # the key is marked as started. hence, Temporal is not called anymore.
+    assert not await workers_client.start_workflow(
+        "user", workflow, "webhook", idempotency_key="alert-1"
+    )
+    assert temporal_client.num_requests == 2
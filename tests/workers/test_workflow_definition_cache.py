@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+
+from admyral.models import Workflow, WorkflowDAG, WorkflowStart, ActionNode
+from admyral.utils.future_executor import capture_main_event_loop
+from admyral.workers.workflow_definition_cache import WorkflowDefinitionCache
+
+
+class VersionedStore:
+    def __init__(self, versions: list[str]) -> None:
+        self.versions = {
+            version_hash: _build_workflow(version_hash) for version_hash in versions
+        }
+        self.num_loads = 0
+
+    async def get_workflow_version(
+        self, user_id: str, workflow_id: str, version_hash: str
+    ) -> Workflow | None:
+        self.num_loads += 1
+        await asyncio.sleep(0.01)
+        return self.versions.get(version_hash)
+
+
+def _build_workflow(version_hash: str) -> Workflow:
+    return Workflow(
+        workflow_id="cached_workflow",
+        workflow_name="cached_workflow",
+        workflow_dag=WorkflowDAG(
+            name="cached_workflow",
+            start=WorkflowStart(triggers=[]),
+            dag={"start": ActionNode(id="start", type="start")},
+        ),
+        is_active=True,
+        version_hash=version_hash,
+    )
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = VersionedStore(["v1", "v2"])
+    monkeypatch.setattr(
+        WorkflowDefinitionCache,
+        "_fetch_workflow",
+        classmethod(
+            lambda cls, user_id, workflow_id, version_hash: store.get_workflow_version(
+                user_id, workflow_id, version_hash
+            )
+        ),
+    )
+    WorkflowDefinitionCache.invalidate()
+    yield store
+    WorkflowDefinitionCache.invalidate()
+
+
+async def test_workflow_definition_cache(store):
+    # concurrent misses share a single store lookup
+    workflows = await asyncio.gather(
+        *[
+            WorkflowDefinitionCache.get("user", "cached_workflow", "v1")
+            for _ in range(10)
+        ]
+    )
+    assert store.num_loads == 1
+    assert all(wf.version_hash == "v1" for wf in workflows)
+
+    # cache hit
+    await WorkflowDefinitionCache.get("user", "cached_workflow", "v1")
+    assert store.num_loads == 1
+
+    # previous versions stay resolvable after the workflow was pushed again
+    workflow = await WorkflowDefinitionCache.get("user", "cached_workflow", "v2")
+    assert workflow.version_hash == "v2"
+    WorkflowDefinitionCache.invalidate("cached_workflow")
+    workflow = await WorkflowDefinitionCache.get("user", "cached_workflow", "v1")
+    assert workflow.version_hash == "v1"
+    assert store.num_loads == 3
+
+    with pytest.raises(RuntimeError, match='version "v3" does not exist'):
+        await WorkflowDefinitionCache.get("user", "cached_workflow", "v3")
+
+
+async def test_workflow_definition_cache_prefetch(store):
+    capture_main_event_loop()
+    assert WorkflowDefinitionCache.peek("cached_workflow", "v1") is None
+
+    # workflow code runs in a separate thread
+    await asyncio.to_thread(
+        WorkflowDefinitionCache.prefetch, "user", "cached_workflow", "v1"
+    )
+    await asyncio.sleep(0.05)
+
+    workflow = WorkflowDefinitionCache.peek("cached_workflow", "v1")
+    assert workflow is not None
+    assert workflow.version_hash == "v1"
+    assert store.num_loads == 1